@@ -3,9 +3,12 @@
 """
 
 import time
+import argparse
 import threading
 from src.services.speech_service import SpeechService
+from src.services.batch_transcriber import BatchTranscriber
 from src.utils.config_loader import load_config
+from src.utils.logger import setup_logger
 
 
 class SpeechApp:
@@ -31,6 +34,11 @@ class SpeechApp:
         # 載入配置
         self.config = load_config(config_path)
 
+        # 日誌在背景執行緒輸出，不阻塞音訊與識別執行緒
+        debug_config = self.config.get('debug', {})
+        setup_logger(level=debug_config.get('log_level', 'INFO'),
+                     log_file=debug_config.get('log_file'))
+
         # 如果指定了模型大小，覆蓋配置
         if model_size:
             if 'asr' not in self.config:
@@ -50,10 +58,11 @@ class SpeechApp:
         self.speech_service.on_speech_end = self._on_speech_end
         self.speech_service.on_language_change = self._on_language_change
 
-    def _on_transcription(self, text):
-        """語音識別結果回呼"""
+    def _on_transcription(self, text, final=True):
+        """語音識別結果回呼 (兩階段識別時 final 為 False 的是草稿)"""
         lang_name = self.speech_service.get_language_name()
-        print(f"\n[{lang_name}] 識別結果: {text}\n")
+        label = "識別結果" if final else "草稿"
+        print(f"\n[{lang_name}] {label}: {text}\n")
 
     def _on_speech_start(self):
         """語音開始回呼"""
@@ -103,6 +112,7 @@ class SpeechApp:
         print("  輸入 'zh' 切換到普通話")
         print("  輸入 'yue' 切換到粵語")
         print("  輸入 'en' 切換到英文")
+        print("  輸入 'auto' 自動偵測語言")
         print("  輸入 'q' 或按 Ctrl+C 退出\n")
         print("="*60 + "\n")
 
@@ -116,7 +126,7 @@ class SpeechApp:
         while True:
             try:
                 cmd = input().strip().lower()
-                if cmd in ['zh', 'yue', 'en']:
+                if cmd in ['zh', 'yue', 'en', 'auto']:
                     self.speech_service.set_language(cmd)
                 elif cmd == 'q':
                     print("\n正在退出...")
@@ -190,13 +200,72 @@ def select_model():
             sys.exit(0)
 
 
+def run_transcribe(args):
+    """批次轉錄錄音檔"""
+    config = load_config(args.config)
+    asr_config = config.setdefault('asr', {})
+    if args.model:
+        asr_config['model_size'] = args.model
+    if args.language:
+        asr_config['language'] = args.language
+    if args.cpu_threads is not None:
+        asr_config['cpu_threads'] = args.cpu_threads
+
+    debug_config = config.get('debug', {})
+    setup_logger(level=debug_config.get('log_level', 'INFO'), log_file=debug_config.get('log_file'))
+
+    transcriber = BatchTranscriber(
+        config,
+        output=args.output,
+        srt_dir=args.srt_dir,
+        workers=args.workers,
+        profile=args.profile,
+        long_form=args.long_form,
+        chunk_seconds=args.chunk_seconds
+    )
+    stats = transcriber.run(args.paths)
+
+    print(f"\n完成 {stats['completed']} 個檔案 ({stats['audio_seconds'] / 60:.1f} 分鐘音訊)，"
+          f"略過 {stats['skipped']} 個，失敗 {stats['failed']} 個")
+    if stats['cache_hits']:
+        print(f"其中 {stats['cache_hits']} 次解碼由快取取得")
+    print(f"結果已寫入: {args.output}")
+
+
 def main():
     """主函式"""
+    parser = argparse.ArgumentParser(description="多語言語音識別系統")
+    parser.add_argument('--model', choices=list(SpeechApp.MODEL_INFO), help="Whisper 模型 (未指定時互動選擇)")
+    parser.add_argument('--config', default='config.yaml', help="配置檔案路徑")
+    subparsers = parser.add_subparsers(dest='command')
+
+    transcribe_parser = subparsers.add_parser('transcribe', help="批次轉錄錄音檔 (不需麥克風)")
+    transcribe_parser.add_argument('paths', nargs='+', help="音訊檔案或目錄 (目錄會遞迴搜尋)")
+    # 也接受寫在子命令之後的 --model / --config
+    transcribe_parser.add_argument('--model', choices=list(SpeechApp.MODEL_INFO), default=argparse.SUPPRESS)
+    transcribe_parser.add_argument('--config', default=argparse.SUPPRESS)
+    transcribe_parser.add_argument('-o', '--output', default='transcripts.jsonl', help="JSONL 輸出路徑")
+    transcribe_parser.add_argument('--srt-dir', nargs='?', const='', default=None,
+                                   help="同時輸出 SRT 字幕；不指定目錄時寫在音訊檔旁")
+    transcribe_parser.add_argument('-w', '--workers', type=int, default=2, help="工作行程數")
+    transcribe_parser.add_argument('--language', help="語言代碼 (zh, yue, en, auto)")
+    transcribe_parser.add_argument('--profile', default='accurate', help="解碼設定 (realtime, accurate)")
+    transcribe_parser.add_argument('--cpu-threads', type=int, help="每個工作行程的 CPU 執行緒數")
+    transcribe_parser.add_argument('--long-form', action='store_true',
+                                   help="長檔模式：在靜音處切段，單一檔案也分配到所有工作行程平行解碼；"
+                                        "16-bit WAV 的記憶體用量不隨檔案長度增加 (未指定時每個檔案整檔載入)")
+    transcribe_parser.add_argument('--chunk-seconds', type=float, default=120, help="長檔模式的目標區段長度 (秒)")
+    args = parser.parse_args()
+
+    if args.command == 'transcribe':
+        run_transcribe(args)
+        return
+
     # 選擇模型
-    model_size = select_model()
+    model_size = args.model or select_model()
 
     # 創建應用
-    app = SpeechApp(model_size=model_size)
+    app = SpeechApp(config_path=args.config, model_size=model_size)
     app.run()
 
 
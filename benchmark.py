@@ -0,0 +1,94 @@
+"""
+解碼效能基準測試
+比較各解碼設定，以及 faster-whisper 內建 VAD (vad_filter) 開/關的耗時
+
+用法:
+    python benchmark.py --profiles realtime accurate --repeat 3
+    python benchmark.py --audio samples/a.wav samples/b.wav
+"""
+
+import time
+import argparse
+import numpy as np
+
+from load_test import VirtualSpeaker, load_clips
+from src.core.asr import ASREngine
+from src.utils.config_loader import load_config
+
+
+def time_decode(asr, clips, profile, vad_filter, repeat):
+    """
+    量測解碼耗時
+
+    Args:
+        asr: ASR 引擎
+        clips: float32 音訊列表
+        profile: 解碼設定名稱
+        vad_filter: 是否啟用 ASR 端 VAD
+        repeat: 重複次數
+
+    Returns:
+        float: 每次完整跑完所有片段的平均耗時 (秒)
+    """
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for clip in clips:
+            asr.transcribe(clip, profile=profile, vad_filter=vad_filter)
+        elapsed.append(time.perf_counter() - start)
+    return float(np.mean(elapsed))
+
+
+def main():
+    """主函式"""
+    parser = argparse.ArgumentParser(description="ASR 解碼效能基準測試")
+    parser.add_argument('--config', default='config.yaml', help="配置檔案路徑")
+    parser.add_argument('--audio', nargs='*', default=[], help="測試音訊 (16-bit 單聲道 WAV)，未指定時使用合成語音")
+    parser.add_argument('--synthetic', type=int, default=8, help="合成語音片段數")
+    parser.add_argument('--length', type=float, default=4.0, help="合成語音片段時長 (秒)")
+    parser.add_argument('--profiles', nargs='+', default=['realtime', 'accurate'], help="要比較的解碼設定")
+    parser.add_argument('--repeat', type=int, default=3, help="重複次數")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    sample_rate = config.get('vad', {}).get('sample_rate', 16000)
+
+    if args.audio:
+        clips = load_clips(args.audio, sample_rate)
+    else:
+        speaker = VirtualSpeaker(0, sample_rate=sample_rate, seed=0)
+        clips = [speaker.render_utterance(args.length) for _ in range(args.synthetic)]
+    clips = [clip.astype(np.float32) / 32768.0 for clip in clips]
+    audio_seconds = sum(len(clip) for clip in clips) / sample_rate
+
+    # 量測解碼本身的耗時：停用快取 (重複的片段會直接命中) 及解碼期限 (會提早截斷)
+    asr = ASREngine.from_config(config.get('asr', {}), cache=None, decode_deadline=0)
+
+    # 暖機，避免首次呼叫的初始化成本計入結果
+    asr.transcribe(clips[0], profile=args.profiles[0])
+
+    print("\n" + "=" * 72)
+    print(f"測試音訊: {len(clips)} 段，共 {audio_seconds:.1f} 秒，重複 {args.repeat} 次")
+    print("=" * 72)
+    print(f"{'解碼設定':<12} {'ASR 端 VAD':>10} {'耗時(秒)':>10} {'RTF':>8} {'每段(毫秒)':>12}")
+    print("-" * 72)
+
+    for profile in args.profiles:
+        results = {}
+        for vad_filter in (False, True):
+            elapsed = time_decode(asr, clips, profile, vad_filter, args.repeat)
+            results[vad_filter] = elapsed
+            print(f"{profile:<12} {'開' if vad_filter else '關':>10} {elapsed:>10.3f} "
+                  f"{elapsed / audio_seconds:>8.3f} {elapsed / len(clips) * 1000:>12.1f}")
+
+        cost = results[True] - results[False]
+        print(f"{'':<12} {'VAD 成本':>10} {cost:>10.3f} {cost / audio_seconds:>8.3f} "
+              f"{cost / len(clips) * 1000:>12.1f}  ({cost / results[False] * 100:+.1f}%)")
+        print("-" * 72)
+
+    if not asr.use_faster_whisper:
+        print("注意: openai-whisper 不支援 vad_filter，開/關結果應相同")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+黑盒錄音工具
+查看黑盒錄音檔、擷取任意時段為 WAV，或將該時段重新送入識別流程
+
+用法:
+    python blackbox_tool.py info debug/blackbox.bin
+    python blackbox_tool.py extract debug/blackbox.bin --start 21:03 --end 21:04 -o missed.wav
+    python blackbox_tool.py replay debug/blackbox.bin --start -120
+"""
+
+import time
+import wave
+import argparse
+import threading
+from datetime import datetime, timedelta
+
+from src.core.blackbox import BlackBoxReader, FLAG_SPEECH, FLAG_IN_UTTERANCE
+from src.services.speech_service import SpeechService
+from src.utils.config_loader import load_config
+
+
+class ReplaySource:
+    """
+    重播音訊來源
+
+    介面與 AudioStream 相同，在背景執行緒中依序送出錄音幀，
+    結尾補上靜音讓最後一段語音能正常結束
+    """
+
+    def __init__(self, frames, frame_bytes, tail_seconds=3.0, frame_duration=30):
+        """
+        初始化重播來源
+
+        Args:
+            frames: 音訊幀列表 (bytes)
+            frame_bytes: 每幀位元組數
+            tail_seconds: 結尾補上的靜音長度 (秒)
+            frame_duration: 每幀時長 (毫秒)
+        """
+        silence = bytes(frame_bytes)
+        self.frames = list(frames) + [silence] * int(tail_seconds * 1000 / frame_duration)
+        self.finished = threading.Event()
+        self.feed_thread = None
+        self.on_audio_frame = None
+
+    def start(self):
+        """開始送出錄音幀"""
+        self.feed_thread = threading.Thread(target=self._feed)
+        self.feed_thread.daemon = True
+        self.feed_thread.start()
+
+    def stop(self):
+        """停止重播"""
+        self.finished.set()
+
+    def _feed(self):
+        """送出所有錄音幀"""
+        for frame in self.frames:
+            if self.finished.is_set():
+                break
+            if self.on_audio_frame:
+                self.on_audio_frame(frame)
+        self.finished.set()
+
+
+def parse_time(value, reader):
+    """
+    解析時間參數
+
+    支援 HH:MM[:SS] (錄音當天的時刻)、負數秒 (相對於錄音結尾) 或 Unix 時間戳
+
+    Args:
+        value: 時間字串，None 表示不限制
+        reader: BlackBoxReader
+
+    Returns:
+        float: Unix 時間戳，或 None (不限制或錄音檔是空的)
+    """
+    time_range = reader.time_range()
+    if value is None or time_range is None:
+        # 空的錄音檔讀不到任何幀，由呼叫端顯示沒有錄音
+        return None
+
+    oldest, newest = time_range
+    if ':' in value:
+        clock = datetime.strptime(value, "%H:%M:%S" if value.count(':') == 2 else "%H:%M").time()
+        end = datetime.fromtimestamp(newest)
+        moment = datetime.combine(end.date(), clock)
+        if moment > end:
+            # 跨午夜的錄音
+            moment -= timedelta(days=1)
+        return moment.timestamp()
+
+    number = float(value)
+    if number <= 0:
+        return newest + number
+    return number
+
+
+def find_utterances(frames, frame_duration):
+    """
+    依錄音中的旗標找出原本的語音片段
+
+    Returns:
+        list: (開始時間, 結束時間, 語音幀比例)
+    """
+    spans = []
+    start = None
+    speech = total = 0
+    for _, wall_time, flags, _ in frames:
+        if flags & FLAG_IN_UTTERANCE:
+            if start is None:
+                start, speech, total = wall_time, 0, 0
+            total += 1
+            speech += bool(flags & FLAG_SPEECH)
+        elif start is not None:
+            spans.append((start, wall_time, speech / total))
+            start = None
+    if start is not None:
+        spans.append((start, frames[-1][1] + frame_duration / 1000, speech / total))
+    return spans
+
+
+def format_time(timestamp):
+    """格式化牆上時間"""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def cmd_info(reader, args):
+    """顯示錄音檔資訊"""
+    time_range = reader.time_range()
+    frame_duration = reader.frame_bytes / 2 / reader.sample_rate * 1000
+
+    print(f"檔案: {reader.path}")
+    print(f"取樣率: {reader.sample_rate} Hz, 每幀 {frame_duration:.0f} 毫秒")
+    print(f"容量: {reader.capacity} 幀 ({reader.capacity * frame_duration / 60000:.1f} 分鐘)")
+    print(f"已保存: {len(reader)} 幀")
+    if time_range:
+        print(f"時間範圍: {format_time(time_range[0])} ~ {format_time(time_range[1])}")
+
+
+def cmd_extract(reader, args):
+    """擷取時段為 WAV 並列出原本的語音片段"""
+    frames = list(reader.frames(parse_time(args.start, reader), parse_time(args.end, reader)))
+    if not frames:
+        print("指定的時段沒有錄音")
+        return
+
+    with wave.open(args.output, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(reader.sample_rate)
+        for frame in frames:
+            wf.writeframes(frame[3])
+
+    seconds = len(frames) * reader.frame_bytes / 2 / reader.sample_rate
+    print(f"已擷取 {format_time(frames[0][1])} 起 {seconds:.1f} 秒到 {args.output}")
+    _print_utterances(frames, reader)
+
+
+def cmd_replay(reader, args):
+    """將時段重新送入識別流程"""
+    frames = list(reader.frames(parse_time(args.start, reader), parse_time(args.end, reader)))
+    if not frames:
+        print("指定的時段沒有錄音")
+        return
+    _print_utterances(frames, reader)
+
+    config = load_config(args.config)
+    # 重播時不再寫入黑盒，避免覆寫正在檢視的錄音
+    config.setdefault('debug', {}).setdefault('blackbox', {})['enabled'] = False
+    vad_config = config.get('vad', {})
+    vad_config['sample_rate'] = reader.sample_rate
+    frame_duration = reader.frame_bytes / 2 / reader.sample_rate * 1000
+    vad_config['frame_duration'] = int(round(frame_duration))
+
+    source = ReplaySource((frame[3] for frame in frames), reader.frame_bytes,
+                          frame_duration=frame_duration)
+    service = SpeechService(config, audio_stream=source)
+    service.on_transcription = lambda text, final=True: print(f"  重播識別結果: {text}")
+
+    print("\n>>> 重播中...")
+    service.start()
+    source.finished.wait()
+    # 未提到喚醒詞的片段不會被解碼，也算處理完畢
+    while service.stats['decoded'] + service.stats['gated'] < service.stats['utterances']:
+        time.sleep(0.1)
+    service.stop()
+
+    stats = service.get_stats()
+    print(f"重播完成: {stats['utterances']} 個語音片段，{stats['transcriptions']} 個識別結果")
+
+
+def _print_utterances(frames, reader):
+    """列出錄音當時偵測到的語音片段"""
+    frame_duration = reader.frame_bytes / 2 / reader.sample_rate * 1000
+    spans = find_utterances(frames, frame_duration)
+    if not spans:
+        print("錄音當時在此時段未偵測到語音")
+        return
+
+    print("錄音當時偵測到的語音片段:")
+    for start, end, speech_ratio in spans:
+        print(f"  {format_time(start)}  {end - start:5.2f} 秒  語音幀 {speech_ratio:.0%}")
+
+
+def main():
+    """主函式"""
+    parser = argparse.ArgumentParser(description="黑盒錄音工具")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    info_parser = subparsers.add_parser('info', help="顯示錄音檔資訊")
+    info_parser.add_argument('path', help="黑盒錄音檔路徑")
+
+    for name, help_text in (('extract', "擷取時段為 WAV"), ('replay', "將時段重新送入識別流程")):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('path', help="黑盒錄音檔路徑")
+        sub.add_argument('--start', help="開始時間 (HH:MM[:SS]、相對結尾的負秒數或 Unix 時間戳)")
+        sub.add_argument('--end', help="結束時間，格式同 --start")
+        if name == 'extract':
+            sub.add_argument('-o', '--output', default='blackbox.wav', help="輸出 WAV 路徑")
+        else:
+            sub.add_argument('--config', default='config.yaml', help="配置檔案路徑")
+
+    args = parser.parse_args()
+    commands = {'info': cmd_info, 'extract': cmd_extract, 'replay': cmd_replay}
+
+    reader = BlackBoxReader(args.path)
+    try:
+        commands[args.command](reader, args)
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
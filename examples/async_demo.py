@@ -0,0 +1,38 @@
+"""
+asyncio 語音識別示例
+展示如何在 asyncio 應用中以 async for 接收語音事件
+"""
+
+import asyncio
+from src.services.async_speech_service import AsyncSpeechService
+from src.utils.config_loader import load_config
+
+
+async def main():
+    """主函式"""
+    config = load_config("config.yaml")
+
+    service = AsyncSpeechService(config)
+    await service.start()
+    print(f"當前語言: {service.get_language_name()}，請對著麥克風說話 (Ctrl+C 結束)")
+
+    try:
+        async for event in service.events():
+            if event.type == 'speech_start':
+                print("檢測到語音...")
+            elif event.type == 'partial':
+                print(f"  片段: {event.data}")
+            elif event.type == 'final':
+                print(f"識別結果: {event.data}")
+            elif event.type == 'dropped':
+                reason, duration = event.data
+                print(f"已忽略 ({reason}, {duration:.2f}秒)")
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
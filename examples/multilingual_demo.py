@@ -21,7 +21,7 @@ def main():
     speech_service = SpeechService(config)
     
     # 設定識別回呼
-    def on_transcription(text):
+    def on_transcription(text, final=True):
         lang_name = speech_service.get_language_name()
         print(f"[{lang_name}] 識別結果: {text}")
     
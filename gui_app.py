@@ -6,9 +6,23 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
 import queue
+import logging
 from datetime import datetime
 from src.services.speech_service import SpeechService
 from src.utils.config_loader import load_config
+from src.utils.logger import setup_logger, StructuredFormatter
+
+
+class _QueueLogHandler(logging.Handler):
+    """將日誌轉送到 GUI 訊息佇列，由主執行緒顯示在日誌面板"""
+
+    def __init__(self, message_queue):
+        super().__init__()
+        self.message_queue = message_queue
+        self.setFormatter(StructuredFormatter('%(message)s'))
+
+    def emit(self, record):
+        self.message_queue.put(('log', (record.levelname, self.format(record))))
 
 
 class SpeechRecognitionGUI:
@@ -27,7 +41,8 @@ class SpeechRecognitionGUI:
     LANGUAGES = {
         'zh': '普通話',
         'yue': '粵語',
-        'en': 'English'
+        'en': 'English',
+        'auto': '自動偵測'
     }
     
     def __init__(self, root):
@@ -189,6 +204,12 @@ class SpeechRecognitionGUI:
                 self.config = load_config("config.yaml")
                 self._log("已載入預設配置")
             
+            # 服務日誌同時輸出到主控台與 GUI 日誌面板
+            debug_config = self.config.get('debug', {})
+            setup_logger(level=debug_config.get('log_level', 'INFO'),
+                         log_file=debug_config.get('log_file'),
+                         handlers=[_QueueLogHandler(self.message_queue)])
+            
             # 從配置中讀取預設值
             if 'asr' in self.config:
                 model = self.config['asr'].get('model_size', 'base')
@@ -297,9 +318,9 @@ class SpeechRecognitionGUI:
         except Exception as e:
             self._log(f"停止失敗: {e}", level="ERROR")
     
-    def _on_transcription(self, text):
-        """识别结果回调"""
-        self.message_queue.put(('transcription', text))
+    def _on_transcription(self, text, final=True):
+        """识别结果回调 (两阶段识别时 final 为 False 的是草稿)"""
+        self.message_queue.put(('transcription', (text, final)))
     
     def _on_speech_start(self):
         """语音开始回调"""
@@ -333,12 +354,15 @@ class SpeechRecognitionGUI:
                     messagebox.showerror("錯誤", f"服務啟動失敗: {data}")
                     
                 elif msg_type == 'transcription':
+                    text, final = data
                     lang_name = self.LANGUAGES.get(self.language_var.get(), '')
                     timestamp = datetime.now().strftime("%H:%M:%S")
-                    self.result_text.insert(tk.END, f"[{timestamp}] [{lang_name}] {data}\n")
+                    label = "" if final else "(草稿) "
+                    self.result_text.insert(tk.END, f"[{timestamp}] [{lang_name}] {label}{text}\n")
                     self.result_text.see(tk.END)
-                    self.recognition_count += 1
-                    self._update_stats()
+                    if final:
+                        self.recognition_count += 1
+                        self._update_stats()
                     
                 elif msg_type == 'speech_start':
                     self.status_label.config(text="● 檢測到語音", foreground="orange")
@@ -350,6 +374,10 @@ class SpeechRecognitionGUI:
                     lang_name = self.LANGUAGES.get(data, data)
                     self._log(f"語言已切換至: {lang_name}")
                     
+                elif msg_type == 'log':
+                    level, message = data
+                    self._log(message, level=level)
+                    
         except queue.Empty:
             pass
         finally:
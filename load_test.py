@@ -0,0 +1,386 @@
+"""
+負載測試工具
+模擬 N 個虛擬說話者同時輸入音訊，量測吞吐量、延遲分位數與佇列增長，
+用於找出特定機器的飽和點
+
+用法:
+    python load_test.py --speakers 1 2 4 8 16 --duration 60
+    python load_test.py --speakers 50 100 200 --clips samples/*.wav --asr-mode shared
+"""
+
+import time
+import wave
+import argparse
+import numpy as np
+
+from src.core.asr_process import create_asr
+from src.services.speech_service import SpeechService
+from src.utils.config_loader import load_config
+
+
+class VirtualClock:
+    """虛擬時鐘，可依倍速對齊真實時間"""
+
+    def __init__(self, speed=1.0):
+        """
+        初始化虛擬時鐘
+
+        Args:
+            speed: 虛擬時間相對真實時間的倍速，0 表示不對齊（盡快執行）
+        """
+        self.speed = speed
+        self.now = 0.0
+        self.max_lag = 0.0
+        self._wall_start = time.perf_counter()
+
+    def advance(self, seconds):
+        """推進虛擬時間，必要時等待真實時間追上"""
+        self.now += seconds
+        if self.speed <= 0:
+            return
+
+        target = self._wall_start + self.now / self.speed
+        delay = target - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # 負載產生器本身跟不上時記錄落後量
+            self.max_lag = max(self.max_lag, -delay)
+
+
+class VirtualSpeaker:
+    """
+    虛擬說話者
+
+    以說話/停頓交替的模式產生音訊幀，介面與 AudioStream 相同，
+    可直接作為 SpeechService 的音訊來源
+    """
+
+    def __init__(self, speaker_id, sample_rate=16000, frame_size=480,
+                 clips=None, talk_range=(1.0, 6.0), pause_mean=2.5, seed=None):
+        """
+        初始化虛擬說話者
+
+        Args:
+            speaker_id: 說話者編號
+            sample_rate: 取樣率 (Hz)
+            frame_size: 幀大小
+            clips: 錄音片段列表 (int16 numpy array)，未指定時使用合成語音
+            talk_range: 合成語音的說話時長範圍 (秒)
+            pause_mean: 平均停頓時長 (秒)
+            seed: 亂數種子
+        """
+        self.speaker_id = speaker_id
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.clips = clips or []
+        self.talk_range = talk_range
+        self.pause_mean = pause_mean
+        self.rng = np.random.default_rng(seed)
+
+        self.is_running = False
+        self.on_audio_frame = None
+
+        # 說話狀態，從一段隨機停頓開始以錯開各說話者
+        self.talking = False
+        self.remaining = int(self.rng.exponential(pause_mean) * sample_rate)
+        self.clip = None
+        self.clip_pos = 0
+        self.talk_pos = 0
+        self.phase = 0.0
+        self.f0 = 150.0
+
+    def start(self):
+        """開始產生音訊"""
+        self.is_running = True
+
+    def stop(self):
+        """停止產生音訊"""
+        self.is_running = False
+
+    def tick(self):
+        """產生一幀音訊並送出"""
+        if not self.is_running:
+            return
+
+        if self.remaining <= 0:
+            self._next_state()
+
+        if self.talking:
+            frame = self._talk_frame()
+        else:
+            frame = self.rng.normal(0, 30, self.frame_size)
+        self.remaining -= self.frame_size
+
+        if self.on_audio_frame:
+            self.on_audio_frame(np.clip(frame, -32768, 32767).astype(np.int16).tobytes())
+
+    def render_utterance(self, seconds):
+        """
+        產生一段完整的合成語音
+
+        Args:
+            seconds: 時長 (秒)
+
+        Returns:
+            numpy.ndarray: int16 音訊
+        """
+        self.talk_pos = 0
+        self.f0 = self.rng.uniform(100.0, 220.0)
+        frames = [self._talk_frame() for _ in range(int(seconds * self.sample_rate / self.frame_size))]
+        return np.clip(np.concatenate(frames), -32768, 32767).astype(np.int16)
+
+    def _next_state(self):
+        """切換說話/停頓狀態"""
+        self.talking = not self.talking
+        if self.talking:
+            self.talk_pos = 0
+            self.f0 = self.rng.uniform(100.0, 220.0)
+            if self.clips:
+                self.clip = self.clips[self.rng.integers(len(self.clips))]
+                self.clip_pos = 0
+                self.remaining = len(self.clip)
+            else:
+                self.remaining = int(self.rng.uniform(*self.talk_range) * self.sample_rate)
+        else:
+            pause = max(0.3, self.rng.exponential(self.pause_mean))
+            self.remaining = int(pause * self.sample_rate)
+
+    def _talk_frame(self):
+        """產生一幀說話音訊"""
+        if self.clip is not None:
+            frame = self.clip[self.clip_pos:self.clip_pos + self.frame_size]
+            self.clip_pos += self.frame_size
+            if len(frame) < self.frame_size:
+                frame = np.pad(frame, (0, self.frame_size - len(frame)))
+            return frame.astype(np.float64)
+
+        # 合成語音：諧波聲源 + 約 4 Hz 的音節包絡
+        n = np.arange(self.frame_size)
+        t = (self.talk_pos + n) / self.sample_rate
+        phase = self.phase + 2 * np.pi * self.f0 * n / self.sample_rate
+        harmonics = np.arange(1, 9)[:, None]
+        voiced = (np.sin(harmonics * phase) / harmonics).sum(axis=0)
+        envelope = 0.2 + 0.8 * np.abs(np.sin(np.pi * 4.0 * t))
+
+        step = 2 * np.pi * self.f0 * self.frame_size / self.sample_rate
+        self.phase = (self.phase + step) % (2 * np.pi)
+        self.talk_pos += self.frame_size
+        return voiced * envelope * 6000 + self.rng.normal(0, 200, self.frame_size)
+
+
+def load_clips(paths, sample_rate):
+    """
+    載入錄音片段
+
+    Args:
+        paths: WAV 檔案路徑列表 (16-bit 單聲道)
+        sample_rate: 預期取樣率
+
+    Returns:
+        list: int16 numpy array 列表
+    """
+    clips = []
+    for path in paths:
+        with wave.open(path, 'rb') as wf:
+            if wf.getframerate() != sample_rate or wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                raise ValueError(f"{path}: 需要 {sample_rate} Hz 16-bit 單聲道 WAV")
+            clips.append(np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16))
+    return clips
+
+
+def run_step(config, num_speakers, duration, speed=1.0, shared_asr=None,
+             clips=None, seed=None, drain_timeout=30.0):
+    """
+    執行單一負載等級
+
+    Args:
+        config: 配置字典
+        num_speakers: 虛擬說話者數量
+        duration: 虛擬時長 (秒)
+        speed: 虛擬時間倍速
+        shared_asr: 共用的 ASR 引擎，None 表示每位說話者各自載入模型
+        clips: 錄音片段列表
+        seed: 亂數種子
+        drain_timeout: 輸入結束後等待佇列清空的最長時間 (秒)
+
+    Returns:
+        dict: 量測結果
+    """
+    vad_config = config.get('vad', {})
+    sample_rate = vad_config.get('sample_rate', 16000)
+    frame_duration = vad_config.get('frame_duration', 30)
+    frame_size = int(sample_rate * frame_duration / 1000)
+
+    speakers = []
+    services = []
+    owned_asrs = []
+    for i in range(num_speakers):
+        speaker = VirtualSpeaker(
+            i,
+            sample_rate=sample_rate,
+            frame_size=frame_size,
+            clips=clips,
+            seed=None if seed is None else seed + i
+        )
+        asr = shared_asr
+        if asr is None:
+            # SpeechService 不會關閉外部傳入的引擎，各自載入的模型 (及子行程) 由這裡關閉
+            asr = create_asr(config.get('asr', {}), sample_rate)
+            owned_asrs.append(asr)
+        speakers.append(speaker)
+        services.append(SpeechService(config, asr=asr, audio_stream=speaker))
+
+    for service in services:
+        service.start()
+
+    clock = VirtualClock(speed)
+    wall_start = time.perf_counter()
+    queue_samples = []
+    next_sample = 0.0
+
+    # 所有說話者共用同一個虛擬時鐘，每個時鐘週期各送出一幀
+    while clock.now < duration:
+        for speaker in speakers:
+            speaker.tick()
+        clock.advance(frame_duration / 1000)
+
+        if clock.now >= next_sample:
+            queue_samples.append((time.perf_counter() - wall_start,
+                                  sum(s.recognition_queue.qsize() for s in services)))
+            next_sample += 1.0
+
+    feed_seconds = time.perf_counter() - wall_start
+
+    # 等待剩餘語音片段識別完成 (未提到喚醒詞的片段不送入主模型，也算處理完畢)
+    deadline = time.perf_counter() + drain_timeout
+    while time.perf_counter() < deadline:
+        if all(s.stats['decoded'] + s.stats['gated'] >= s.stats['utterances'] for s in services):
+            break
+        time.sleep(0.1)
+
+    wall_seconds = time.perf_counter() - wall_start
+    for service in services:
+        service.stop()
+
+    stats = [s.get_stats() for s in services]
+    for asr in owned_asrs:
+        if hasattr(asr, 'close'):
+            asr.close()
+    latencies = np.array([lat for st in stats for lat in st['latencies']])
+    utterances = sum(st['utterances'] for st in stats)
+    decoded = sum(st['decoded'] for st in stats)
+    gated = sum(st['gated'] for st in stats)
+    audio_seconds = sum(st['audio_seconds'] for st in stats)
+    decode_seconds = sum(st['decode_seconds'] for st in stats)
+
+    # 以線性回歸估計輸入期間的佇列增長速度 (片段/秒)
+    if len(queue_samples) >= 2:
+        xs, ys = np.array(queue_samples, dtype=float).T
+        queue_growth = float(np.polyfit(xs, ys, 1)[0])
+    else:
+        queue_growth = 0.0
+
+    def percentile(q):
+        return float(np.percentile(latencies, q)) if len(latencies) else 0.0
+
+    return {
+        'speakers': num_speakers,
+        'utterances': utterances,
+        'decoded': decoded,
+        'gated': gated,
+        'pending': utterances - decoded - gated,
+        'truncated': sum(st['truncated'] for st in stats),
+        'throughput': decoded / wall_seconds,
+        'audio_rate': audio_seconds / wall_seconds,
+        'rtf': decode_seconds / audio_seconds if audio_seconds else 0.0,
+        'p50': percentile(50),
+        'p90': percentile(90),
+        'p99': percentile(99),
+        'max_queue': max((q for _, q in queue_samples), default=0),
+        'queue_growth': queue_growth,
+        'feed_seconds': feed_seconds,
+        'harness_lag': clock.max_lag
+    }
+
+
+def print_report(results, latency_budget):
+    """輸出負載測試報告並標示飽和點"""
+    print("\n" + "=" * 96)
+    print(f"{'說話者':>6} {'片段':>6} {'完成':>6} {'未完成':>6} {'片段/秒':>8} {'音訊秒/秒':>9} "
+          f"{'RTF':>6} {'p50':>7} {'p90':>7} {'p99':>7} {'最大佇列':>8} {'佇列增長':>8}")
+    print("-" * 96)
+
+    saturation = None
+    for r in results:
+        print(f"{r['speakers']:>6} {r['utterances']:>6} {r['decoded']:>6} {r['pending']:>6} "
+              f"{r['throughput']:>8.2f} {r['audio_rate']:>9.2f} {r['rtf']:>6.2f} "
+              f"{r['p50']:>7.2f} {r['p90']:>7.2f} {r['p99']:>7.2f} "
+              f"{r['max_queue']:>8} {r['queue_growth']:>8.3f}")
+        if r['truncated']:
+            print(f"       注意: {r['truncated']} 段因解碼上限被截斷")
+        if r['gated']:
+            print(f"       注意: {r['gated']} 段未提到喚醒詞，未送入主模型")
+        if r['harness_lag'] > 0.1:
+            print(f"       注意: 負載產生器落後真實時間 {r['harness_lag']:.2f} 秒，結果可能偏低")
+
+        saturated = r['queue_growth'] > 0.05 or r['pending'] > 0 or r['p90'] > latency_budget
+        if saturated and saturation is None:
+            saturation = r['speakers']
+
+    print("=" * 96)
+    if saturation is None:
+        print("在測試範圍內未達飽和")
+    else:
+        print(f"飽和點: {saturation} 位說話者 (佇列持續增長或 p90 延遲超過 {latency_budget:.1f} 秒)")
+
+
+def main():
+    """主函式"""
+    parser = argparse.ArgumentParser(description="VAD + ASR 負載測試")
+    parser.add_argument('--config', default='config.yaml', help="配置檔案路徑")
+    parser.add_argument('--speakers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="要測試的虛擬說話者數量 (可多個，依序遞增)")
+    parser.add_argument('--duration', type=float, default=60.0, help="每個負載等級的虛擬時長 (秒)")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="虛擬時間倍速，1 為即時，0 為不對齊真實時間")
+    parser.add_argument('--asr-mode', choices=['shared', 'per-speaker'], default='shared',
+                        help="共用一個 ASR 模型或每位說話者各自載入")
+    parser.add_argument('--profile', default=None,
+                        help="覆寫即時識別使用的解碼設定 (例如 realtime, accurate)")
+    parser.add_argument('--clips', nargs='*', default=[], help="錄音片段 (16-bit 單聲道 WAV)")
+    parser.add_argument('--seed', type=int, default=0, help="亂數種子")
+    parser.add_argument('--drain-timeout', type=float, default=30.0,
+                        help="輸入結束後等待佇列清空的時間 (秒)")
+    parser.add_argument('--latency-budget', type=float, default=3.0,
+                        help="判斷飽和的 p90 延遲上限 (秒)")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    if args.profile:
+        config.setdefault('asr', {})['decoding_profile'] = args.profile
+    sample_rate = config.get('vad', {}).get('sample_rate', 16000)
+    clips = load_clips(args.clips, sample_rate)
+    shared_asr = create_asr(config.get('asr', {}), sample_rate) if args.asr_mode == 'shared' else None
+
+    results = []
+    try:
+        for num_speakers in args.speakers:
+            print(f"\n>>> 測試 {num_speakers} 位虛擬說話者 ({args.duration:.0f} 秒)...")
+            results.append(run_step(
+                config, num_speakers, args.duration,
+                speed=args.speed,
+                shared_asr=shared_asr,
+                clips=clips,
+                seed=args.seed,
+                drain_timeout=args.drain_timeout
+            ))
+    finally:
+        if shared_asr is not None and hasattr(shared_asr, 'close'):
+            shared_asr.close()
+
+    print_report(results, args.latency_budget)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from .core.vad import VADProcessor
 from .core.asr import ASREngine
 from .core.audio_stream import AudioStream
 from .services.speech_service import SpeechService
+from .services.async_speech_service import AsyncSpeechService
 
 __version__ = "1.0.0"
 
@@ -14,4 +15,5 @@ __all__ = [
     'ASREngine',
     'AudioStream',
     'SpeechService',
+    'AsyncSpeechService',
 ]
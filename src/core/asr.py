@@ -3,8 +3,14 @@ ASR (Automatic Speech Recognition) 模組
 負責語音識別
 """
 
+import time
+import threading
 import numpy as np
 
+from .language_id import LanguagePrior
+from .transcript_cache import TranscriptCache
+from ..utils.logger import get_logger
+
 try:
     from faster_whisper import WhisperModel
     HAS_FASTER_WHISPER = True
@@ -18,6 +24,289 @@ except ImportError:
     HAS_WHISPER = False
 
 
+logger = get_logger("asr")
+
+
+class Word:
+    """單字時間戳 (解碼參數 word_timestamps 開啟時才有)"""
+
+    __slots__ = ('start', 'end', 'word', 'probability')
+
+    def __init__(self, start, end, word, probability=None):
+        self.start = start
+        self.end = end
+        self.word = word
+        self.probability = probability
+
+
+class Segment:
+    """
+    識別片段
+
+    avg_logprob 為平均 token 對數機率，no_speech_prob 為模型判斷此段沒有語音的機率，
+    兩者可用於過濾幻覺或雜訊產生的結果
+    """
+
+    __slots__ = ('start', 'end', 'text', 'num_tokens', 'avg_logprob', 'no_speech_prob', 'words')
+
+    def __init__(self, start, end, text, num_tokens=0, avg_logprob=None, no_speech_prob=None, words=None):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.num_tokens = num_tokens
+        self.avg_logprob = avg_logprob
+        self.no_speech_prob = no_speech_prob
+        self.words = words
+
+    def to_tuple(self):
+        """轉為可 pickle / JSON 序列化的 tuple (行程間傳遞及快取使用)"""
+        words = None if self.words is None else [(w.start, w.end, w.word, w.probability) for w in self.words]
+        return (self.start, self.end, self.text, self.num_tokens, self.avg_logprob, self.no_speech_prob, words)
+
+    @classmethod
+    def from_tuple(cls, values):
+        """由 to_tuple 的結果還原"""
+        start, end, text, num_tokens, avg_logprob, no_speech_prob, words = values
+        if words is not None:
+            words = [Word(*word) for word in words]
+        return cls(start, end, text, num_tokens, avg_logprob, no_speech_prob, words)
+
+
+class RecognitionResult:
+    """
+    識別結果
+
+    str() 為識別文字，可直接當作字串使用的地方 (例如 on_transcription 回呼) 只會收到文字。
+    解碼失敗時 text 為空字串，error 為錯誤訊息。
+    """
+
+    __slots__ = ('text', 'segments', 'language', 'language_probability',
+                 'decode_time', 'latency', 'truncated', 'reason', 'error')
+
+    def __init__(self, text="", segments=(), language=None, language_probability=None,
+                 decode_time=0.0, latency=None, truncated=False, reason=None, error=None):
+        """
+        Args:
+            text: 識別文字
+            segments: 識別片段 (Segment)
+            language: 識別語言 (自動偵測時為偵測結果)
+            language_probability: 語言偵測的機率
+            decode_time: 解碼時間 (秒)
+            latency: 從擷取完成到取得結果的時間 (秒)，由擷取端填入
+            truncated: 是否因解碼上限而提前截斷
+            reason: 截斷原因 (deadline, max_tokens, repetition)
+            error: 解碼失敗時的錯誤訊息
+        """
+        self.text = text
+        self.segments = list(segments)
+        self.language = language
+        self.language_probability = language_probability
+        self.decode_time = decode_time
+        self.latency = latency
+        self.truncated = truncated
+        self.reason = reason
+        self.error = error
+
+    def __str__(self):
+        return self.text
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def __repr__(self):
+        return f"RecognitionResult({self.text!r}, language={self.language!r}, segments={len(self.segments)})"
+
+    @property
+    def words(self):
+        """所有片段的單字時間戳，未開啟 word_timestamps 時為空列表"""
+        return [word for segment in self.segments for word in (segment.words or ())]
+
+    @property
+    def avg_logprob(self):
+        """以 token 數加權的平均對數機率，後端未提供時為 None"""
+        scored = [(s.avg_logprob, s.num_tokens or 1) for s in self.segments if s.avg_logprob is not None]
+        if not scored:
+            return None
+        return sum(logprob * tokens for logprob, tokens in scored) / sum(tokens for _, tokens in scored)
+
+    @property
+    def no_speech_prob(self):
+        """各片段無語音機率的最小值 (任一片段確定有語音即視為有語音)，後端未提供時為 None"""
+        probs = [s.no_speech_prob for s in self.segments if s.no_speech_prob is not None]
+        return min(probs) if probs else None
+
+    def to_dict(self):
+        """轉為可 JSON 序列化的 dict"""
+        segments = []
+        for segment in self.segments:
+            item = {'start': segment.start, 'end': segment.end, 'text': segment.text.strip(),
+                    'avg_logprob': segment.avg_logprob, 'no_speech_prob': segment.no_speech_prob}
+            if segment.words is not None:
+                item['words'] = [{'start': w.start, 'end': w.end, 'word': w.word, 'probability': w.probability}
+                                 for w in segment.words]
+            segments.append(item)
+
+        return {
+            'text': self.text,
+            'segments': segments,
+            'language': self.language,
+            'language_probability': self.language_probability,
+            'decode_time': self.decode_time,
+            'latency': self.latency,
+            'truncated': self.truncated,
+            'reason': self.reason,
+            'error': self.error
+        }
+
+
+class TranscriptionStream:
+    """
+    識別串流
+
+    逐段產生 Segment，達到解碼上限時停止讀取。由於 faster-whisper 的片段是惰性產生的，
+    停止讀取即可中止後續視窗的解碼；單一視窗內的上限由引擎以解碼參數限制。
+    連續重複的句子視為幻覺迴圈，只捨棄重複的部分，之後的內容照常解碼。
+    迭代結束後可由 result 取得完整結果。
+    """
+
+    def __init__(self, engine, segments, start, deadline=0, max_tokens=0, cache_key=None,
+                 language=None, language_probability=None, max_repeats=None, audio_seconds=0.0):
+        """
+        初始化識別串流
+
+        Args:
+            engine: 所屬的 ASR 引擎
+            segments: Segment 的可迭代物件
+            start: 解碼開始時間 (perf_counter)
+            deadline: 解碼時間上限 (秒)，0 為不限制
+            max_tokens: token 上限，0 為不限制
+            cache_key: 快取鍵，迭代完成後將結果寫入引擎的快取
+            language: 識別語言
+            language_probability: 語言偵測的機率
+            max_repeats: 同一句連續重複的次數上限，0 為不限制，None 為引擎的設定
+            audio_seconds: 音訊長度 (秒)，完整解碼後用於更新引擎的解碼速度估計
+        """
+        self.engine = engine
+        self.start = start
+        self.finished = None
+        self.language = language
+        self.language_probability = language_probability
+        self.deadline = deadline
+        self.max_tokens = max_tokens
+        self.max_repeats = engine.max_repeats if max_repeats is None else max_repeats
+        self.audio_seconds = audio_seconds
+        self.segments = []
+        self.truncated = False
+        self.reason = None
+        self.cached = False
+        self.cache_key = cache_key
+        self._source = segments
+
+    @classmethod
+    def from_cache(cls, engine, cached):
+        """
+        由快取的結果建立串流，迭代時直接產生快取的片段
+
+        Args:
+            engine: 所屬的 ASR 引擎
+            cached: TranscriptCache 中的結果
+
+        Returns:
+            TranscriptionStream: 識別串流
+        """
+        stream = cls(engine, [Segment.from_tuple(values) for values in cached['segments']], time.perf_counter(),
+                     language=cached['language'], language_probability=cached['language_probability'])
+        stream.truncated = cached['truncated']
+        stream.reason = cached['reason']
+        stream.cached = True
+        return stream
+
+    def __iter__(self):
+        tokens = 0
+        repeats = 0
+        held = []
+        last = None
+        looping = False
+
+        for segment in self._source:
+            text = segment.text.strip()
+
+            # 連續重複的句子先暫存，重複達上限時視為幻覺迴圈，捨棄重複的部分但繼續解碼；
+            # 空白片段不算重複也不中斷重複的計算
+            if text and text == last:
+                repeats += 1
+                if self.max_repeats and repeats >= self.max_repeats - 1:
+                    held = []
+                    if not looping:
+                        looping = True
+                        self._truncate('repetition')
+                else:
+                    held.append(segment)
+            else:
+                if text:
+                    repeats = 0
+                    last = text
+                    looping = False
+                held.append(segment)
+
+                for pending in held:
+                    self.segments.append(pending)
+                    tokens += pending.num_tokens
+                    yield pending
+                held = []
+
+                if self.max_tokens and tokens >= self.max_tokens:
+                    self._truncate('max_tokens')
+                    break
+
+            if self.deadline and time.perf_counter() - self.start >= self.deadline:
+                self._truncate('deadline')
+                break
+
+        # 未達上限的重複句子仍屬於正常結果
+        for pending in held:
+            self.segments.append(pending)
+            yield pending
+        self.finished = time.perf_counter()
+
+        if self.audio_seconds and self.reason not in ('deadline', 'max_tokens'):
+            self.engine._record_speed(self.audio_seconds, self.finished - self.start)
+
+        # 時間上限取決於當下負載，因此截斷的結果不快取；token 及重複上限的結果是確定的
+        if self.cache_key and self.reason != 'deadline':
+            self.engine.cache.put(self.cache_key, {
+                'segments': [segment.to_tuple() for segment in self.segments],
+                'language': self.language,
+                'language_probability': self.language_probability,
+                'truncated': self.truncated,
+                'reason': self.reason
+            })
+
+    def _truncate(self, reason):
+        """標記因解碼上限而截斷"""
+        self.truncated = True
+        self.reason = reason
+        self.engine._record_truncation(reason)
+
+    @property
+    def text(self):
+        """目前為止的識別文字"""
+        return " ".join(segment.text for segment in self.segments).strip()
+
+    @property
+    def result(self):
+        """目前為止的識別結果"""
+        return RecognitionResult(
+            text=self.text,
+            segments=self.segments,
+            language=self.language,
+            language_probability=self.language_probability,
+            decode_time=(self.finished or time.perf_counter()) - self.start,
+            truncated=self.truncated,
+            reason=self.reason
+        )
+
+
 class ASREngine:
     """語音識別引擎"""
 
@@ -28,12 +317,64 @@ class ASREngine:
         'en': 'English'
     }
 
+    # 自動偵測語言 (限制在 SUPPORTED_LANGUAGES 內)
+    AUTO_LANGUAGE = 'auto'
+    AUTO_LANGUAGE_NAME = '自動偵測'
+
+    # Whisper 的輸入取樣率
+    SAMPLE_RATE = 16000
+
+    # 單一視窗的輸出 token 上限：Whisper 每個視窗最多 448 個 token (含前文提示)，保留約一半給提示
+    MAX_WINDOW_TOKENS = 220
+
+    # 內建解碼設定，可由配置 asr.decoding_profiles 覆寫或新增
+    DECODING_PROFILES = {
+        # 即時對話：貪婪解碼、不做溫度回退、不產生時間戳
+        'realtime': {
+            'beam_size': 1,
+            'best_of': 1,
+            'temperature': 0.0,
+            'condition_on_previous_text': False,
+            'without_timestamps': True
+        },
+        # 批次重新處理：束搜尋加溫度回退
+        'accurate': {
+            'beam_size': 5,
+            'best_of': 5,
+            'temperature': [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+            'condition_on_previous_text': True,
+            'without_timestamps': False
+        }
+    }
+
+    # 各音訊來源是否在 faster-whisper 內再跑一次 Silero VAD：
+    # 即時語音已由 VADProcessor 切段，不需重複；原始檔案輸入則需要
+    SOURCE_VAD_FILTER = {
+        'live': False,
+        'file': True
+    }
+
+    # openai-whisper 不支援或命名不同的參數
+    _OPENAI_UNSUPPORTED_OPTIONS = ('vad_filter',)
+    _OPENAI_RENAMED_OPTIONS = {'log_prob_threshold': 'logprob_threshold'}
+
     def __init__(self,
                  model_size="base",
                  language="zh",
                  device="cpu",
                  compute_type="int8",
-                 model_path=None):
+                 model_path=None,
+                 decoding_profile="accurate",
+                 decoding_profiles=None,
+                 cpu_threads=0,
+                 num_workers=1,
+                 vad_filter=None,
+                 decode_deadline=0,
+                 max_tokens=0,
+                 max_repeats=3,
+                 cache=None,
+                 language_models=None,
+                 auto_language=None):
         """
         初始化 ASR 引擎
 
@@ -43,14 +384,69 @@ class ASREngine:
             device: 裝置 (cpu, cuda)
             compute_type: 計算類型 (int8, float16, float32)
             model_path: 本地模型路徑（可選）
+            decoding_profile: 預設解碼設定名稱 (realtime, accurate)
+            decoding_profiles: 自訂解碼設定，會合併到內建設定
+            cpu_threads: faster-whisper 的 CPU 執行緒數 (0 為自動)
+            num_workers: faster-whisper 可同時解碼的工作數
+            vad_filter: 各音訊來源是否啟用 ASR 端 VAD，例如 {'live': False, 'file': True}
+            decode_deadline: 單段語音的解碼時間上限 (秒)，0 為不限制
+            max_tokens: 單段語音的輸出 token 上限，0 為不限制
+            max_repeats: 同一句連續重複的次數上限，用於中止幻覺迴圈，0 為不限制
+            cache: 識別結果快取 (TranscriptCache，可選)，相同音訊及參數不再重複解碼
+            language_models: 各語言使用的模型 {語言代碼: 模型名稱或本地路徑}，例如 {'en': 'base.en'}，
+                未列出的語言使用 model_size / model_path
+            auto_language: 自動偵測語言的先驗設定 {min_seconds, decay, confidence}
         """
         self.language = language
         self.model_size = model_size
+        self.model_path = model_path
         self.device = device
         self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+
+        # 合併內建與自訂的解碼設定
+        self.decoding_profiles = {name: dict(options) for name, options in self.DECODING_PROFILES.items()}
+        for name, options in (decoding_profiles or {}).items():
+            self.decoding_profiles.setdefault(name, {}).update(options or {})
+
+        if decoding_profile not in self.decoding_profiles:
+            raise ValueError(f"未知的解碼設定: {decoding_profile}")
+        self.decoding_profile = decoding_profile
+
+        self.vad_filter = dict(self.SOURCE_VAD_FILTER)
+        self.vad_filter.update(vad_filter or {})
+
+        # 解碼上限，超過時停止讀取片段並回傳目前為止的結果
+        self.decode_deadline = decode_deadline
+        self.max_tokens = max_tokens
+        self.max_repeats = max_repeats
+        self.cache = cache
 
-        print(f"正在載入 Whisper 模型: {model_size}...")
-        print("提示: 首次執行會自動下載模型，請耐心等待...")
+        # 最近的解碼速度 (解碼秒數 / 音訊秒數)，用於在時間上限內估計可容納的溫度回退次數
+        self.realtime_factor = None
+
+        # 自動偵測語言時的工作階段先驗，短語音沿用最近的語言而不重新偵測
+        auto_language = auto_language or {}
+        self.language_prior = LanguagePrior(
+            self.SUPPORTED_LANGUAGES,
+            min_seconds=auto_language.get('min_seconds', 2.0),
+            decay=auto_language.get('decay', 0.7),
+            confidence=auto_language.get('confidence', 0.8)
+        )
+
+        # 截斷事件及語言偵測統計
+        self.stats = {
+            'truncated': 0,
+            'deadline': 0,
+            'max_tokens': 0,
+            'repetition': 0,
+            'language_detected': 0,
+            'language_inherited': 0
+        }
+
+        logger.info("正在載入 Whisper 模型: %s...", model_size)
+        logger.info("提示: 首次執行會自動下載模型，請耐心等待...")
 
         if HAS_FASTER_WHISPER:
             self._init_faster_whisper(model_size, device, compute_type, model_path)
@@ -59,62 +455,352 @@ class ASREngine:
         else:
             raise RuntimeError("未安裝 Whisper 模型，請安裝 faster-whisper 或 openai-whisper")
 
-        print("模型載入完成！")
+        logger.info("模型載入完成！")
+
+        # 各語言的模型在第一次使用時才載入，之後常駐，不因切換語言而重新載入
+        self.language_models = dict(language_models or {})
+        self.default_model = (self.model_path or self.model_size) if self.use_faster_whisper else self.model_size
+        self.models = {self.default_model: self.model}
+        self.model_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, asr_config, **kwargs):
+        """
+        依配置建立 ASR 引擎
+
+        Args:
+            asr_config: 配置中的 asr 區段
+            **kwargs: 覆寫的建構參數
+
+        Returns:
+            ASREngine: ASR 引擎
+        """
+        params = {
+            'model_size': asr_config.get('model_size', 'base'),
+            'language': asr_config.get('language', 'zh'),
+            'device': asr_config.get('device', 'cpu'),
+            'compute_type': asr_config.get('compute_type', 'int8'),
+            'model_path': asr_config.get('model_path'),
+            'decoding_profile': asr_config.get('decoding_profile', 'realtime'),
+            'decoding_profiles': asr_config.get('decoding_profiles'),
+            'cpu_threads': asr_config.get('cpu_threads', 0),
+            'num_workers': asr_config.get('num_workers', 1),
+            'vad_filter': asr_config.get('vad_filter'),
+            'decode_deadline': asr_config.get('decode_deadline', 0),
+            'max_tokens': asr_config.get('max_tokens', 0),
+            'max_repeats': asr_config.get('max_repeats', 3),
+            'language_models': asr_config.get('language_models'),
+            'auto_language': asr_config.get('auto_language')
+        }
+
+        cache_config = asr_config.get('cache') or {}
+        if cache_config.get('enabled', False) and 'cache' not in kwargs:
+            params['cache'] = TranscriptCache(
+                path=cache_config.get('path', 'cache/transcripts.sqlite'),
+                max_mb=cache_config.get('max_mb', 256)
+            )
+
+        params.update(kwargs)
+        return cls(**params)
 
     def _init_faster_whisper(self, model_size, device, compute_type, model_path):
         """初始化 faster-whisper"""
         if model_path:
-            print(f"使用本地模型: {model_path}")
-            self.model = WhisperModel(model_path, device=device, compute_type=compute_type)
+            logger.info("使用本地模型: %s", model_path)
         else:
-            print(f"使用線上模型: {model_size} (首次會自動下載)")
-            self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
+            logger.info("使用線上模型: %s (首次會自動下載)", model_size)
+
+        self.model = WhisperModel(
+            model_path or model_size,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=self.cpu_threads,
+            num_workers=self.num_workers
+        )
         self.use_faster_whisper = True
 
     def _init_openai_whisper(self, model_size, model_path):
         """初始化 openai-whisper"""
-        print(f"使用 openai-whisper (首次會自動下載)")
+        logger.info("使用 openai-whisper (首次會自動下載)")
         self.model = whisper.load_model(model_size, download_root=model_path)
         self.use_faster_whisper = False
 
-    def transcribe(self, audio_data):
+    def transcribe(self, audio_data, profile=None, source="file",
+                   deadline=None, max_tokens=None, language=None, max_repeats=None, **overrides):
         """
         執行語音識別
 
         Args:
             audio_data: 音訊資料 (numpy array, float32, [-1, 1])
+            profile: 解碼設定名稱（可選，預設使用 decoding_profile）
+            source: 音訊來源 (live: 已由 VAD 切段的語音, file: 原始檔案)，決定是否啟用 ASR 端 VAD
+            deadline: 單次覆寫的解碼時間上限 (秒)
+            max_tokens: 單次覆寫的 token 上限
+            language: 此段語音的語言 (可選，預設為目前語言)，同時決定使用的模型；auto 為自動偵測
+            max_repeats: 單次覆寫的重複次數上限 (檔案轉錄時通常為 0)
+            **overrides: 單次覆寫的解碼參數，例如 beam_size=3
 
         Returns:
-            str: 識別文字
+            RecognitionResult: 識別結果，str() 為識別文字；失敗時 text 為空字串並附帶 error
         """
         try:
-            if self.use_faster_whisper:
-                return self._transcribe_faster_whisper(audio_data)
-            else:
-                return self._transcribe_openai_whisper(audio_data)
+            stream = self.transcribe_iter(audio_data, profile, source, deadline, max_tokens, language, max_repeats,
+                                          **overrides)
+            for _ in stream:
+                pass
+            return stream.result
         except Exception as e:
-            print(f"識別失敗: {e}")
-            return ""
+            logger.error("識別失敗: %s", e)
+            return RecognitionResult(language=language or self.language, error=str(e))
+
+    def transcribe_iter(self, audio_data, profile=None, source="file",
+                        deadline=None, max_tokens=None, language=None, max_repeats=None, **overrides):
+        """
+        串流識別，每解碼完一段就產生一個 Segment
+
+        faster-whisper 會逐段解碼；openai-whisper 會先完成整段解碼再依序產生。
+        迭代過程中的例外會直接拋出。自動偵測語言且需要偵測時不使用快取 (結果取決於先驗)。
+
+        Args:
+            與 transcribe 相同
+
+        Returns:
+            TranscriptionStream: 可迭代的識別串流
+        """
+        options = self.get_decoding_options(profile, source, **overrides)
+        deadline = self.decode_deadline if deadline is None else deadline
+        max_tokens = self.max_tokens if max_tokens is None else max_tokens
+        max_repeats = self.max_repeats if max_repeats is None else max_repeats
+        audio_seconds = len(audio_data) / self.SAMPLE_RATE
+        options = self._apply_limits(options, deadline, max_tokens, audio_seconds)
+        language = language or self.language
+        if language == self.AUTO_LANGUAGE and source == 'live':
+            inherited = self.language_prior.inherit(audio_seconds)
+            if inherited is not None:
+                self.stats['language_inherited'] += 1
+                language = inherited
+        if language == self.AUTO_LANGUAGE:
+            start = time.perf_counter()
+            segments, language, probability = self._decode_auto(audio_data, options, session=source == 'live')
+            return TranscriptionStream(self, segments, start, deadline if self.use_faster_whisper else 0,
+                                       max_tokens, language=language, language_probability=probability,
+                                       max_repeats=max_repeats, audio_seconds=audio_seconds)
+
+        model_name = self.language_models.get(language, self.default_model)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(audio_data, self._cache_params(options, max_tokens, max_repeats,
+                                                                           language, model_name))
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return TranscriptionStream.from_cache(self, cached)
+
+        model = self.get_model(language)
+        start = time.perf_counter()
+        if self.use_faster_whisper:
+            segments, language, probability = self._decode_faster_whisper(model, audio_data, language, options)
+        else:
+            # openai-whisper 一次完成整段解碼，只能事後套用 token 和重複上限
+            segments, language, probability = self._decode_openai_whisper(model, audio_data, language, options)
+            deadline = 0
+
+        return TranscriptionStream(self, segments, start, deadline, max_tokens, cache_key,
+                                   language=language, language_probability=probability,
+                                   max_repeats=max_repeats, audio_seconds=audio_seconds)
+
+    def _apply_limits(self, options, deadline, max_tokens, audio_seconds):
+        """
+        將解碼上限帶入單一視窗的解碼參數
+
+        串流只能在片段之間檢查上限，但 30 秒內的即時語音只有一個視窗，
+        溫度回退及 token 迴圈都發生在視窗內，因此：
+        - token 上限轉為每個視窗的 max_new_tokens (openai-whisper 為 sample_len)
+        - 依最近的解碼速度估計一次解碼的時間，時間上限內容不下的溫度回退直接移除
+
+        Returns:
+            dict: 套用上限後的解碼參數
+        """
+        options = dict(options)
+        if max_tokens:
+            key = 'max_new_tokens' if self.use_faster_whisper else 'sample_len'
+            options.setdefault(key, min(max_tokens, self.MAX_WINDOW_TOKENS))
+
+        temperature = options.get('temperature')
+        if (deadline and self.realtime_factor and audio_seconds
+                and isinstance(temperature, (list, tuple)) and len(temperature) > 1):
+            passes = max(1, int(deadline / (self.realtime_factor * audio_seconds)))
+            if passes < len(temperature):
+                options['temperature'] = list(temperature[:passes])
+        return options
+
+    def _record_speed(self, audio_seconds, decode_seconds):
+        """以完整解碼的結果更新解碼速度估計 (指數移動平均)"""
+        factor = decode_seconds / audio_seconds
+        if self.realtime_factor is None:
+            self.realtime_factor = factor
+        else:
+            self.realtime_factor = 0.7 * self.realtime_factor + 0.3 * factor
+
+    def get_model(self, language=None):
+        """
+        取得指定語言使用的模型，第一次使用時載入並常駐
+
+        Args:
+            language: 語言代碼，None 為目前語言
+
+        Returns:
+            已載入的 Whisper 模型
+        """
+        name = self.language_models.get(language or self.language, self.default_model)
+        model = self.models.get(name)
+        if model is not None:
+            return model
+
+        # 多個執行緒同時請求同一個模型時只載入一次
+        with self.model_lock:
+            model = self.models.get(name)
+            if model is None:
+                logger.info("正在載入 %s 使用的模型: %s...", language or self.language, name)
+                if self.use_faster_whisper:
+                    model = WhisperModel(name, device=self.device, compute_type=self.compute_type,
+                                         cpu_threads=self.cpu_threads, num_workers=self.num_workers)
+                else:
+                    model = whisper.load_model(name, download_root=self.model_path)
+                self.models[name] = model
+                logger.info("模型載入完成: %s", name)
+        return model
+
+    def _cache_params(self, options, max_tokens, max_repeats, language, model_name):
+        """影響識別結果的參數，作為快取鍵的一部分"""
+        return {
+            'backend': 'faster-whisper' if self.use_faster_whisper else 'openai-whisper',
+            'model': model_name,
+            'device': self.device,
+            'compute_type': self.compute_type,
+            'language': language,
+            'options': options,
+            'max_tokens': max_tokens,
+            'max_repeats': max_repeats
+        }
 
-    def _transcribe_faster_whisper(self, audio_data):
-        """使用 faster-whisper 識別"""
-        segments, info = self.model.transcribe(
+    def get_decoding_options(self, profile=None, source="file", **overrides):
+        """
+        取得解碼參數
+
+        Args:
+            profile: 解碼設定名稱（可選）
+            source: 音訊來源 (live, file)
+            **overrides: 覆寫的參數
+
+        Returns:
+            dict: 合併後的解碼參數
+        """
+        profile = profile or self.decoding_profile
+        if profile not in self.decoding_profiles:
+            raise ValueError(f"未知的解碼設定: {profile}")
+        if source not in self.vad_filter:
+            raise ValueError(f"未知的音訊來源: {source}")
+
+        options = {'vad_filter': self.vad_filter[source]}
+        options.update(self.decoding_profiles[profile])
+        options.update(overrides)
+        return options
+
+    def _decode_auto(self, audio_data, options, session=True):
+        """
+        自動偵測語言並解碼，偵測結果限制在 SUPPORTED_LANGUAGES 內
+
+        faster-whisper 不指定語言時會以第一個視窗的編碼結果偵測語言，並沿用同一次編碼解碼；
+        只有偵測結果不在支援的語言內、被先驗改判，或選定的語言使用其他模型時才重新解碼。
+        openai-whisper 先以 detect_language 偵測，再以選定的語言解碼。
+
+        Args:
+            audio_data: 音訊資料
+            options: 解碼參數
+            session: 是否套用並更新工作階段先驗 (即時語音)
+
+        Returns:
+            tuple: (Segment 的可迭代物件, 選定的語言, 機率)
+        """
+        model = self.models[self.default_model]
+        if self.use_faster_whisper:
+            segments, info = model.transcribe(audio_data, language=None, **options)
+            probabilities = dict(getattr(info, 'all_language_probs', None)
+                                 or [(info.language, info.language_probability)])
+            detected = info.language
+        else:
+            mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio_data), model.dims.n_mels)
+            _, probabilities = model.detect_language(mel.to(model.device))
+            segments = detected = None
+
+        language, probability = self.language_prior.choose(probabilities, session=session)
+        self.stats['language_detected'] += 1
+        logger.debug("偵測語言: %s (%.2f)", language, probability)
+
+        if detected == language and self.language_models.get(language, self.default_model) == self.default_model:
+            return self._wrap_faster_whisper(segments), language, probability
+
+        model = self.get_model(language)
+        if self.use_faster_whisper:
+            segments, _, _ = self._decode_faster_whisper(model, audio_data, language, options)
+        else:
+            segments, _, _ = self._decode_openai_whisper(model, audio_data, language, options)
+        return segments, language, probability
+
+    def _decode_faster_whisper(self, model, audio_data, language, options):
+        """使用 faster-whisper 識別，回傳惰性的 Segment 產生器及識別語言、機率"""
+        segments, info = model.transcribe(
             audio_data,
-            language=self.language,
-            beam_size=5,
-            vad_filter=True
+            language=language,
+            **options
         )
-        text = " ".join([segment.text for segment in segments]).strip()
-        return text
+        return self._wrap_faster_whisper(segments), info.language, info.language_probability
+
+    @staticmethod
+    def _wrap_faster_whisper(segments):
+        """將 faster-whisper 的片段惰性轉為 Segment"""
+        return (Segment(segment.start, segment.end, segment.text, len(segment.tokens),
+                        segment.avg_logprob, segment.no_speech_prob,
+                        None if segment.words is None else
+                        [Word(w.start, w.end, w.word, w.probability) for w in segment.words])
+                for segment in segments)
 
-    def _transcribe_openai_whisper(self, audio_data):
-        """使用 openai-whisper 識別"""
-        result = self.model.transcribe(
+    def _decode_openai_whisper(self, model, audio_data, language, options):
+        """使用 openai-whisper 識別，回傳 Segment 列表及識別語言 (不提供語言機率)"""
+        options = {
+            self._OPENAI_RENAMED_OPTIONS.get(key, key): value
+            for key, value in options.items()
+            if key not in self._OPENAI_UNSUPPORTED_OPTIONS
+        }
+        options.setdefault('fp16', False)
+        if isinstance(options.get('temperature'), list):
+            options['temperature'] = tuple(options['temperature'])
+
+        result = model.transcribe(
             audio_data,
-            language=self.language,
-            fp16=False
+            language=language,
+            **options
         )
-        return result["text"].strip()
+        segments = [Segment(segment["start"], segment["end"], segment["text"], len(segment["tokens"]),
+                            segment.get("avg_logprob"), segment.get("no_speech_prob"),
+                            None if "words" not in segment else
+                            [Word(w["start"], w["end"], w["word"], w.get("probability")) for w in segment["words"]])
+                    for segment in result["segments"]]
+        return segments, result.get("language", language), None
+
+    def _record_truncation(self, reason):
+        """記錄截斷事件"""
+        self.stats['truncated'] += 1
+        self.stats[reason] += 1
+        logger.warning("解碼已截斷 (%s)，回傳目前結果", reason)
+
+    def get_stats(self):
+        """獲取截斷事件統計、已載入的模型 (啟用快取時附帶快取統計)"""
+        stats = dict(self.stats)
+        stats['models'] = list(self.models)
+        if self.cache is not None:
+            stats['cache'] = self.cache.get_stats()
+        return stats
 
     def set_language(self, language):
         """
@@ -123,13 +809,14 @@ class ASREngine:
         Args:
             language: 語言代碼 (zh, yue, en)
         """
-        if language not in self.SUPPORTED_LANGUAGES:
-            print(f"不支援的語言: {language}")
+        if language not in self.SUPPORTED_LANGUAGES and language != self.AUTO_LANGUAGE:
+            logger.warning("不支援的語言: %s", language)
             return False
         
         self.language = language
-        lang_name = self.SUPPORTED_LANGUAGES[language]
-        print(f"已切換到 {lang_name} 識別模式")
+        # 手動切換後重新累積先驗
+        self.language_prior.reset()
+        logger.info("已切換到 %s 識別模式", self.get_language_name())
         return True
 
     def get_current_language(self):
@@ -138,4 +825,6 @@ class ASREngine:
 
     def get_language_name(self):
         """獲取當前語言名稱"""
+        if self.language == self.AUTO_LANGUAGE:
+            return self.AUTO_LANGUAGE_NAME
         return self.SUPPORTED_LANGUAGES.get(self.language, self.language)
@@ -0,0 +1,451 @@
+"""
+ASR 子行程模組
+在獨立行程中執行 ASREngine，避免解碼與 GUI / 音訊處理爭用同一個 GIL
+"""
+
+import time
+import queue
+import logging
+import itertools
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .asr import ASREngine, RecognitionResult, Segment
+from ..utils.logger import get_logger, setup_logger
+
+
+logger = get_logger("asr_process")
+
+
+def create_asr(asr_config, sample_rate=16000):
+    """
+    依配置建立 ASR 引擎，啟用 worker_process 時改為在子行程中執行
+
+    Args:
+        asr_config: 配置中的 asr 區段
+        sample_rate: 取樣率 (Hz)
+
+    Returns:
+        ASREngine 或 ASRProcessClient
+    """
+    process_config = asr_config.get('worker_process', {})
+    if not process_config.get('enabled', False):
+        return ASREngine.from_config(asr_config)
+
+    return ASRProcessClient(
+        asr_config,
+        slots=process_config.get('slots', 4),
+        max_utterance_seconds=process_config.get('max_utterance_seconds', 60),
+        sample_rate=sample_rate,
+        request_timeout=process_config.get('request_timeout', 60.0)
+    )
+
+
+class _RemoteStream:
+    """子行程識別串流，介面與 TranscriptionStream 相同"""
+
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.segments = []
+        self.truncated = False
+        self.reason = None
+        self.language = None
+        self.language_probability = None
+        self.decode_time = 0.0
+        self.slot = None
+        self.request = None
+        self.sent_at = None
+
+    def __iter__(self):
+        while True:
+            message = self.messages.get()
+            kind = message[0]
+
+            if kind == 'segment':
+                segment = Segment.from_tuple(message[1])
+                self.segments.append(segment)
+                yield segment
+            elif kind == 'done':
+                (self.truncated, self.reason, self.language,
+                 self.language_probability, self.decode_time) = message[1]
+                return
+            else:
+                raise RuntimeError(message[1])
+
+    @property
+    def text(self):
+        """識別文字"""
+        return " ".join(segment.text for segment in self.segments).strip()
+
+    @property
+    def result(self):
+        """識別結果"""
+        return RecognitionResult(
+            text=self.text,
+            segments=self.segments,
+            language=self.language,
+            language_probability=self.language_probability,
+            decode_time=self.decode_time,
+            truncated=self.truncated,
+            reason=self.reason
+        )
+
+
+class ASRProcessClient:
+    """
+    ASR 子行程用戶端
+
+    介面與 ASREngine 相同。音訊經由 shared_memory 的環形槽位傳遞（不經 pickle），
+    識別結果經由 Pipe 傳回。子行程當機或逾時時會自動重新啟動，進行中的請求以失敗結束；
+    重新啟動期間的新請求先排隊，新的子行程就緒後依序送出。
+    """
+
+    SUPPORTED_LANGUAGES = ASREngine.SUPPORTED_LANGUAGES
+
+    def __init__(self, asr_config, slots=4, max_utterance_seconds=60,
+                 sample_rate=16000, request_timeout=60.0):
+        """
+        初始化子行程並等待模型載入完成
+
+        Args:
+            asr_config: 配置中的 asr 區段
+            slots: 共享記憶體槽位數，即可同時排隊的請求數
+            max_utterance_seconds: 單一槽位可容納的最長語音 (秒)，超過時改以 Pipe 傳送
+            sample_rate: 取樣率 (Hz)
+            request_timeout: 單一請求的逾時 (秒)，逾時視為子行程卡死並重新啟動
+        """
+        self.asr_config = dict(asr_config)
+        self.language = asr_config.get('language', 'zh')
+        self.request_timeout = request_timeout
+
+        # 每個槽位存放一段 float32 音訊
+        self.slot_samples = int(max_utterance_seconds * sample_rate)
+        self.slot_bytes = self.slot_samples * np.dtype(np.float32).itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * self.slot_bytes)
+        self.free_slots = queue.Queue()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+
+        self.context = multiprocessing.get_context('spawn')
+        self.process = None
+        self.conn = None
+        self.pending = {}
+        self.request_ids = itertools.count()
+        self.lock = threading.Lock()
+        self.ready = False
+
+        self.engine_stats = {}
+        self.stats = {
+            'restarts': 0,
+            'timeouts': 0,
+            'pipe_transfers': 0
+        }
+
+        self.is_running = True
+        try:
+            self._start_worker(self.language)
+        except BaseException:
+            # 子行程啟動失敗時釋放共享記憶體，避免殘留在 /dev/shm
+            self.is_running = False
+            self.shm.close()
+            self.shm.unlink()
+            raise
+        self.ready = True
+
+        self.supervisor_thread = threading.Thread(target=self._supervise)
+        self.supervisor_thread.daemon = True
+        self.supervisor_thread.start()
+
+    def _start_worker(self, language):
+        """
+        啟動子行程並等待模型載入
+
+        Args:
+            language: 子行程的初始語言
+        """
+        logger.info("正在啟動 ASR 子行程...")
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn, self.shm.name, self.slot_bytes, self.asr_config, language,
+                  logging.getLevelName(get_logger().getEffectiveLevel())),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+
+        # 模型首次載入可能需要下載，只要子行程還活著就持續等待
+        try:
+            while not parent_conn.poll(0.5):
+                if not process.is_alive():
+                    raise EOFError
+            parent_conn.recv()
+        except EOFError:
+            process.join(timeout=1)
+            raise RuntimeError(f"ASR 子行程啟動失敗 (exit code {process.exitcode})")
+
+        self.process = process
+        self.conn = parent_conn
+        logger.info("ASR 子行程已就緒 (PID %d)", process.pid)
+
+    def _supervise(self):
+        """監督執行緒：接收子行程訊息，並在子行程當機或逾時時重新啟動"""
+        while self.is_running:
+            try:
+                if self.conn.poll(0.2):
+                    self._handle_message(self.conn.recv())
+                elif not self.process.is_alive():
+                    raise EOFError
+                elif self._request_expired():
+                    self.stats['timeouts'] += 1
+                    logger.error("ASR 子行程超過 %.0f 秒未回應，強制結束", self.request_timeout)
+                    self.process.terminate()
+                    raise EOFError
+            except (EOFError, OSError):
+                if self.is_running:
+                    self._restart()
+
+    def _handle_message(self, message):
+        """分派子行程傳回的訊息"""
+        kind, request_id = message[0], message[1]
+        message = (kind,) + tuple(message[2:])
+
+        if kind == 'segment':
+            stream = self.pending.get(request_id)
+        else:
+            with self.lock:
+                stream = self.pending.pop(request_id, None)
+            if stream is not None:
+                self._release_slot(stream)
+            if kind == 'done':
+                self.engine_stats = message[2]
+
+        if stream is not None:
+            stream.messages.put(message)
+
+    def _request_expired(self):
+        """是否有請求超過逾時"""
+        if not self.request_timeout:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            return any(stream.sent_at is not None and now - stream.sent_at > self.request_timeout
+                       for stream in self.pending.values())
+
+    def _restart(self):
+        """
+        重新啟動子行程
+
+        已送出的請求以失敗結束 (可能正是導致當機的請求，不重送)；
+        重新啟動期間的新請求留在 pending 中，新的子行程就緒後依序送出
+        """
+        with self.lock:
+            self.ready = False
+            pending, self.pending = self.pending, {}
+        for stream in pending.values():
+            self._release_slot(stream)
+            stream.messages.put(('error', "ASR 子行程已中止"))
+
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=2)
+        self.stats['restarts'] += 1
+        logger.error("ASR 子行程已中止 (exit code %s)，正在重新啟動...", self.process.exitcode)
+
+        while self.is_running:
+            language = self.language
+            try:
+                self._start_worker(language)
+                break
+            except Exception as e:
+                logger.error("ASR 子行程重新啟動失敗: %s", e)
+                time.sleep(1)
+        if not self.is_running:
+            return
+
+        with self.lock:
+            self.ready = True
+            if self.language != language:
+                self._send(('set_language', self.language))
+            queued = sorted(self.pending.items())
+            for _, stream in queued:
+                self._send_request(stream)
+        if queued:
+            logger.info("已送出重新啟動期間排隊的 %d 個請求", len(queued))
+
+    def _send_request(self, stream):
+        """送出識別請求並開始計算逾時 (需持有 lock)"""
+        stream.sent_at = time.monotonic()
+        self._send(stream.request)
+
+    def _release_slot(self, stream):
+        """歸還共享記憶體槽位"""
+        if stream.slot is not None:
+            self.free_slots.put(stream.slot)
+            stream.slot = None
+
+    def _send(self, message):
+        """傳送訊息到子行程，子行程已中止時由監督執行緒處理"""
+        try:
+            self.conn.send(message)
+        except (EOFError, OSError) as e:
+            logger.error("傳送到 ASR 子行程失敗: %s", e)
+
+    def transcribe(self, audio_data, **kwargs):
+        """
+        執行語音識別，參數與 ASREngine.transcribe 相同
+
+        Returns:
+            RecognitionResult: 識別結果
+        """
+        try:
+            stream = self.transcribe_iter(audio_data, **kwargs)
+            for _ in stream:
+                pass
+            return stream.result
+        except Exception as e:
+            logger.error("識別失敗: %s", e)
+            return RecognitionResult(language=self.language, error=str(e))
+
+    def transcribe_iter(self, audio_data, **kwargs):
+        """
+        串流識別，參數與 ASREngine.transcribe_iter 相同
+
+        Returns:
+            可迭代的識別串流，子行程每解碼完一段即產生一個 Segment
+        """
+        audio = np.asarray(audio_data, dtype=np.float32)
+        stream = _RemoteStream()
+
+        if len(audio) <= self.slot_samples:
+            # 寫入空閒槽位，所有槽位都在使用中時等待
+            stream.slot = self.free_slots.get()
+            offset = stream.slot * self.slot_bytes
+            np.ndarray(len(audio), dtype=np.float32, buffer=self.shm.buf, offset=offset)[:] = audio
+            payload = (stream.slot, len(audio))
+        else:
+            self.stats['pipe_transfers'] += 1
+            payload = audio.tobytes()
+
+        with self.lock:
+            request_id = next(self.request_ids)
+            stream.request = ('transcribe', request_id, payload, kwargs)
+            self.pending[request_id] = stream
+            # 子行程重新啟動中時先排隊，就緒後由 _restart 送出
+            if self.ready:
+                self._send_request(stream)
+        return stream
+
+    def set_language(self, language):
+        """
+        切換識別語言
+
+        Args:
+            language: 語言代碼 (zh, yue, en)
+        """
+        if language not in self.SUPPORTED_LANGUAGES and language != ASREngine.AUTO_LANGUAGE:
+            logger.warning("不支援的語言: %s", language)
+            return False
+
+        with self.lock:
+            self.language = language
+            # 重新啟動中時由 _restart 在子行程就緒後同步語言
+            if self.ready:
+                self._send(('set_language', language))
+        logger.info("已切換到 %s 識別模式", self.get_language_name())
+        return True
+
+    def get_current_language(self):
+        """獲取當前語言"""
+        return self.language
+
+    def get_language_name(self):
+        """獲取當前語言名稱"""
+        if self.language == ASREngine.AUTO_LANGUAGE:
+            return ASREngine.AUTO_LANGUAGE_NAME
+        return self.SUPPORTED_LANGUAGES.get(self.language, self.language)
+
+    def get_stats(self):
+        """獲取子行程 ASR 引擎的截斷統計及重新啟動次數"""
+        stats = dict(self.engine_stats)
+        stats.update(self.stats)
+        return stats
+
+    def close(self):
+        """結束子行程並釋放共享記憶體"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        with self.lock:
+            self._send(('stop',))
+        self.supervisor_thread.join(timeout=2)
+
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+
+        # 重新啟動中關閉時，排隊中的請求不會再有回應
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for stream in pending.values():
+            self._release_slot(stream)
+            stream.messages.put(('error', "ASR 子行程已關閉"))
+
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _worker_main(conn, shm_name, slot_bytes, asr_config, language, log_level="INFO"):
+    """子行程進入點"""
+    # spawn 的子行程不繼承父行程的日誌設定
+    setup_logger(level=log_level)
+
+    # 共享記憶體由父行程建立及釋放，子行程只附加使用
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    engine = ASREngine.from_config(asr_config, language=language)
+    conn.send(('ready',))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+
+        kind = message[0]
+        if kind == 'stop':
+            break
+        if kind == 'set_language':
+            engine.set_language(message[1])
+            continue
+
+        _, request_id, payload, kwargs = message
+        if isinstance(payload, bytes):
+            audio = np.frombuffer(payload, dtype=np.float32)
+        else:
+            slot, length = payload
+            audio = np.ndarray(length, dtype=np.float32, buffer=shm.buf, offset=slot * slot_bytes)
+
+        try:
+            stream = engine.transcribe_iter(audio, **kwargs)
+            for segment in stream:
+                conn.send(('segment', request_id, segment.to_tuple()))
+            result = stream.result
+            conn.send(('done', request_id,
+                       (result.truncated, result.reason, result.language,
+                        result.language_probability, result.decode_time),
+                       engine.get_stats()))
+        except Exception as e:
+            conn.send(('error', request_id, str(e)))
+        finally:
+            stream = None
+            audio = None
+
+    try:
+        shm.close()
+    except BufferError:
+        pass
@@ -0,0 +1,219 @@
+"""
+音訊存檔模組
+在背景執行緒中將識別過的語音片段寫入磁碟，供收集實際流量與除錯使用
+"""
+
+import os
+import re
+import json
+import time
+import wave
+import queue
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.logger import get_logger
+
+try:
+    import soundfile
+    HAS_SOUNDFILE = True
+except ImportError:
+    HAS_SOUNDFILE = False
+
+
+logger = get_logger("archive")
+
+
+class AudioArchive:
+    """
+    語音片段存檔
+
+    - submit 只把資料放入有上限的佇列，佇列已滿時直接丟棄，不阻塞識別執行緒
+    - 每段語音存成一個音訊檔 (WAV 或 FLAC) 及同名的 JSON 說明檔（識別文字、耗時等）
+    - 超過總大小或保存期限的舊檔案會被自動刪除
+    """
+
+    # 存檔的檔名 (不含副檔名)：時間戳_語音片段編號；存檔目錄可能與黑盒子等共用，只管理符合此格式的檔案
+    FILE_PATTERN = re.compile(r"\d{8}_\d{6}_\d{6,}")
+
+    def __init__(self, path="debug/", sample_rate=16000, audio_format="wav",
+                 max_pending=32, max_total_mb=500, max_age_hours=72):
+        """
+        初始化音訊存檔
+
+        Args:
+            path: 存檔目錄
+            sample_rate: 取樣率 (Hz)
+            audio_format: 音訊格式 (wav, flac)，flac 需要安裝 soundfile
+            max_pending: 等待寫入的片段上限，超過時丟棄新片段
+            max_total_mb: 存檔總大小上限 (MB)，0 為不限制
+            max_age_hours: 檔案保存期限 (小時)，0 為不限制
+        """
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.max_total_bytes = int(max_total_mb * 1024 * 1024)
+        self.max_age = max_age_hours * 3600
+
+        if audio_format == "flac" and not HAS_SOUNDFILE:
+            logger.warning("未安裝 soundfile，改以 WAV 格式存檔")
+            audio_format = "wav"
+        self.audio_format = audio_format
+
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.writer_thread = None
+        self.is_running = False
+
+        # 已存在的檔案 (修改時間, 大小, 路徑)，依時間排序，用於保存期限與容量管理
+        self.files = []
+        self.total_bytes = 0
+
+        # 統計資料
+        self.stats = {
+            'archived': 0,
+            'dropped': 0,
+            'errors': 0,
+            'deleted': 0
+        }
+
+    def start(self):
+        """啟動寫入執行緒"""
+        if self.is_running:
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._scan_existing()
+
+        self.is_running = True
+        self.writer_thread = threading.Thread(target=self._writer_loop)
+        self.writer_thread.daemon = True
+        self.writer_thread.start()
+
+    def stop(self):
+        """寫完佇列中的片段後停止寫入執行緒"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        self.queue.put(None)
+        self.writer_thread.join(timeout=5)
+
+    def submit(self, utterance_id, audio_data, metadata):
+        """
+        提交一段語音，不等待寫入
+
+        Args:
+            utterance_id: 語音片段編號
+            audio_data: 音訊資料 (bytes, int16 單聲道)
+            metadata: 寫入 JSON 說明檔的內容
+
+        Returns:
+            bool: 是否已放入佇列，未啟動或佇列已滿時回傳 False
+        """
+        if not self.is_running:
+            return False
+
+        try:
+            self.queue.put_nowait((utterance_id, audio_data, metadata))
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+
+    def _writer_loop(self):
+        """寫入執行緒"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            try:
+                self._write(*item)
+                self.stats['archived'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error("音訊存檔失敗: %s", e)
+
+            self._enforce_retention()
+
+    def _write(self, utterance_id, audio_data, metadata):
+        """寫入音訊檔及 JSON 說明檔"""
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(metadata.get('captured_at', time.time())))
+        base = self.path / f"{stamp}_{utterance_id:06d}"
+        audio_path = base.with_suffix(f".{self.audio_format}")
+        sidecar_path = base.with_suffix(".json")
+
+        if self.audio_format == "flac":
+            samples = np.frombuffer(audio_data, dtype=np.int16)
+            soundfile.write(str(audio_path), samples, self.sample_rate, format='FLAC', subtype='PCM_16')
+        else:
+            with wave.open(str(audio_path), 'wb') as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(self.sample_rate)
+                wf.writeframes(audio_data)
+
+        record = dict(metadata)
+        record['utterance_id'] = utterance_id
+        record['audio_file'] = audio_path.name
+        record['sample_rate'] = self.sample_rate
+        with open(sidecar_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+
+        size = audio_path.stat().st_size + sidecar_path.stat().st_size
+        self.files.append((time.time(), size, (audio_path, sidecar_path)))
+        self.total_bytes += size
+
+    def _scan_existing(self):
+        """載入目錄中既有的存檔，讓重新啟動後仍套用容量與期限限制"""
+        self.files = []
+        self.total_bytes = 0
+
+        for sidecar_path in self.path.glob("*.json"):
+            if not self.FILE_PATTERN.fullmatch(sidecar_path.stem):
+                continue
+            paths = [sidecar_path] + [p for p in (sidecar_path.with_suffix(".wav"),
+                                                  sidecar_path.with_suffix(".flac"))
+                                      if p.exists()]
+            try:
+                mtime = sidecar_path.stat().st_mtime
+                size = sum(p.stat().st_size for p in paths)
+            except OSError:
+                continue
+            self.files.append((mtime, size, tuple(paths)))
+            self.total_bytes += size
+
+        self.files.sort(key=lambda entry: entry[0])
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        """刪除超過保存期限或超出總大小的最舊檔案"""
+        now = time.time()
+        while self.files:
+            mtime, size, paths = self.files[0]
+            expired = self.max_age and now - mtime > self.max_age
+            oversized = self.max_total_bytes and self.total_bytes > self.max_total_bytes
+            if not (expired or oversized):
+                break
+
+            self.files.pop(0)
+            self.total_bytes -= size
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.stats['deleted'] += 1
+
+    def get_stats(self):
+        """
+        獲取存檔統計
+
+        Returns:
+            dict: 已存檔、丟棄、失敗、刪除的片段數，待寫入數及存檔總大小
+        """
+        stats = dict(self.stats)
+        stats['pending'] = self.queue.qsize()
+        stats['total_bytes'] = self.total_bytes
+        return stats
@@ -0,0 +1,241 @@
+"""
+音訊檔案模組
+讀取錄音檔並轉為識別所需的單聲道 float32 格式
+"""
+
+import mmap
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from .resampler import FrameConverter, StreamingResampler, downmix
+
+try:
+    from faster_whisper import decode_audio
+    HAS_FASTER_WHISPER = True
+except ImportError:
+    HAS_FASTER_WHISPER = False
+
+try:
+    import whisper
+    HAS_WHISPER = True
+except ImportError:
+    HAS_WHISPER = False
+
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.flac', '.ogg', '.opus', '.aac', '.mp4', '.mkv', '.webm')
+
+
+def find_audio_files(paths, extensions=AUDIO_EXTENSIONS):
+    """
+    展開檔案及目錄為音訊檔案列表
+
+    Args:
+        paths: 檔案或目錄路徑列表，目錄會遞迴搜尋
+        extensions: 視為音訊檔的副檔名
+
+    Returns:
+        list: 排序後的音訊檔案路徑 (Path)
+    """
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(p for p in path.rglob('*') if p.suffix.lower() in extensions)
+        elif path.exists():
+            files.append(path)
+    return sorted(set(files))
+
+
+class WavReader:
+    """
+    記憶體映射的 16-bit PCM WAV 讀取器
+
+    PCM 資料以 mmap 映射，切片是零複製的 int16 檢視，由作業系統按需分頁載入；
+    只有實際要處理的區段才轉成 float32，常駐記憶體不隨檔案長度增加。
+    混音與重取樣沿用即時擷取的 FrameConverter / StreamingResampler。
+    """
+
+    # WAVE_FORMAT_PCM / WAVE_FORMAT_EXTENSIBLE
+    _PCM = 0x0001
+    _EXTENSIBLE = 0xFFFE
+
+    def __init__(self, path):
+        """
+        開啟 WAV 檔
+
+        Args:
+            path: 檔案路徑
+
+        Raises:
+            ValueError: 不是 16-bit PCM WAV
+        """
+        self.path = str(path)
+        self._file = open(self.path, 'rb')
+        try:
+            offset, size = self._parse_header()
+            self.frames = size // (2 * self.channels)
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.frames else None
+        except Exception:
+            self._file.close()
+            raise
+
+        # (樣本數, 聲道數) 的唯讀 int16 檢視
+        if self._mmap is not None:
+            self.samples = np.frombuffer(self._mmap, dtype='<i2', count=self.frames * self.channels,
+                                         offset=offset).reshape(-1, self.channels)
+        else:
+            self.samples = np.zeros((0, self.channels), dtype=np.int16)
+
+    def _parse_header(self):
+        """解析 RIFF 標頭，回傳 PCM 資料的位移與長度"""
+        riff, _, wave_id = struct.unpack('<4sI4s', self._file.read(12).ljust(12, b'\0'))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f"不是 WAV 檔: {self.path}")
+
+        file_size = Path(self.path).stat().st_size
+        fmt = None
+        while True:
+            header = self._file.read(8)
+            if len(header) < 8:
+                raise ValueError(f"WAV 檔缺少 data 區塊: {self.path}")
+            chunk_id, size = struct.unpack('<4sI', header)
+
+            if chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"WAV 檔缺少 fmt 區塊: {self.path}")
+                offset = self._file.tell()
+                # 串流錄製的檔案可能沒有回填長度，以實際檔案大小為準
+                return offset, min(size, file_size - offset)
+
+            data = self._file.read(size + (size & 1))
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack('<HHIIHH', data[:16])
+                tag, self.channels, self.sample_rate, _, _, bits = fmt
+                if tag == self._EXTENSIBLE and len(data) >= 26:
+                    tag = struct.unpack('<H', data[24:26])[0]
+                if tag != self._PCM or bits != 16 or not self.channels:
+                    raise ValueError(f"只支援 16-bit PCM WAV: {self.path}")
+
+    @property
+    def duration(self):
+        """音訊長度 (秒)"""
+        return self.frames / self.sample_rate
+
+    def view(self, start=0, end=None):
+        """
+        取得原生格式的零複製檢視
+
+        Args:
+            start: 起始樣本 (檔案取樣率)
+            end: 結束樣本 (不含)，None 為檔案結尾
+
+        Returns:
+            numpy.ndarray: (樣本數, 聲道數) 的 int16 檢視
+        """
+        return self.samples[start:end]
+
+    def iter_frames(self, sample_rate=16000, frame_size=480, block_seconds=30):
+        """
+        以即時擷取相同的轉換流程逐區塊產生 VAD 幀
+
+        Args:
+            sample_rate: 輸出取樣率 (Hz)
+            frame_size: 幀大小 (樣本數)
+            block_seconds: 每次轉換的區塊長度 (秒)
+
+        Yields:
+            numpy.ndarray: 單聲道 int16 的整數幀；16kHz 單聲道檔案為零複製檢視
+        """
+        converter = FrameConverter(self.sample_rate, self.channels, sample_rate, frame_size)
+        # 直通時區塊需為整數幀才能直接回傳檢視
+        block = int(self.sample_rate * block_seconds) // frame_size * frame_size or frame_size
+        for start in range(0, self.frames, block):
+            yield converter.convert(self.samples[start:start + block].reshape(-1)).reshape(-1)
+
+    def read(self, start=0.0, end=None, sample_rate=16000, block_seconds=30):
+        """
+        讀取一段音訊並轉為單聲道 float32
+
+        只有這段的樣本被轉換，暫存記憶體以 block_seconds 為上限；
+        從檔案中間開始時以前面的樣本預熱重取樣濾波器，結果與整段處理相同
+
+        Args:
+            start: 起始時間 (秒)
+            end: 結束時間 (秒)，None 為檔案結尾
+            sample_rate: 輸出取樣率 (Hz)
+            block_seconds: 每次轉換的區塊長度 (秒)
+
+        Returns:
+            numpy.ndarray: 單聲道 float32 音訊，範圍 [-1, 1]
+        """
+        first = min(self.frames, max(0, int(round(start * self.sample_rate))))
+        last = self.frames if end is None else min(self.frames, max(first, int(round(end * self.sample_rate))))
+
+        resampler = StreamingResampler(self.sample_rate, sample_rate)
+        if not resampler.passthrough and first:
+            history = self.samples[max(0, first - resampler.taps + 1):first].reshape(-1)
+            resampler.prime(downmix(history.astype(np.float32), self.channels) / 32768.0)
+
+        # 輸出長度可事先算出，直接填入避免串接時的複本
+        count = last - first
+        if not resampler.passthrough:
+            count = -(-count * resampler.up // resampler.down)
+        output = np.empty(count, dtype=np.float32)
+
+        position = 0
+        block = max(1, int(self.sample_rate * block_seconds))
+        for offset in range(first, last, block):
+            samples = self.samples[offset:min(offset + block, last)].reshape(-1).astype(np.float32)
+            converted = resampler.process(downmix(samples, self.channels) / 32768.0)
+            output[position:position + len(converted)] = converted
+            position += len(converted)
+        return output[:position]
+
+    def close(self):
+        """關閉檔案"""
+        self.samples = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # 仍有檢視在使用中，映射在最後一個檢視釋放後才解除
+                pass
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_audio(path, sample_rate=16000):
+    """
+    讀取音訊檔
+
+    16-bit PCM WAV 以記憶體映射讀取並以與即時擷取相同的方式混音、重取樣；
+    其他格式交由 Whisper 套件解碼 (需要 ffmpeg / PyAV)
+
+    Args:
+        path: 音訊檔路徑
+        sample_rate: 輸出取樣率 (Hz)
+
+    Returns:
+        numpy.ndarray: 單聲道 float32 音訊，範圍 [-1, 1]
+    """
+    path = str(path)
+    if path.lower().endswith('.wav'):
+        try:
+            with WavReader(path) as reader:
+                return reader.read(sample_rate=sample_rate)
+        except ValueError:
+            pass
+
+    if HAS_FASTER_WHISPER:
+        return decode_audio(path, sampling_rate=sample_rate)
+    if HAS_WHISPER and sample_rate == whisper.audio.SAMPLE_RATE:
+        return whisper.load_audio(path)
+    raise RuntimeError(f"無法讀取 {path}: 只支援 16-bit PCM WAV，其他格式需要安裝 faster-whisper")
+
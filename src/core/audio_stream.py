@@ -3,55 +3,147 @@
 負責音訊採集和流管理
 """
 
-import pyaudio
 import wave
-from collections import deque
+import threading
+
+from .ring_buffer import FrameRing
+from .resampler import FrameConverter
+from ..utils.logger import get_logger
+
+try:
+    import pyaudio
+    HAS_PYAUDIO = True
+except ImportError:
+    HAS_PYAUDIO = False
+
+
+logger = get_logger("audio")
 
 
 class AudioStream:
     """音訊流管理器"""
 
-    def __init__(self, sample_rate=16000, frame_size=480, channels=1):
+    def __init__(self, sample_rate=16000, frame_size=480, channels=1, ring_frames=200,
+                 device_index=None, device_rate=None, device_channels=None, resample_quality=32):
         """
         初始化音訊流
 
         Args:
-            sample_rate: 取樣率 (Hz)
-            frame_size: 幀大小
-            channels: 聲道數
+            sample_rate: 輸出取樣率 (Hz)
+            frame_size: 輸出幀大小 (樣本數)
+            channels: 優先使用的擷取聲道數
+            ring_frames: 回呼與處理執行緒之間的環形緩衝幀數
+            device_index: 輸入裝置編號 (None 為系統預設)
+            device_rate: 裝置取樣率 (None 為自動: 支援輸出格式時直接使用，否則使用裝置原生取樣率)
+            device_channels: 裝置聲道數 (None 為自動)
+            resample_quality: 重取樣濾波器長度
         """
         self.sample_rate = sample_rate
         self.frame_size = frame_size
         self.channels = channels
+        self.device_index = device_index
+        self.ring_frames = ring_frames
+        self.resample_quality = resample_quality
+
+        if not HAS_PYAUDIO:
+            raise RuntimeError("未安裝 PyAudio，請執行: pip install pyaudio")
 
         self.audio = pyaudio.PyAudio()
         self.stream = None
         self.is_running = False
 
-        # 音訊緩衝
-        self.audio_buffer = deque(maxlen=100)
+        # 裝置格式在 start 時才決定 (指定值或 None 為自動)，建立物件及列出裝置不需要預設輸入裝置
+        self.device_rate = device_rate
+        self.device_channels = device_channels
+        self.block_size = None
+        self.converter = None
+        self.ring = None
+        self.frame_ready = threading.Event()
+        self.process_thread = None
+        self.reported_drops = 0
+
+        # 統計資料
+        self.stats = {
+            'frames': 0,
+            'input_overflows': 0,
+            'input_underflows': 0,
+            'dropped_frames': 0
+        }
 
         # 回呼函式
         self.on_audio_frame = None
 
+    def _select_device_format(self, device_rate, device_channels):
+        """
+        決定裝置的擷取格式
+
+        Args:
+            device_rate: 指定的裝置取樣率，None 為自動
+            device_channels: 指定的裝置聲道數，None 為自動
+
+        Returns:
+            (取樣率, 聲道數)
+        """
+        if self.device_index is None:
+            info = self.audio.get_default_input_device_info()
+        else:
+            info = self.audio.get_device_info_by_index(self.device_index)
+
+        if device_rate is None and device_channels is None:
+            try:
+                if self.audio.is_format_supported(self.sample_rate,
+                                                  input_device=info['index'],
+                                                  input_channels=self.channels,
+                                                  input_format=pyaudio.paInt16):
+                    return self.sample_rate, self.channels
+            except ValueError:
+                pass
+
+        rate = device_rate or int(info['defaultSampleRate'])
+        channels = device_channels or min(max(1, int(info['maxInputChannels'])), 2)
+        return rate, channels
+
+    def _prepare_capture(self):
+        """決定裝置格式並建立格式轉換器及環形緩衝"""
+        # 裝置以原生格式開啟，在處理執行緒中混音、重取樣並切成固定長度的幀
+        self.device_rate, self.device_channels = self._select_device_format(self.device_rate,
+                                                                            self.device_channels)
+        self.block_size = round(self.frame_size * self.device_rate / self.sample_rate)
+        self.converter = FrameConverter(self.device_rate, self.device_channels,
+                                        self.sample_rate, self.frame_size, self.resample_quality)
+        if not self.converter.passthrough:
+            logger.info("擷取裝置格式 %d Hz / %d 聲道，轉換為 %d Hz 單聲道",
+                        self.device_rate, self.device_channels, self.sample_rate)
+
+        # 回呼執行緒只把資料複製進環形緩衝，其餘處理交給處理執行緒
+        self.ring = FrameRing(self.ring_frames, self.block_size * self.device_channels * 2)
+
     def start(self):
         """啟動音訊流"""
         if self.is_running:
             return
 
+        if self.ring is None:
+            self._prepare_capture()
+
         self.is_running = True
 
         self.stream = self.audio.open(
             format=pyaudio.paInt16,
-            channels=self.channels,
-            rate=self.sample_rate,
+            channels=self.device_channels,
+            rate=self.device_rate,
             input=True,
-            frames_per_buffer=self.frame_size,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.block_size,
             stream_callback=self._audio_callback
         )
 
+        self.process_thread = threading.Thread(target=self._process_loop)
+        self.process_thread.daemon = True
+        self.process_thread.start()
+
         self.stream.start_stream()
-        print("音訊流已啟動")
+        logger.info("音訊流已啟動")
 
     def stop(self):
         """停止音訊流"""
@@ -64,19 +156,67 @@ class AudioStream:
             self.stream.stop_stream()
             self.stream.close()
 
+        self.frame_ready.set()
+        if self.process_thread:
+            self.process_thread.join(timeout=2)
+
         self.audio.terminate()
-        print("音訊流已停止")
+        logger.info("音訊流已停止")
 
     def _audio_callback(self, in_data, frame_count, time_info, status):
-        """音訊流回呼"""
-        if self.is_running:
-            self.audio_buffer.append(in_data)
+        """
+        音訊流回呼
 
-            # 觸發外部回呼
-            if self.on_audio_frame:
-                self.on_audio_frame(in_data)
+        在 PortAudio 的即時執行緒中執行，只記錄狀態旗標並複製資料，
+        不做任何可能阻塞的處理
+        """
+        if status & pyaudio.paInputOverflow:
+            self.stats['input_overflows'] += 1
+        if status & pyaudio.paInputUnderflow:
+            self.stats['input_underflows'] += 1
 
-        return (in_data, pyaudio.paContinue)
+        if self.is_running:
+            if self.ring.write(in_data):
+                self.frame_ready.set()
+            else:
+                self.stats['dropped_frames'] += 1
+
+        return (None, pyaudio.paContinue)
+
+    def _process_loop(self):
+        """處理執行緒：從環形緩衝取出擷取區塊，轉換為固定長度的幀並觸發外部回呼"""
+        while self.is_running:
+            self.frame_ready.wait(timeout=0.1)
+            self.frame_ready.clear()
+
+            while True:
+                block = self.ring.read()
+                if block is None:
+                    break
+
+                for frame in self.converter.process(block):
+                    self.stats['frames'] += 1
+
+                    # 觸發外部回呼
+                    if self.on_audio_frame:
+                        self.on_audio_frame(frame)
+
+            # 回呼執行緒不能記錄日誌，丟幀改在處理執行緒中回報
+            dropped = self.stats['dropped_frames'] - self.reported_drops
+            if dropped:
+                self.reported_drops += dropped
+                logger.warning("環形緩衝已滿，丟棄 %d 幀音訊", dropped)
+
+    def get_stats(self):
+        """
+        獲取音訊流統計
+
+        Returns:
+            dict: 處理幀數、輸入溢位/欠位次數、因緩衝已滿而丟棄的幀數
+        """
+        stats = dict(self.stats)
+        stats['buffered_frames'] = len(self.ring) if self.ring is not None else 0
+        return stats
 
     def save_audio(self, filename, audio_data):
         """
@@ -84,10 +224,10 @@ class AudioStream:
 
         Args:
             filename: 檔案名稱
-            audio_data: 音訊資料 (bytes)
+            audio_data: 音訊資料 (bytes, 輸出格式的單聲道)
         """
         with wave.open(filename, 'wb') as wf:
-            wf.setnchannels(self.channels)
+            wf.setnchannels(1)
             wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
             wf.setframerate(self.sample_rate)
             wf.writeframes(audio_data)
@@ -101,6 +241,7 @@ class AudioStream:
                 devices.append({
                     'index': i,
                     'name': info['name'],
-                    'channels': info['maxInputChannels']
+                    'channels': info['maxInputChannels'],
+                    'sample_rate': int(info['defaultSampleRate'])
                 })
         return devices
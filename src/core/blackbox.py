@@ -0,0 +1,194 @@
+"""
+黑盒錄音模組
+以記憶體映射的環形檔案持續保存最近 N 分鐘的原始音訊、VAD 判斷及串流索引，
+供事後擷取任意時段並重新送入識別流程
+"""
+
+import mmap
+import struct
+import time
+from pathlib import Path
+
+from ..utils.logger import get_logger
+
+
+logger = get_logger("blackbox")
+
+# 檔頭: magic, 版本, 取樣率, 每幀位元組數, 容量 (幀), 已寫入幀數
+_HEADER = struct.Struct('<8sIIIIQ')
+_HEADER_SIZE = 64
+_MAGIC = b'ASRBBOX1'
+_VERSION = 1
+
+# 每幀記錄: 串流索引, 牆上時間, 旗標, 音訊長度
+_RECORD = struct.Struct('<QdBxH4x')
+
+FLAG_SPEECH = 0x01
+FLAG_IN_UTTERANCE = 0x02
+
+
+class BlackBoxRecorder:
+    """
+    黑盒錄音器
+
+    檔案大小在建立時固定，寫滿後從頭覆寫最舊的幀，記憶體與磁碟用量恆定。
+    每幀只做一次循序寫入，由音訊處理執行緒呼叫。
+    重新啟動時若檔案格式相符會接續寫入，保留先前的錄音。
+    """
+
+    def __init__(self, path, sample_rate=16000, frame_bytes=960, minutes=10, frame_duration=30):
+        """
+        初始化黑盒錄音器
+
+        Args:
+            path: 環形檔案路徑
+            sample_rate: 取樣率 (Hz)
+            frame_bytes: 每幀音訊位元組數
+            minutes: 保留的錄音長度 (分鐘)
+            frame_duration: 每幀時長 (毫秒)
+        """
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.frame_bytes = frame_bytes
+        self.capacity = max(1, int(minutes * 60 * 1000 / frame_duration))
+        self.record_size = _RECORD.size + frame_bytes
+
+        self.file = None
+        self.map = None
+        self.write_index = 0
+
+    def open(self):
+        """開啟或建立環形檔案"""
+        if self.map is not None:
+            return
+
+        size = _HEADER_SIZE + self.capacity * self.record_size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        resume = self.path.exists() and self.path.stat().st_size == size
+        self.file = open(self.path, 'r+b' if resume else 'w+b')
+        if not resume:
+            self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+
+        header = _HEADER.unpack_from(self.map, 0)
+        if resume and header[:5] == (_MAGIC, _VERSION, self.sample_rate, self.frame_bytes, self.capacity):
+            self.write_index = header[5]
+            logger.info("黑盒錄音接續寫入: %s", self.path, extra={'frames': self.write_index})
+        else:
+            self.write_index = 0
+            self._write_header()
+            logger.info("黑盒錄音已建立: %s", self.path, extra={'size_mb': size / 1024 / 1024})
+
+    def _write_header(self):
+        """更新檔頭中的已寫入幀數"""
+        _HEADER.pack_into(self.map, 0, _MAGIC, _VERSION, self.sample_rate,
+                          self.frame_bytes, self.capacity, self.write_index)
+
+    def write(self, frame, is_speech, in_utterance):
+        """
+        寫入一幀
+
+        Args:
+            frame: 音訊幀 (bytes)
+            is_speech: VAD 是否判斷為語音
+            in_utterance: 是否位於語音片段中
+        """
+        if self.map is None:
+            return
+
+        offset = _HEADER_SIZE + (self.write_index % self.capacity) * self.record_size
+        length = min(len(frame), self.frame_bytes)
+        flags = (FLAG_SPEECH if is_speech else 0) | (FLAG_IN_UTTERANCE if in_utterance else 0)
+
+        _RECORD.pack_into(self.map, offset, self.write_index, time.time(), flags, length)
+        start = offset + _RECORD.size
+        self.map[start:start + length] = frame[:length]
+
+        self.write_index += 1
+        self._write_header()
+
+    def close(self):
+        """寫回磁碟並關閉檔案"""
+        if self.map is None:
+            return
+
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+        self.map = None
+        self.file = None
+
+
+class BlackBoxReader:
+    """讀取黑盒錄音檔"""
+
+    def __init__(self, path):
+        """
+        開啟黑盒錄音檔 (唯讀)
+
+        Args:
+            path: 環形檔案路徑
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.sample_rate, self.frame_bytes, self.capacity, self.write_index = \
+            _HEADER.unpack_from(self.map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.map.close()
+            raise ValueError(f"不是黑盒錄音檔: {path}")
+
+        self.record_size = _RECORD.size + self.frame_bytes
+
+    def __len__(self):
+        """檔案中保存的幀數"""
+        return min(self.write_index, self.capacity)
+
+    def frames(self, start_time=None, end_time=None):
+        """
+        依時間順序讀取幀
+
+        Args:
+            start_time: 起始牆上時間 (time.time())，None 為最舊的幀
+            end_time: 結束牆上時間，None 為最新的幀
+
+        Yields:
+            (stream_index, wall_time, flags, frame)
+        """
+        first = self.write_index - len(self)
+        for index in range(first, self.write_index):
+            stream_index, wall_time, flags, length = self._record_at(index)
+            if stream_index != index:
+                # 寫入中途中止的幀
+                continue
+            if start_time is not None and wall_time < start_time:
+                continue
+            if end_time is not None and wall_time > end_time:
+                break
+
+            start = _HEADER_SIZE + (index % self.capacity) * self.record_size + _RECORD.size
+            yield stream_index, wall_time, flags, self.map[start:start + length]
+
+    def time_range(self):
+        """
+        錄音涵蓋的牆上時間範圍
+
+        Returns:
+            (最舊幀時間, 最新幀時間)，沒有資料時回傳 None
+        """
+        if not len(self):
+            return None
+        oldest = self._record_at(self.write_index - len(self))
+        newest = self._record_at(self.write_index - 1)
+        return oldest[1], newest[1]
+
+    def _record_at(self, index):
+        """讀取指定串流索引的幀記錄 (不含音訊)"""
+        offset = _HEADER_SIZE + (index % self.capacity) * self.record_size
+        return _RECORD.unpack_from(self.map, offset)
+
+    def close(self):
+        """關閉檔案"""
+        self.map.close()
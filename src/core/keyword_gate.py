@@ -0,0 +1,74 @@
+"""
+喚醒詞閘門模組
+以小模型只識別語音片段的開頭，提到關鍵字時才交給主模型完整識別
+"""
+
+import re
+
+from ..utils.logger import get_logger
+
+
+logger = get_logger("gate")
+
+
+class KeywordGate:
+    """
+    關鍵字閘門
+
+    持續開啟的麥克風大部分時間收到的是與 VTuber 無關的聊天。閘門用 tiny 等小模型
+    只解碼每段語音開頭的 1-2 秒，開頭沒有提到任一關鍵字的片段就不送進主模型，
+    檢查的成本遠低於完整識別。
+    """
+
+    def __init__(self, asr, keywords, seconds=1.5, sample_rate=16000, profile='realtime'):
+        """
+        初始化閘門
+
+        Args:
+            asr: 檢查用的 ASR 引擎 (通常為 tiny 模型)
+            keywords: 關鍵字列表，比對時忽略大小寫、空白及標點
+            seconds: 只識別每段語音開頭的秒數
+            sample_rate: 取樣率 (Hz)
+            profile: 檢查用的解碼設定
+
+        Raises:
+            ValueError: 沒有設定任何關鍵字
+        """
+        self.asr = asr
+        self.keywords = [keyword for keyword in map(self.normalize, keywords or ()) if keyword]
+        if not self.keywords:
+            raise ValueError("喚醒詞模式需要設定至少一個關鍵字 (asr.gate.keywords)")
+        self.samples = int(seconds * sample_rate)
+        self.profile = profile
+
+    @staticmethod
+    def normalize(text):
+        """移除空白及標點並轉為小寫"""
+        return re.sub(r'[\W_]+', '', text).lower()
+
+    def check(self, audio, language=None):
+        """
+        檢查語音片段開頭是否提到關鍵字
+
+        檢查用的模型解碼失敗時放行，交由主模型處理
+
+        Args:
+            audio: 單聲道 float32 音訊
+            language: 此段語音的語言 (可選，預設為檢查用模型目前的語言)
+
+        Returns:
+            tuple: (是否放行, 開頭的識別結果)
+        """
+        result = self.asr.transcribe(audio[:self.samples], profile=self.profile, source='live',
+                                     language=language)
+        if result.error:
+            logger.warning("喚醒詞檢查失敗，直接交給主模型: %s", result.error)
+            return True, result
+
+        text = self.normalize(result.text)
+        return any(keyword in text for keyword in self.keywords), result
+
+    def close(self):
+        """關閉檢查用的 ASR 引擎"""
+        if hasattr(self.asr, 'close'):
+            self.asr.close()
@@ -0,0 +1,94 @@
+"""
+語言識別模組
+自動偵測語言時限制在支援的語言內，並以工作階段的語言先驗穩定判斷
+"""
+
+import threading
+
+
+class LanguagePrior:
+    """
+    工作階段語言先驗
+
+    同一個直播或對話中語言很少改變。先驗是最近幾段語音偵測結果的指數移動平均：
+
+    - 短語音的偵測不可靠且相對成本高，先驗夠明確時直接沿用最近的語言，不再偵測
+    - 較長的語音照常偵測，偵測機率乘上先驗後再取最大者，單次誤判不會立刻切換語言，
+      明確說了另一種語言時仍會切換
+    """
+
+    # 先驗的平滑量，避免先驗為 0 的語言永遠無法被選中
+    SMOOTHING = 0.1
+
+    def __init__(self, languages, min_seconds=2.0, decay=0.7, confidence=0.8):
+        """
+        初始化先驗
+
+        Args:
+            languages: 可選的語言代碼
+            min_seconds: 短於此長度 (秒) 的語音在先驗夠明確時沿用最近的語言
+            decay: 舊先驗的保留比例 (0-1)，越大越不容易切換語言
+            confidence: 沿用最近語言所需的先驗機率
+        """
+        self.languages = tuple(languages)
+        self.min_seconds = min_seconds
+        self.decay = decay
+        self.confidence = confidence
+        self.weights = None
+        self.lock = threading.Lock()
+
+    def inherit(self, seconds):
+        """
+        短語音沿用最近的語言
+
+        Args:
+            seconds: 語音長度 (秒)
+
+        Returns:
+            str: 沿用的語言代碼，需要偵測時為 None
+        """
+        with self.lock:
+            if self.weights is None or seconds >= self.min_seconds:
+                return None
+            language, weight = max(self.weights.items(), key=lambda item: item[1])
+        return language if weight >= self.confidence else None
+
+    def choose(self, probabilities, session=True):
+        """
+        在支援的語言中選出最可能的語言
+
+        Args:
+            probabilities: 偵測結果 {語言代碼: 機率}，可包含不支援的語言
+            session: 是否套用先驗並以此結果更新 (互不相關的檔案不使用先驗)
+
+        Returns:
+            tuple: (語言代碼, 機率)，機率為限制在支援的語言並套用先驗後的值
+        """
+        scores = {language: probabilities.get(language, 0.0) for language in self.languages}
+        with self.lock:
+            if session and self.weights is not None:
+                scores = {language: score * (self.SMOOTHING + self.weights[language])
+                          for language, score in scores.items()}
+
+            total = sum(scores.values())
+            if total <= 0:
+                # 偵測結果全部落在不支援的語言時沿用最近的語言
+                weights = (session and self.weights) or {language: 1.0 for language in self.languages}
+                language = max(weights, key=weights.get)
+                return language, 0.0
+
+            posterior = {language: score / total for language, score in scores.items()}
+            if session:
+                if self.weights is None:
+                    self.weights = posterior
+                else:
+                    self.weights = {language: self.decay * self.weights[language] + (1 - self.decay) * prob
+                                    for language, prob in posterior.items()}
+
+        language = max(posterior, key=posterior.get)
+        return language, posterior[language]
+
+    def reset(self):
+        """清除先驗 (例如使用者手動切換語言時)"""
+        with self.lock:
+            self.weights = None
@@ -0,0 +1,181 @@
+"""
+重取樣模組
+串流式多相重取樣與聲道混音，將擷取裝置的原生格式轉為 VAD 所需的固定長度幀
+"""
+
+from math import gcd
+
+import numpy as np
+
+
+def downmix(samples, channels):
+    """
+    交錯多聲道樣本平均為單聲道
+
+    Args:
+        samples: 交錯樣本 (float32 一維陣列)
+        channels: 聲道數
+
+    Returns:
+        numpy.ndarray: 單聲道樣本，不完整的最後一組樣本捨棄
+    """
+    if channels <= 1:
+        return samples
+    samples = samples[:len(samples) // channels * channels]
+    return samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+
+
+class StreamingResampler:
+    """
+    串流多相重取樣器
+
+    以有理數比例 L/M 重取樣，FIR 濾波器在建立時設計完成。
+    區塊之間保留輸入歷史與輸出計數，輸出樣本位置以整數計算，
+    任意切塊方式的結果都與一次處理整段相同，不會累積漂移。
+    """
+
+    def __init__(self, in_rate, out_rate, quality=32):
+        """
+        初始化重取樣器
+
+        Args:
+            in_rate: 輸入取樣率 (Hz)
+            out_rate: 輸出取樣率 (Hz)
+            quality: 濾波器長度 (以較低取樣率的樣本數計)，越長過渡帶越陡峭但越耗時
+        """
+        divisor = gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // divisor
+        self.down = int(in_rate) // divisor
+        self.passthrough = self.up == self.down
+
+        # 每個相位的濾波器長度，降取樣時需隨比例加長才能有效抑制混疊
+        self.taps = -(-quality * max(self.up, self.down) // self.up)
+
+        if not self.passthrough:
+            self.phases = self._design_filter()
+
+        # 串流狀態: 上一區塊結尾的輸入樣本、已消耗的輸入數及已產生的輸出數
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.consumed = 0
+        self.produced = 0
+
+    def _design_filter(self):
+        """設計 Kaiser 視窗的低通濾波器並拆成多相"""
+        length = self.taps * self.up
+        # 截止頻率取輸入與輸出 Nyquist 中較低者，留 10% 過渡帶
+        cutoff = 0.5 / max(self.up, self.down) * 0.9
+        n = np.arange(length) - (length - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, 8.6)
+        h *= self.up / h.sum()
+
+        # phases[p, k] = h[p + k * up]
+        return h.reshape(self.taps, self.up).T.astype(np.float32)
+
+    def prime(self, samples):
+        """
+        以前一段輸入作為濾波歷史，從檔案中間開始重取樣時使用，
+        結果與從頭處理到該位置相同 (需先於 process 呼叫)
+
+        Args:
+            samples: 起點之前的輸入樣本 (float32)，只使用最後 taps - 1 個
+        """
+        if self.passthrough or self.taps <= 1:
+            return
+        tail = np.asarray(samples, dtype=np.float32)[-(self.taps - 1):]
+        self.history = np.concatenate((self.history[len(tail):], tail))
+
+    def process(self, samples):
+        """
+        重取樣一個區塊
+
+        Args:
+            samples: 輸入樣本 (float32 一維陣列)
+
+        Returns:
+            numpy.ndarray: 輸出樣本 (float32)
+        """
+        if self.passthrough:
+            return samples
+
+        buffer = np.concatenate((self.history, samples))
+        total = self.consumed + len(samples)
+
+        # 產生所有對應輸入位置已到達的輸出樣本: n * down < total * up
+        end = -(-total * self.up // self.down)
+        n = np.arange(self.produced, end, dtype=np.int64)
+        position = n * self.down
+        base = position // self.up - self.consumed + len(self.history)
+        phase = position % self.up
+
+        window = buffer[base[:, None] - np.arange(self.taps)]
+        output = np.einsum('nk,nk->n', window, self.phases[phase])
+
+        self.history = buffer[len(buffer) - (self.taps - 1):]
+        self.consumed = total
+        self.produced = end
+        return output.astype(np.float32)
+
+
+class FrameConverter:
+    """
+    擷取格式轉換器
+
+    將裝置原生的 int16 交錯多聲道區塊混為單聲道、重取樣，
+    再切成固定長度的幀 (例如 16kHz 下 30ms = 480 樣本)
+    """
+
+    def __init__(self, in_rate, in_channels, out_rate=16000, frame_size=480, quality=32):
+        """
+        初始化轉換器
+
+        Args:
+            in_rate: 裝置取樣率 (Hz)
+            in_channels: 裝置聲道數
+            out_rate: 輸出取樣率 (Hz)
+            frame_size: 輸出幀大小 (樣本數)
+            quality: 重取樣濾波器長度
+        """
+        self.in_channels = in_channels
+        self.frame_size = frame_size
+        self.resampler = StreamingResampler(in_rate, out_rate, quality)
+        self.passthrough = self.resampler.passthrough and in_channels == 1
+        self.pending = np.zeros(0, dtype=np.float32)
+
+    def process(self, data):
+        """
+        轉換一個擷取區塊
+
+        Args:
+            data: 裝置原生格式的音訊 (int16 交錯 bytes)
+
+        Returns:
+            list: 輸出幀 (int16 單聲道 bytes)，不足一幀的部分留待下一區塊
+        """
+        if self.passthrough and not len(self.pending) and len(data) == self.frame_size * 2:
+            return [data]
+
+        return [frame.tobytes() for frame in self.convert(np.frombuffer(data, dtype=np.int16))]
+
+    def convert(self, samples):
+        """
+        轉換一段 int16 交錯樣本
+
+        Args:
+            samples: 裝置原生格式的樣本 (int16 一維陣列)
+
+        Returns:
+            numpy.ndarray: (幀數, frame_size) 的 int16 陣列；
+            直通且樣本數為整數幀時為輸入的零複製檢視
+        """
+        if self.passthrough and not len(self.pending) and len(samples) % self.frame_size == 0:
+            return samples.reshape(-1, self.frame_size)
+
+        samples = downmix(samples.astype(np.float32), self.in_channels)
+        samples = np.concatenate((self.pending, self.resampler.process(samples)))
+
+        count = len(samples) // self.frame_size
+        usable = count * self.frame_size
+        self.pending = samples[usable:]
+
+        frames = np.clip(np.rint(samples[:usable]), -32768, 32767).astype(np.int16)
+        return frames.reshape(count, self.frame_size)
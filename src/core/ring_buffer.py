@@ -0,0 +1,73 @@
+"""
+環形緩衝模組
+預先配置記憶體的單一生產者/單一消費者幀緩衝
+"""
+
+
+class FrameRing:
+    """
+    音訊幀環形緩衝
+
+    記憶體在建立時一次配置完成，寫入只做一次記憶體複製，不需要鎖：
+    生產者只更新 write_index，消費者只更新 read_index。
+    適合在 PortAudio 回呼執行緒寫入、在處理執行緒讀取。
+    """
+
+    def __init__(self, capacity, frame_bytes):
+        """
+        初始化環形緩衝
+
+        Args:
+            capacity: 可容納的幀數
+            frame_bytes: 單幀最大位元組數
+        """
+        self.capacity = capacity
+        self.frame_bytes = frame_bytes
+        self.buffer = bytearray(capacity * frame_bytes)
+        self.lengths = [0] * capacity
+        self.view = memoryview(self.buffer)
+
+        # 單調遞增的讀寫計數
+        self.write_index = 0
+        self.read_index = 0
+
+    def write(self, data):
+        """
+        寫入一幀
+
+        Args:
+            data: 音訊幀 (bytes)，超過 frame_bytes 的部分會被截斷
+
+        Returns:
+            bool: 是否寫入成功，緩衝已滿時回傳 False
+        """
+        if self.write_index - self.read_index >= self.capacity:
+            return False
+
+        slot = self.write_index % self.capacity
+        offset = slot * self.frame_bytes
+        length = min(len(data), self.frame_bytes)
+        self.view[offset:offset + length] = data[:length]
+        self.lengths[slot] = length
+        self.write_index += 1
+        return True
+
+    def read(self):
+        """
+        讀取一幀
+
+        Returns:
+            bytes: 音訊幀，緩衝為空時回傳 None
+        """
+        if self.read_index >= self.write_index:
+            return None
+
+        slot = self.read_index % self.capacity
+        offset = slot * self.frame_bytes
+        data = bytes(self.view[offset:offset + self.lengths[slot]])
+        self.read_index += 1
+        return data
+
+    def __len__(self):
+        """目前緩衝中的幀數"""
+        return self.write_index - self.read_index
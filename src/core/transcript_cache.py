@@ -0,0 +1,162 @@
+"""
+識別結果快取模組
+以音訊內容及解碼參數的雜湊為鍵，將識別結果壓縮存入 SQLite，重新處理相同音訊時直接取用
+"""
+
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from ..utils.logger import get_logger
+
+
+logger = get_logger("cache")
+
+
+class TranscriptCache:
+    """
+    內容定址的識別結果快取
+
+    - 鍵為音訊樣本與模型、語言、解碼參數的 SHA-256，任一項改變都不會命中舊結果
+    - 值為 zlib 壓縮的 JSON，存在單一 SQLite 檔案，可由多個行程共用
+    - 總大小超過上限時依最後使用時間淘汰 (LRU)
+    """
+
+    # 快取格式或鍵的組成改變時遞增，使舊條目失效
+    VERSION = 2
+
+    def __init__(self, path="cache/transcripts.sqlite", max_mb=256):
+        """
+        初始化快取
+
+        Args:
+            path: SQLite 檔案路徑
+            max_mb: 快取總大小上限 (MB，以壓縮後的值計)
+        """
+        self.path = Path(path)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 批次轉錄的多個工作行程會同時寫入，WAL 模式讓讀取不被寫入阻塞
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.conn.commit()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+
+    @classmethod
+    def make_key(cls, audio, params):
+        """
+        計算快取鍵
+
+        Args:
+            audio: 音訊樣本 (float32)
+            params: 影響識別結果的參數 (可 JSON 序列化的 dict)
+
+        Returns:
+            str: 十六進位 SHA-256
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([cls.VERSION, params], sort_keys=True, default=str).encode('utf-8'))
+        digest.update(memoryview(np.ascontiguousarray(audio, dtype=np.float32)).cast('B'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        讀取快取
+
+        Args:
+            key: 快取鍵
+
+        Returns:
+            dict: 快取的結果，未命中時為 None
+        """
+        with self.lock:
+            try:
+                row = self.conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self.conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self.conn.commit()
+            except sqlite3.Error as e:
+                # 快取失效時照常解碼
+                logger.warning("讀取快取失敗: %s", e)
+                row = None
+
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, value):
+        """
+        寫入快取，超過大小上限時淘汰最久未使用的條目
+
+        Args:
+            key: 快取鍵
+            value: 結果 (可 JSON 序列化的 dict)
+        """
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+        with self.lock:
+            try:
+                self._insert(key, blob)
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                logger.warning("寫入快取失敗: %s", e)
+
+    def _insert(self, key, blob):
+        """寫入一筆並淘汰超出上限的條目 (需持有 lock)"""
+        self.conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                          (key, blob, len(blob), time.time()))
+
+        excess = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0] - self.max_bytes
+        victims = []
+        if excess > 0:
+            for victim, size in self.conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+                victims.append((victim,))
+                excess -= size
+                if excess <= 0:
+                    break
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+        self.conn.commit()
+        self.stats['stores'] += 1
+        if victims:
+            self.stats['evictions'] += len(victims)
+            logger.debug("快取已滿，淘汰 %d 筆", len(victims))
+
+    def get_stats(self):
+        """獲取命中統計及目前大小"""
+        with self.lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            stats = dict(self.stats)
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['entries'] = entries
+        stats['bytes'] = size
+        return stats
+
+    def close(self):
+        """關閉資料庫"""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,96 @@
+"""
+語音片段預分類模組
+在送入 ASR 前以低成本的訊號特徵排除明顯不是語音的片段 (鍵盤聲、咳嗽、背景音樂等)
+"""
+
+import numpy as np
+
+
+class UtteranceClassifier:
+    """
+    非語音片段過濾器
+
+    VAD 只看單幀，敲鍵盤、咳嗽或持續的音樂也會觸發；這些片段送進 Whisper
+    不但浪費解碼時間，還常產生幻覺文字。此分類器對整個片段計算三個特徵：
+
+    - 語音幀比例：VAD 判定為語音的幀佔片段的比例，零星的敲擊聲比例很低
+    - 頻譜平坦度：功率譜幾何平均與算術平均之比，有諧波的語音接近 0，噪音接近 1
+    - 能量變化：各幀能量 (dB) 的標準差，語音有音節起伏，持續的音樂或嗡聲變化很小
+
+    任一特徵超出閾值即判定為非語音；閾值預設偏保守，只排除有把握的片段
+    """
+
+    # 相對於片段最大能量 (dB)：低於 EDGE_DB 的幀不計入平坦度，也不算片段頭尾；
+    # 低於 ENERGY_FLOOR_DB 的幀以此為下限，避免數位靜音讓標準差失去意義
+    EDGE_DB = 30.0
+    ENERGY_FLOOR_DB = 60.0
+
+    def __init__(self, min_speech_ratio=0.3, max_flatness=0.4, min_energy_std=3.0):
+        """
+        初始化分類器
+
+        Args:
+            min_speech_ratio: VAD 語音幀比例下限
+            max_flatness: 頻譜平坦度上限 (0-1)
+            min_energy_std: 幀能量標準差下限 (dB)
+        """
+        self.min_speech_ratio = min_speech_ratio
+        self.max_flatness = max_flatness
+        self.min_energy_std = min_energy_std
+
+    def features(self, audio, frame_size, speech_frames):
+        """
+        計算片段特徵
+
+        所有幀以一個 (幀數, 幀大小) 矩陣一次計算，不逐幀迴圈
+
+        Args:
+            audio: 單聲道 int16 音訊 (bytes 或 numpy array)，結尾不足一幀的部分忽略
+            frame_size: 幀大小 (樣本數)
+            speech_frames: 其中 VAD 判定為語音的幀數
+
+        Returns:
+            dict: speech_ratio、flatness、energy_std
+        """
+        samples = np.frombuffer(audio, dtype=np.int16) if isinstance(audio, (bytes, bytearray)) else audio
+        count = len(samples) // frame_size
+        if not count:
+            return {'speech_ratio': 0.0, 'flatness': 1.0, 'energy_std': 0.0}
+        frames = samples[:count * frame_size].reshape(count, frame_size).astype(np.float32)
+
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1.0)
+        loudest = energy_db.max()
+
+        # VAD 的拖尾會把語音前後的幾幀靜音也判為語音，頭尾過小的幀不計入能量變化
+        loud = energy_db >= loudest - self.EDGE_DB
+        first, last = np.argmax(loud), count - np.argmax(loud[::-1])
+        frames, energy_db = frames[first:last], energy_db[first:last]
+
+        # 平坦度只看有聲音的幀，停頓中的底噪不計入；取中位數避免少數清音幀影響
+        power = np.abs(np.fft.rfft(frames * np.hanning(frame_size), axis=1)) ** 2 + 1e-6
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        loud = energy_db >= loudest - self.EDGE_DB
+
+        return {
+            'speech_ratio': min(1.0, speech_frames / count),
+            'flatness': float(np.median(flatness[loud])),
+            'energy_std': float(np.maximum(energy_db, loudest - self.ENERGY_FLOOR_DB).std())
+        }
+
+    def reject_reason(self, features):
+        """
+        判斷片段是否為非語音
+
+        Args:
+            features: features() 的結果
+
+        Returns:
+            str: 超出閾值的特徵名稱，判定為語音時為 None
+        """
+        if features['speech_ratio'] < self.min_speech_ratio:
+            return 'speech_ratio'
+        if features['flatness'] > self.max_flatness:
+            return 'flatness'
+        if features['energy_std'] < self.min_energy_std:
+            return 'energy_std'
+        return None
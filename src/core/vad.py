@@ -57,6 +57,31 @@ class VADProcessor:
         else:
             return self._energy_vad(audio_frame)
 
+    def detect_frames(self, audio):
+        """
+        批次檢測整段音訊，用於離線切段
+
+        能量檢測以矩陣一次算完所有幀；WebRTC VAD 只能逐幀判斷，
+        但直接傳入原始緩衝區的切片，不為每幀複製 bytes
+
+        Args:
+            audio: 單聲道 int16 音訊 (numpy array 或 bytes)，結尾不足一幀的部分忽略
+
+        Returns:
+            numpy.ndarray: 每幀是否為語音 (bool)
+        """
+        samples = np.frombuffer(audio, dtype=np.int16) if isinstance(audio, (bytes, bytearray)) else audio
+        count = len(samples) // self.frame_size
+        frames = np.ascontiguousarray(samples[:count * self.frame_size], dtype=np.int16)
+
+        if not self.use_webrtc:
+            return np.abs(frames.reshape(count, self.frame_size)).mean(axis=1) > self.energy_threshold
+
+        buffer = memoryview(frames).cast('B')
+        step = self.frame_size * 2
+        return np.fromiter((self._webrtc_vad(buffer[i:i + step]) for i in range(0, count * step, step)),
+                           dtype=bool, count=count)
+
     def _webrtc_vad(self, audio_frame):
         """使用 WebRTC VAD"""
         try:
@@ -3,5 +3,7 @@
 """
 
 from .speech_service import SpeechService
+from .async_speech_service import AsyncSpeechService
+from .batch_transcriber import BatchTranscriber
 
-__all__ = ['SpeechService']
+__all__ = ['SpeechService', 'AsyncSpeechService', 'BatchTranscriber']
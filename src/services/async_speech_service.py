@@ -0,0 +1,109 @@
+"""
+asyncio 語音服務模組
+將 SpeechService 的執行緒事件轉為 asyncio 的非同步迭代器
+"""
+
+import asyncio
+
+from .speech_service import SpeechService
+
+
+class AsyncSpeechService:
+    """
+    asyncio 語音服務
+
+    用法:
+        service = AsyncSpeechService(config)
+        await service.start()
+        async for event in service.events():
+            if event.type == 'final':
+                print(event.data)
+    """
+
+    def __init__(self, config=None, service=None, max_events=1000):
+        """
+        初始化 asyncio 語音服務
+
+        Args:
+            config: 配置字典
+            service: 已建立的 SpeechService（可選，未指定時於 start 中建立）
+            max_events: 尚未讀取的事件上限，超過時丟棄最舊的事件
+        """
+        self.config = config
+        self.service = service
+        self.max_events = max_events
+
+        self.loop = None
+        self.queue = None
+        self.dropped_events = 0
+
+    async def start(self):
+        """啟動語音服務，模型載入與音訊流啟動在預設執行緒池中進行"""
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+        if self.service is None:
+            self.service = await self.loop.run_in_executor(None, SpeechService, self.config)
+
+        # 事件直接在產生事件的執行緒中交給事件迴圈，不經過事件分派器
+        self.service.on_event = self._on_event
+        await self.loop.run_in_executor(None, self.service.start)
+
+    async def stop(self):
+        """停止語音服務並結束 events() 迭代"""
+        if self.service is None:
+            return
+
+        await self.loop.run_in_executor(None, self.service.stop)
+        self.service.on_event = None
+        self.queue.put_nowait(None)
+
+    async def set_language(self, language):
+        """
+        切換識別語言
+
+        Args:
+            language: 語言代碼 (zh, yue, en)
+
+        Returns:
+            bool: 是否切換成功
+        """
+        return self.service.set_language(language)
+
+    async def events(self):
+        """
+        事件非同步迭代器
+
+        Yields:
+            SpeechEvent: speech_start, speech_end, partial, draft, final, result, dropped, language_change 事件
+        """
+        while True:
+            event = await self.queue.get()
+            if event is None:
+                return
+            yield event
+
+    def _on_event(self, event):
+        """在 SpeechService 的執行緒中呼叫，只負責交給事件迴圈"""
+        self.loop.call_soon_threadsafe(self._enqueue, event)
+
+    def _enqueue(self, event):
+        """在事件迴圈中將事件放入佇列"""
+        if self.queue.qsize() >= self.max_events:
+            self.queue.get_nowait()
+            self.dropped_events += 1
+        self.queue.put_nowait(event)
+
+    def get_current_language(self):
+        """獲取當前語言"""
+        return self.service.get_current_language()
+
+    def get_language_name(self):
+        """獲取當前語言名稱"""
+        return self.service.get_language_name()
+
+    def get_stats(self):
+        """獲取執行統計"""
+        stats = self.service.get_stats()
+        stats['dropped_events'] = self.dropped_events
+        return stats
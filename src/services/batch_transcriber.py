@@ -0,0 +1,421 @@
+"""
+批次轉錄模組
+以行程池轉錄錄音檔，每個工作行程只載入一次模型，結果逐檔寫入 JSONL / SRT
+"""
+
+import os
+import json
+import time
+import logging
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from ..core.asr import ASREngine
+from ..core.vad import VADProcessor
+from ..core.audio_file import WavReader, find_audio_files, load_audio
+from ..utils.logger import get_logger, setup_logger
+
+
+logger = get_logger("batch")
+
+# 工作行程內的 ASR 引擎，由 _init_worker 建立
+_engine = None
+
+
+def _init_worker(asr_config, log_level):
+    """工作行程初始化：設定日誌並載入模型"""
+    global _engine
+    setup_logger(level=log_level)
+    _engine = ASREngine.from_config(asr_config)
+
+
+def _transcribe_chunk(audio, offset, profile):
+    """
+    在工作行程中轉錄一段音訊
+
+    Args:
+        audio: 音訊 (float32)
+        offset: 這段音訊在檔案中的起始時間 (秒)，加到片段時間戳上
+        profile: 解碼設定名稱
+
+    Returns:
+        dict: segments, text, language, truncated, cached
+    """
+    # decode_deadline / max_tokens / max_repeats 是即時單段語音的上限，檔案轉錄不套用
+    # (長檔案中連續重複的句子可能是真的，不應為此捨棄內容)
+    stream = _engine.transcribe_iter(audio, profile=profile, source='file', deadline=0, max_tokens=0,
+                                     max_repeats=0)
+    for _ in stream:
+        pass
+    result = stream.result
+
+    # 時間戳換算為檔案中的時間
+    segments = result.to_dict()['segments']
+    for item in segments:
+        for timed in [item] + item.get('words', []):
+            timed['start'] = round(offset + timed['start'], 3)
+            timed['end'] = round(offset + timed['end'], 3)
+
+    return {
+        'segments': segments,
+        'text': result.text,
+        'language': result.language,
+        'truncated': result.truncated,
+        'cached': int(stream.cached)
+    }
+
+
+def _transcribe_range(path, start, end, sample_rate, profile):
+    """
+    在工作行程中轉錄 WAV 檔的一段
+
+    工作行程自行以記憶體映射讀取這一段，音訊不經由行程間傳遞
+
+    Args:
+        path: WAV 檔路徑
+        start: 起始時間 (秒)
+        end: 結束時間 (秒)
+        sample_rate: 取樣率 (Hz)
+        profile: 解碼設定名稱
+
+    Returns:
+        dict: 與 _transcribe_chunk 相同
+    """
+    with WavReader(path) as reader:
+        audio = reader.read(start, end, sample_rate)
+    return _transcribe_chunk(audio, start, profile)
+
+
+def _transcribe_file(path, sample_rate, profile):
+    """
+    在工作行程中轉錄單一檔案
+
+    整檔載入為一段 float32 音訊，記憶體用量隨檔案長度增加；長檔請使用長檔模式
+
+    Returns:
+        dict: 轉錄結果
+    """
+    started = time.time()
+    audio = load_audio(path, sample_rate)
+    result = _transcribe_chunk(audio, 0.0, profile)
+
+    return {
+        'file': path,
+        'duration': round(len(audio) / sample_rate, 3),
+        'language': result['language'],
+        'text': result['text'],
+        'segments': result['segments'],
+        'truncated': result['truncated'],
+        'decode_time': round(time.time() - started, 3),
+        'cached': result['cached']
+    }
+
+
+def split_at_silence(speech, frame_duration, target_seconds=120, max_seconds=300, min_silence=0.5):
+    """
+    依 VAD 結果把長音訊切成可平行解碼的區段
+
+    切點取在靜音段的中央：優先選目標長度附近 (0.5 到 1.5 倍) 最長的靜音 (同長時取最接近目標者)，
+    其次為上限內最長的靜音；上限內完全沒有靜音時才在上限處硬切
+
+    Args:
+        speech: 每幀是否為語音 (bool 陣列)
+        frame_duration: 幀時長 (ms)
+        target_seconds: 目標區段長度 (秒)
+        max_seconds: 區段長度上限 (秒)
+        min_silence: 可作為切點的最短靜音 (秒)
+
+    Returns:
+        list: 區段 [(起始幀, 結束幀)]，涵蓋整段音訊
+    """
+    frames_per_second = 1000 / frame_duration
+    total = len(speech)
+    target = max(1, int(target_seconds * frames_per_second))
+    longest = max(target, int(max_seconds * frames_per_second))
+
+    # 靜音段 [start, end)：前後補上語音，讓差分成對出現
+    padded = np.concatenate(([1], np.asarray(speech, dtype=np.int8), [1]))
+    edges = np.flatnonzero(np.diff(padded))
+    starts, ends = edges[0::2], edges[1::2]
+    keep = ends - starts >= min_silence * frames_per_second
+    lengths = (ends - starts)[keep]
+    cuts = ((starts + ends) // 2)[keep]
+
+    chunks = []
+    start = 0
+    while total - start > target:
+        # 切點不能讓最後一段短於半個目標長度
+        usable = (cuts > start + target // 2) & (cuts <= total - target // 2)
+        candidates = [usable & (cuts <= start + min(longest, target * 3 // 2)),
+                      usable & (cuts <= start + longest)]
+        for mask in candidates:
+            if mask.any():
+                # 同樣長的靜音取最接近目標長度者
+                longest_silence = mask & (lengths == lengths[mask].max())
+                cut = cuts[longest_silence][np.argmin(np.abs(cuts[longest_silence] - (start + target)))]
+                break
+        else:
+            if total - start <= longest:
+                break
+            cut = start + longest
+
+        chunks.append((start, int(cut)))
+        start = int(cut)
+
+    chunks.append((start, total))
+    return chunks
+
+
+def format_timestamp(seconds):
+    """秒數轉為 SRT 時間格式 (HH:MM:SS,mmm)"""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+
+def write_srt(segments, path):
+    """
+    寫入 SRT 字幕檔
+
+    Args:
+        segments: [{'start', 'end', 'text'}]
+        path: 輸出路徑
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        for index, segment in enumerate((s for s in segments if s['text']), 1):
+            f.write(f"{index}\n{format_timestamp(segment['start'])} --> "
+                    f"{format_timestamp(segment['end'])}\n{segment['text']}\n\n")
+
+
+class BatchTranscriber:
+    """
+    批次轉錄器
+
+    - 檔案分配到固定數量的工作行程，每個行程只載入一次模型
+    - 每完成一個檔案即附加一行到 JSONL 並寫出 SRT，中途中斷不會遺失已完成的結果
+    - 重新執行時略過 JSONL 中已有結果的檔案
+    - 長檔模式下單一檔案在靜音處切段後平行解碼，處理時間隨核心數縮短；
+      16-bit WAV 以記憶體映射分段讀取，記憶體用量不隨檔案長度增加 (一般模式整檔載入)
+    """
+
+    def __init__(self, config, output="transcripts.jsonl", srt_dir=None, workers=2, profile=None,
+                 long_form=False, chunk_seconds=120, max_chunk_seconds=300):
+        """
+        初始化批次轉錄器
+
+        Args:
+            config: 配置字典
+            output: JSONL 輸出路徑
+            srt_dir: SRT 輸出目錄 (None 為不輸出 SRT，空字串為與音訊檔相同目錄)
+            workers: 工作行程數
+            profile: 解碼設定名稱 (預設為 accurate)
+            long_form: 長檔模式，每個檔案先以 VAD 在靜音處切段，再將各段分配到所有工作行程平行解碼
+            chunk_seconds: 長檔模式的目標區段長度 (秒)
+            max_chunk_seconds: 長檔模式的區段長度上限 (秒)
+        """
+        self.asr_config = dict(config.get('asr', {}))
+        self.vad_config = dict(config.get('vad', {}))
+        self.sample_rate = self.vad_config.get('sample_rate', 16000)
+        self.output = Path(output)
+        self.srt_dir = srt_dir
+        self.workers = max(1, workers)
+        self.profile = profile or 'accurate'
+        self.long_form = long_form
+        self.chunk_seconds = chunk_seconds
+        self.max_chunk_seconds = max_chunk_seconds
+
+        self.stats = {
+            'files': 0,
+            'skipped': 0,
+            'completed': 0,
+            'failed': 0,
+            'audio_seconds': 0.0,
+            'cache_hits': 0
+        }
+
+    def completed_files(self):
+        """讀取 JSONL 中已完成的檔案"""
+        done = set()
+        if not self.output.exists():
+            return done
+
+        with open(self.output, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)['file'])
+                except (ValueError, KeyError):
+                    # 上次中斷時寫到一半的行
+                    continue
+        return done
+
+    def run(self, paths, on_result=None):
+        """
+        轉錄檔案或目錄
+
+        Args:
+            paths: 檔案或目錄路徑列表
+            on_result: 每完成一個檔案時呼叫，參數為結果 dict
+
+        Returns:
+            dict: 統計資料
+        """
+        files = [str(path.resolve()) for path in find_audio_files(paths)]
+        done = self.completed_files()
+        pending = [path for path in files if path not in done]
+        self.stats['files'] = len(files)
+        self.stats['skipped'] = len(files) - len(pending)
+
+        if not pending:
+            logger.info("沒有需要轉錄的檔案", extra={'skipped': self.stats['skipped']})
+            return dict(self.stats)
+
+        logger.info("開始轉錄 %d 個檔案", len(pending),
+                    extra={'skipped': self.stats['skipped'], 'workers': self.workers})
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        log_level = logging.getLevelName(get_logger().getEffectiveLevel())
+
+        # 上次中斷時最後一行可能沒有換行，先補上避免與新結果接在同一行
+        if self.output.exists() and self.output.stat().st_size:
+            with open(self.output, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    with open(self.output, 'a', encoding='utf-8') as out:
+                        out.write("\n")
+
+        # 長檔模式下單一檔案也會用滿所有工作行程
+        workers = self.workers if self.long_form else min(self.workers, len(pending))
+        with open(self.output, 'a', encoding='utf-8') as out, ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.asr_config, log_level)) as pool:
+            for path, result in self._completed(pool, pending):
+                if isinstance(result, Exception):
+                    # 失敗的檔案不寫入 JSONL，下次執行時會重試
+                    self.stats['failed'] += 1
+                    logger.error("轉錄失敗: %s (%s)", path, result)
+                    continue
+
+                # 從快取取得的解碼次數 (長檔模式以區段計) 只計入統計，不寫入結果
+                self.stats['cache_hits'] += result.pop('cached')
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                if self.srt_dir is not None:
+                    write_srt(result['segments'], self._srt_path(path))
+
+                self.stats['completed'] += 1
+                self.stats['audio_seconds'] += result['duration']
+                logger.info("已完成 %s", os.path.basename(path), extra={
+                    'duration': result['duration'],
+                    'decode_time': result['decode_time'],
+                    'progress': f"{self.stats['completed'] + self.stats['failed']}/{len(pending)}"
+                })
+                if on_result:
+                    on_result(result)
+
+        return dict(self.stats)
+
+    def _completed(self, pool, pending):
+        """依完成順序產生 (路徑, 結果或例外)"""
+        if self.long_form:
+            # 逐檔處理，每個檔案的區段同時分配到所有工作行程
+            for path in pending:
+                try:
+                    yield path, self._transcribe_long_form(pool, path)
+                except Exception as e:
+                    yield path, e
+            return
+
+        futures = {pool.submit(_transcribe_file, path, self.sample_rate, self.profile): path
+                   for path in pending}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+
+    def _transcribe_long_form(self, pool, path):
+        """
+        長檔模式：在靜音處切段、平行解碼，再依序合併並換算為檔案的時間戳
+
+        Returns:
+            dict: 轉錄結果，格式與單檔模式相同
+        """
+        started = time.time()
+
+        # WebRTC VAD 有內部狀態，每個檔案使用新的實例
+        vad = VADProcessor(
+            sample_rate=self.sample_rate,
+            frame_duration=self.vad_config.get('frame_duration', 30),
+            vad_mode=self.vad_config.get('vad_mode', 3),
+            energy_threshold=self.vad_config.get('energy_threshold', 500)
+        )
+
+        # 16-bit PCM WAV 以記憶體映射逐區塊檢測，各段由工作行程自行讀取，
+        # 主行程與工作行程的記憶體都不隨檔案長度增加；其他格式需整檔解碼
+        try:
+            reader = WavReader(path)
+        except ValueError:
+            reader = None
+
+        if reader is not None:
+            with reader:
+                duration = reader.duration
+                speech = np.concatenate([vad.detect_frames(block)
+                                         for block in reader.iter_frames(self.sample_rate, vad.frame_size)]
+                                        or [np.zeros(0, dtype=bool)])
+        else:
+            audio = load_audio(path, self.sample_rate)
+            duration = len(audio) / self.sample_rate
+            speech = vad.detect_frames(np.clip(np.rint(audio * 32768), -32768, 32767).astype(np.int16))
+
+        chunks = split_at_silence(speech, vad.frame_duration, self.chunk_seconds, self.max_chunk_seconds)
+
+        # 幀邊界換算為秒，最後一段包含結尾不足一幀的樣本；完全沒有語音的區段不解碼
+        seconds_per_frame = vad.frame_duration / 1000
+        bounds = [(start * seconds_per_frame, end * seconds_per_frame if end < len(speech) else duration)
+                  for start, end in chunks if speech[start:end].any()]
+        if reader is not None:
+            futures = [pool.submit(_transcribe_range, path, start, end, self.sample_rate, self.profile)
+                       for start, end in bounds]
+        else:
+            futures = [pool.submit(_transcribe_chunk,
+                                   audio[int(round(start * self.sample_rate)):int(round(end * self.sample_rate))],
+                                   start, self.profile)
+                       for start, end in bounds]
+        logger.info("長檔切段: %s", os.path.basename(path), extra={
+            'chunks': len(futures),
+            'silent_chunks': len(chunks) - len(futures),
+            'duration': duration
+        })
+
+        try:
+            parts = [future.result() for future in futures]
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+        return {
+            'file': path,
+            'duration': round(duration, 3),
+            'language': parts[0]['language'] if parts else self.asr_config.get('language'),
+            'text': " ".join(part['text'] for part in parts if part['text']),
+            'segments': [segment for part in parts for segment in part['segments']],
+            'truncated': any(part['truncated'] for part in parts),
+            'decode_time': round(time.time() - started, 3),
+            'chunks': len(parts),
+            'cached': sum(part['cached'] for part in parts)
+        }
+
+    def _srt_path(self, path):
+        """SRT 輸出路徑"""
+        path = Path(path)
+        directory = Path(self.srt_dir) if self.srt_dir else path.parent
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / (path.stem + ".srt")
@@ -0,0 +1,217 @@
+"""
+事件分派模組
+在獨立的執行緒池中執行使用者回呼，避免慢速的下游處理拖慢語音識別
+"""
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ..utils.logger import get_logger
+
+
+logger = get_logger("events")
+
+
+class SpeechEvent:
+    """
+    語音事件
+
+    type 為 speech_start, speech_end, partial, draft, final, result, dropped, language_change 之一，
+    args 為對應回呼收到的參數，source 為產生事件的音訊來源 ID (與來源無關的事件為 None)
+    """
+
+    __slots__ = ('type', 'args', 'timestamp', 'source')
+
+    def __init__(self, type, args=(), timestamp=None, source=None):
+        self.type = type
+        self.args = args
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.source = source
+
+    @property
+    def data(self):
+        """單一參數時回傳該參數，否則回傳參數 tuple"""
+        if len(self.args) == 1:
+            return self.args[0]
+        return self.args or None
+
+    def __repr__(self):
+        if self.source is None:
+            return f"SpeechEvent({self.type!r}, {self.data!r})"
+        return f"SpeechEvent({self.type!r}, {self.data!r}, source={self.source!r})"
+
+
+class _Lane:
+    """單一事件類型的待執行佇列，同一時間只有一個回呼在執行以保證順序"""
+
+    __slots__ = ('pending', 'running', 'started', 'timed_out')
+
+    def __init__(self):
+        self.pending = deque()
+        self.running = None
+        self.started = None
+        self.timed_out = False
+
+
+class EventDispatcher:
+    """
+    事件分派器
+
+    - 回呼在固定大小的執行緒池中執行，不佔用音訊或識別執行緒
+    - 同一事件類型依發生順序逐一執行；不同事件類型可並行
+    - 每種事件類型同一時間最多佔用一個執行緒，慢速的回呼只會延後同類型的事件
+    - 回呼超過逾時仍未完成時記錄逾時；執行緒無法強制中止，同類型的後續事件
+      在佇列中等待該回呼結束，不會再佔用其他執行緒
+    - 每種事件類型的待執行數有上限，超過時丟棄最舊的事件
+    """
+
+    def __init__(self, max_workers=4, callback_timeout=5.0, max_pending=100):
+        """
+        初始化事件分派器
+
+        Args:
+            max_workers: 執行緒池大小
+            callback_timeout: 單一回呼的逾時 (秒)，0 為不限制
+            max_pending: 每種事件類型的最大待執行數
+        """
+        self.max_workers = max_workers
+        self.callback_timeout = callback_timeout
+        self.max_pending = max_pending
+
+        self.executor = None
+        self.lanes = {}
+        self.lock = threading.RLock()
+        self.watchdog_thread = None
+        self.is_running = False
+
+        # 統計資料
+        self.stats = {
+            'dispatched': 0,
+            'completed': 0,
+            'errors': 0,
+            'timeouts': 0,
+            'dropped': 0
+        }
+
+    def start(self):
+        """啟動分派器"""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix='speech-event')
+
+        if self.callback_timeout:
+            self.watchdog_thread = threading.Thread(target=self._watchdog)
+            self.watchdog_thread.daemon = True
+            self.watchdog_thread.start()
+
+    def stop(self):
+        """停止分派器，尚未執行的事件會被捨棄"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        with self.lock:
+            for lane in self.lanes.values():
+                lane.pending.clear()
+                lane.running = None
+
+        self.executor.shutdown(wait=False)
+        if self.watchdog_thread:
+            self.watchdog_thread.join(timeout=1)
+
+    def dispatch(self, event_type, callback, *args):
+        """
+        分派事件
+
+        Args:
+            event_type: 事件類型，決定執行順序的分組
+            callback: 回呼函式
+            *args: 回呼參數
+        """
+        if not self.is_running:
+            return
+
+        with self.lock:
+            lane = self.lanes.get(event_type)
+            if lane is None:
+                lane = self.lanes[event_type] = _Lane()
+
+            if len(lane.pending) >= self.max_pending:
+                lane.pending.popleft()
+                self.stats['dropped'] += 1
+
+            lane.pending.append((callback, args))
+            self.stats['dispatched'] += 1
+
+            if lane.running is None:
+                self._run_next(lane)
+
+    def _run_next(self, lane):
+        """執行佇列中的下一個回呼 (需持有 lock)"""
+        if not lane.pending or not self.is_running:
+            lane.running = None
+            return
+
+        callback, args = lane.pending.popleft()
+        lane.started = None
+        lane.timed_out = False
+        future = self.executor.submit(self._invoke, lane, callback, args)
+        lane.running = future
+        future.add_done_callback(lambda f, lane=lane: self._on_done(lane, f))
+
+    def _on_done(self, lane, future):
+        """回呼完成後接著執行同類型的下一個事件"""
+        with self.lock:
+            if lane.running is future:
+                self._run_next(lane)
+
+    def _invoke(self, lane, callback, args):
+        """執行回呼"""
+        # 逾時從回呼實際開始執行時計算，不含在執行緒池中等待的時間
+        with self.lock:
+            lane.started = time.monotonic()
+
+        try:
+            callback(*args)
+            result = 'completed'
+        except Exception as e:
+            result = 'errors'
+            logger.exception("事件回呼錯誤: %s", e)
+
+        with self.lock:
+            self.stats[result] += 1
+
+    def _watchdog(self):
+        """監看逾時的回呼"""
+        interval = min(0.1, self.callback_timeout / 4)
+        while self.is_running:
+            time.sleep(interval)
+            now = time.monotonic()
+
+            with self.lock:
+                for event_type, lane in self.lanes.items():
+                    if (lane.running is None or lane.started is None or lane.timed_out
+                            or now - lane.started <= self.callback_timeout):
+                        continue
+                    # 逾時的回呼仍佔用執行緒，繼續送出後續事件只會在執行緒池中排隊並打亂順序，
+                    # 因此只記錄一次逾時，後續事件留在佇列 (受 max_pending 限制) 等待它結束
+                    lane.timed_out = True
+                    self.stats['timeouts'] += 1
+                    logger.warning("事件回呼逾時: %s (%.1f秒)", event_type, self.callback_timeout)
+
+    def get_stats(self):
+        """
+        獲取分派統計
+
+        Returns:
+            dict: 分派、完成、錯誤、逾時、丟棄的事件數及待執行數
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats['pending'] = sum(len(lane.pending) for lane in self.lanes.values())
+        return stats
@@ -5,31 +5,96 @@
 
 import time
 import queue
+import itertools
 import threading
+import functools
 import numpy as np
+from pathlib import Path
 from collections import deque
 
 from ..core.vad import VADProcessor
-from ..core.asr import ASREngine
+from ..core.asr import RecognitionResult
+from ..core.asr_process import create_asr
+from ..core.keyword_gate import KeywordGate
 from ..core.audio_stream import AudioStream
+from ..core.audio_archive import AudioArchive
+from ..core.blackbox import BlackBoxRecorder
+from ..core.utterance_classifier import UtteranceClassifier
+from .event_dispatcher import EventDispatcher, SpeechEvent
+from ..utils.logger import get_logger
+
+
+logger = get_logger("speech")
+
+
+class _Utterance:
+    """待識別的語音片段"""
+
+    __slots__ = ('utterance_id', 'audio', 'duration', 'captured_at', 'source', 'language')
+
+    def __init__(self, utterance_id, audio, duration, captured_at, source=None, language=None):
+        self.utterance_id = utterance_id
+        self.audio = audio
+        self.duration = duration
+        self.captured_at = captured_at
+        self.source = source
+        # 擷取完成時的語言，之後才切換語言不影響已排隊的片段
+        self.language = language
+
+
+class _Source:
+    """單一音訊來源及其 VAD 與切段狀態"""
+
+    __slots__ = ('source_id', 'audio_stream', 'vad', 'blackbox', 'is_speaking',
+                 'speech_frames', 'silence_start', 'pre_roll', 'onset_frames', 'voiced_frames',
+                 'last_voiced', 'stream_time')
+
+    def __init__(self, source_id, audio_stream, vad, pre_roll_frames, blackbox=None):
+        self.source_id = source_id
+        self.audio_stream = audio_stream
+        self.vad = vad
+        self.blackbox = blackbox
+
+        # 語音狀態
+        self.is_speaking = False
+        self.speech_frames = []
+        self.silence_start = None
+
+        # 預錄緩衝：保留語音開始前最近幾幀的參照 (不複製資料)，
+        # VAD 觸發時接在語音片段前面，避免第一個音節被切掉
+        self.pre_roll = deque(maxlen=pre_roll_frames)
+        self.onset_frames = 0
+
+        # 觸發後 VAD 判定為語音的幀數，及最後一個語音幀的位置 (之後為結尾靜音)
+        self.voiced_frames = 0
+        self.last_voiced = 0
+
+        # 串流時間 (秒)，依已處理的音訊幀累計，不受處理延遲影響
+        self.stream_time = 0.0
 
 
 class SpeechService:
     """語音處理服務"""
 
-    def __init__(self, config=None):
+    # 共用同一個回呼的事件放在同一組依序執行：草稿與最終結果都交給 on_transcription，草稿必須先到
+    _DISPATCH_LANES = {'draft': 'final'}
+
+    def __init__(self, config=None, asr=None, audio_stream=None, audio_streams=None):
         """
         初始化語音服務
 
         Args:
             config: 配置字典
+            asr: 共用的 ASR 引擎（可選，未指定時依配置建立）
+            audio_stream: 音訊來源（可選，需提供 start/stop 和 on_audio_frame）
+            audio_streams: 多個音訊來源 {來源 ID: 音訊來源}（可選，各自獨立進行 VAD 與切段）
         """
         config = config or {}
 
         # VAD 配置
         vad_config = config.get('vad', {})
+        self.vad_config = vad_config
         self.sample_rate = vad_config.get('sample_rate', 16000)
-        frame_duration = vad_config.get('frame_duration', 30)
 
         # ASR 配置
         asr_config = config.get('asr', {})
@@ -37,41 +102,231 @@ class SpeechService:
         self.min_speech_duration = asr_config.get('min_speech_duration', 0.5)
 
         # 初始化元件
-        self.vad = VADProcessor(
-            sample_rate=self.sample_rate,
-            frame_duration=frame_duration,
-            vad_mode=vad_config.get('vad_mode', 3),
-            energy_threshold=vad_config.get('energy_threshold', 500)
-        )
-
-        self.asr = ASREngine(
-            model_size=asr_config.get('model_size', 'base'),
-            language=asr_config.get('language', 'zh'),
-            device=asr_config.get('device', 'cpu'),
-            compute_type=asr_config.get('compute_type', 'int8'),
-            model_path=asr_config.get('model_path')
-        )
-
-        self.audio_stream = AudioStream(
-            sample_rate=self.sample_rate,
-            frame_size=self.vad.frame_size
-        )
-
-        # 語音狀態
-        self.is_speaking = False
-        self.speech_frames = []
-        self.silence_start = None
+        self.vad = self._create_vad()
+        self.classifier = self._create_classifier(vad_config.get('classifier', {}))
+
+        # 即時識別使用的解碼設定
+        self.decoding_profile = asr_config.get('decoding_profile', 'realtime')
+
+        # 未指定共用引擎時自行建立，並在停止服務時一併關閉
+        self.owns_asr = asr is None
+        if asr is None:
+            asr = create_asr(asr_config, sample_rate=self.sample_rate)
+        self.asr = asr
+
+        # 喚醒詞模式：以小模型檢查語音開頭，提到關鍵字才交給主模型 (檢查用的模型由服務自行管理)
+        self.gate = self._create_gate(asr_config)
+
+        # 兩階段識別：小模型先產生草稿，主模型在背景重新識別後發出修正
+        two_pass_config = asr_config.get('two_pass') or {}
+        if two_pass_config.get('enabled', False):
+            self.draft_asr = self._create_aux_asr(asr_config, two_pass_config.get('draft_model_size', 'tiny'),
+                                                  two_pass_config.get('draft_model_path'))
+        else:
+            self.draft_asr = None
+        self.refine_max_backlog = two_pass_config.get('max_backlog', 1)
+
+        # 音訊擷取配置
+        audio_config = config.get('audio', {})
+        if audio_streams is None:
+            if audio_stream is not None:
+                audio_streams = {'default': audio_stream}
+            else:
+                audio_streams = self._create_audio_streams(audio_config)
+
+        # 每個音訊來源各自進行 VAD 與切段，共用識別佇列與模型
+        debug_config = config.get('debug', {})
+        blackbox_config = debug_config.get('blackbox', {})
+        pre_roll_frames = max(0, int(vad_config.get('pre_roll_ms', 300) / self.vad.frame_duration))
+        self.sources = {}
+        for index, (source_id, stream) in enumerate(audio_streams.items()):
+            self.sources[source_id] = _Source(
+                source_id, stream,
+                vad=self.vad if index == 0 else self._create_vad(),
+                pre_roll_frames=pre_roll_frames,
+                blackbox=self._create_blackbox(blackbox_config, source_id, len(audio_streams))
+            )
+        self.audio_stream = next(iter(audio_streams.values()))
+
+        # 統計資料
+        self.stats = {
+            'utterances': 0,
+            'decoded': 0,
+            'transcriptions': 0,
+            'truncated': 0,
+            'errors': 0,
+            'rejected': 0,
+            'rejected_seconds': 0.0,
+            'gated': 0,
+            'gated_seconds': 0.0,
+            'gate_seconds': 0.0,
+            'drafts': 0,
+            'draft_seconds': 0.0,
+            'refined': 0,
+            'refine_skipped': 0,
+            'audio_seconds': 0.0,
+            'decode_seconds': 0.0,
+            'max_queue_size': 0
+        }
+        self.latencies = deque(maxlen=1000)
+        self.utterance_ids = itertools.count(1)
+        self.lock = threading.Lock()
 
         # 識別佇列
         self.recognition_queue = queue.Queue()
         self.recognition_thread = None
+
+        # 兩階段識別的修正佇列，項目為 (語音片段, 音訊, 草稿結果)；略過修正的草稿音訊為 None，
+        # 也經過此佇列以保持最終結果的順序。refine_waiting 為其中等待主模型的片段數
+        self.refinement_queue = queue.Queue()
+        self.refine_waiting = 0
+        self.refinement_thread = None
         self.is_running = False
 
+        # 事件分派：async 時回呼在獨立執行緒池執行，inline 時直接在處理執行緒執行
+        events_config = config.get('events', {})
+        if events_config.get('dispatch', 'async') == 'async':
+            self.dispatcher = EventDispatcher(
+                max_workers=events_config.get('max_workers', 4),
+                callback_timeout=events_config.get('callback_timeout', 5.0),
+                max_pending=events_config.get('max_pending', 100)
+            )
+        else:
+            self.dispatcher = None
+
+        # 除錯存檔：識別過的語音片段在背景寫入磁碟
+        if debug_config.get('save_audio', False):
+            self.archive = AudioArchive(
+                path=debug_config.get('audio_save_path', 'debug/'),
+                sample_rate=self.sample_rate,
+                audio_format=debug_config.get('audio_format', 'wav'),
+                max_pending=debug_config.get('archive_max_pending', 32),
+                max_total_mb=debug_config.get('archive_max_mb', 500),
+                max_age_hours=debug_config.get('archive_max_age_hours', 72)
+            )
+        else:
+            self.archive = None
+
         # 回呼函式
         self.on_speech_start = None
         self.on_speech_end = None
         self.on_transcription = None
+        self.on_result = None
+        self.on_segment = None
         self.on_language_change = None
+        self.on_speech_dropped = None
+
+        # 事件接收器：以 SpeechEvent 接收所有事件，在產生事件的執行緒直接呼叫，
+        # 不經過事件分派器，必須是不會阻塞的函式 (例如 loop.call_soon_threadsafe)
+        self.on_event = None
+
+    def _create_vad(self):
+        """依 VAD 配置建立 VADProcessor"""
+        return VADProcessor(
+            sample_rate=self.sample_rate,
+            frame_duration=self.vad_config.get('frame_duration', 30),
+            vad_mode=self.vad_config.get('vad_mode', 3),
+            energy_threshold=self.vad_config.get('energy_threshold', 500)
+        )
+
+    def _create_classifier(self, classifier_config):
+        """建立送入 ASR 前的非語音過濾器，未啟用時為 None"""
+        if not classifier_config.get('enabled', False):
+            return None
+
+        return UtteranceClassifier(
+            min_speech_ratio=classifier_config.get('min_speech_ratio', 0.3),
+            max_flatness=classifier_config.get('max_flatness', 0.4),
+            min_energy_std=classifier_config.get('min_energy_std', 3.0)
+        )
+
+    def _create_aux_asr(self, asr_config, model_size, model_path=None):
+        """
+        建立輔助用的 ASR 引擎 (喚醒詞檢查、兩階段識別的草稿)
+
+        沿用主模型的語言、裝置及子行程設定，只換模型且不使用快取及各語言的模型對應；
+        由服務自行管理，停止服務時一併關閉，切換語言時一併切換
+        """
+        return create_asr(dict(asr_config, model_size=model_size, model_path=model_path,
+                               cache=None, language_models=None),
+                          sample_rate=self.sample_rate)
+
+    def _create_gate(self, asr_config):
+        """建立喚醒詞閘門，未啟用時為 None"""
+        gate_config = asr_config.get('gate') or {}
+        if not gate_config.get('enabled', False):
+            return None
+
+        gate_asr = self._create_aux_asr(asr_config, gate_config.get('model_size', 'tiny'),
+                                        gate_config.get('model_path'))
+        try:
+            return KeywordGate(gate_asr, gate_config.get('keywords'),
+                               seconds=gate_config.get('seconds', 1.5),
+                               sample_rate=self.sample_rate,
+                               profile=self.decoding_profile)
+        except ValueError:
+            if hasattr(gate_asr, 'close'):
+                gate_asr.close()
+            raise
+
+    def _create_audio_streams(self, audio_config):
+        """
+        依配置建立音訊擷取
+
+        audio.devices 可列出多個裝置 (裝置編號或 {index, name, device_rate, device_channels})，
+        未設定時只開啟 audio.device_index 指定的裝置
+
+        Returns:
+            dict: {來源 ID: AudioStream}
+        """
+        devices = audio_config.get('devices') or [{
+            'index': audio_config.get('device_index'),
+            'name': 'default',
+            'device_rate': audio_config.get('device_rate'),
+            'device_channels': audio_config.get('device_channels')
+        }]
+
+        streams = {}
+        for device in devices:
+            if not isinstance(device, dict):
+                device = {'index': device}
+            source_id = device.get('name') or f"device{device['index']}"
+            streams[source_id] = AudioStream(
+                sample_rate=self.sample_rate,
+                frame_size=self.vad.frame_size,
+                ring_frames=audio_config.get('ring_frames', 200),
+                device_index=device.get('index'),
+                device_rate=device.get('device_rate'),
+                device_channels=device.get('device_channels'),
+                resample_quality=audio_config.get('resample_quality', 32)
+            )
+        return streams
+
+    def _create_blackbox(self, blackbox_config, source_id, num_sources):
+        """
+        建立黑盒錄音：持續保存最近 N 分鐘的原始音訊及 VAD 判斷，供事後重播
+
+        多個音訊來源時每個來源各一個檔案，檔名加上來源 ID
+        """
+        if not blackbox_config.get('enabled', False):
+            return None
+
+        path = Path(blackbox_config.get('path', 'debug/blackbox.bin'))
+        if num_sources > 1:
+            path = path.with_name(f"{path.stem}_{source_id}{path.suffix}")
+
+        return BlackBoxRecorder(
+            path=path,
+            sample_rate=self.sample_rate,
+            frame_bytes=self.vad.frame_size * 2,
+            minutes=blackbox_config.get('minutes', 10),
+            frame_duration=self.vad.frame_duration
+        )
+
+    @property
+    def is_speaking(self):
+        """是否有任一音訊來源正在說話"""
+        return any(source.is_speaking for source in self.sources.values())
 
     def start(self):
         """啟動語音服務"""
@@ -80,18 +335,31 @@ class SpeechService:
 
         self.is_running = True
 
-        # 設定音訊流回呼
-        self.audio_stream.on_audio_frame = self._process_audio_frame
+        if self.dispatcher:
+            self.dispatcher.start()
 
-        # 啟動音訊流
-        self.audio_stream.start()
+        if self.archive:
+            self.archive.start()
+
+        for source in self.sources.values():
+            if source.blackbox:
+                source.blackbox.open()
+
+            # 設定音訊流回呼並啟動音訊流
+            source.audio_stream.on_audio_frame = functools.partial(self._process_audio_frame, source)
+            source.audio_stream.start()
 
         # 啟動識別執行緒
         self.recognition_thread = threading.Thread(target=self._recognition_worker)
         self.recognition_thread.daemon = True
         self.recognition_thread.start()
 
-        print("語音服務已啟動")
+        if self.draft_asr:
+            self.refinement_thread = threading.Thread(target=self._refinement_worker)
+            self.refinement_thread.daemon = True
+            self.refinement_thread.start()
+
+        logger.info("語音服務已啟動")
 
     def stop(self):
         """停止語音服務"""
@@ -101,98 +369,409 @@ class SpeechService:
         self.is_running = False
 
         # 停止音訊流
-        self.audio_stream.stop()
+        for source in self.sources.values():
+            source.audio_stream.stop()
 
         # 等待識別執行緒結束
         if self.recognition_thread:
             self.recognition_thread.join(timeout=2)
+        if self.refinement_thread:
+            self.refinement_thread.join(timeout=2)
+
+        for source in self.sources.values():
+            if source.blackbox:
+                source.blackbox.close()
 
-        print("語音服務已停止")
+        if self.dispatcher:
+            self.dispatcher.stop()
 
-    def _process_audio_frame(self, frame):
-        """處理音訊幀"""
-        is_speech = self.vad.is_speech(frame)
+        if self.archive:
+            self.archive.stop()
+
+        if self.owns_asr and hasattr(self.asr, 'close'):
+            self.asr.close()
+
+        if self.gate:
+            self.gate.close()
+
+        if self.draft_asr and hasattr(self.draft_asr, 'close'):
+            self.draft_asr.close()
+
+        logger.info("語音服務已停止")
+
+    def _process_audio_frame(self, source, frame):
+        """處理音訊幀，在該來源的音訊處理執行緒中執行"""
+        source.stream_time += source.vad.frame_duration / 1000
+        is_speech = source.vad.is_speech(frame)
 
         if is_speech:
-            self._handle_speech_frame(frame)
+            self._handle_speech_frame(source, frame)
         else:
-            self._handle_silence_frame(frame)
+            self._handle_silence_frame(source, frame)
+            if not source.is_speaking and source.pre_roll.maxlen:
+                source.pre_roll.append(frame)
 
-    def _handle_speech_frame(self, frame):
+        if source.blackbox:
+            source.blackbox.write(frame, is_speech, source.is_speaking)
+
+    def _handle_speech_frame(self, source, frame):
         """處理語音幀"""
-        if not self.is_speaking:
+        if not source.is_speaking:
             # 開始說話
-            self.is_speaking = True
-            self.speech_frames = []
-            print("檢測到語音...")
-
-            if self.on_speech_start:
-                self.on_speech_start()
-
-        self.speech_frames.append(frame)
-        self.silence_start = None
-
-    def _handle_silence_frame(self, frame):
+            source.is_speaking = True
+            source.speech_frames = list(source.pre_roll)
+            source.onset_frames = len(source.speech_frames)
+            source.voiced_frames = 0
+            source.pre_roll.clear()
+            logger.debug("檢測到語音...", extra={'source': source.source_id,
+                                               'stream_time': source.stream_time})
+
+            self._emit('speech_start', self.on_speech_start, source=source.source_id)
+
+        source.speech_frames.append(frame)
+        source.voiced_frames += 1
+        source.last_voiced = len(source.speech_frames)
+        source.silence_start = None
+
+    def _handle_silence_frame(self, source, frame):
         """處理靜音幀"""
-        if self.is_speaking:
+        if source.is_speaking:
             # 可能是說話中的停頓
-            self.speech_frames.append(frame)
+            source.speech_frames.append(frame)
 
-            if self.silence_start is None:
-                self.silence_start = time.time()
+            if source.silence_start is None:
+                source.silence_start = source.stream_time
             else:
                 # 檢查靜音時長
-                silence_duration = time.time() - self.silence_start
+                silence_duration = source.stream_time - source.silence_start
                 if silence_duration >= self.speech_timeout:
-                    self._finalize_speech()
+                    self._finalize_speech(source)
 
-    def _finalize_speech(self):
+    def _finalize_speech(self, source):
         """完成語音片段"""
-        if not self.speech_frames:
+        if not source.speech_frames:
             return
 
-        # 計算語音時長
-        duration = len(self.speech_frames) * self.vad.frame_duration / 1000
+        # 計算語音時長 (含預錄)，最短時長只計算 VAD 觸發後的部分
+        frame_seconds = source.vad.frame_duration / 1000
+        duration = len(source.speech_frames) * frame_seconds
+        voiced = (len(source.speech_frames) - source.onset_frames) * frame_seconds
 
-        if duration >= self.min_speech_duration:
+        if voiced < self.min_speech_duration:
+            logger.debug("語音片段過短，已捨棄", extra={'source': source.source_id, 'duration': voiced})
+            self._emit('dropped', self.on_speech_dropped, 'too_short', voiced, source=source.source_id)
+        elif self._reject(source, duration):
+            self._emit('dropped', self.on_speech_dropped, 'rejected', voiced, source=source.source_id)
+        else:
             # 合併音訊幀
-            audio_data = b''.join(self.speech_frames)
+            audio_data = b''.join(source.speech_frames)
+
+            # 先發出結束事件，確保其順序在識別結果之前
+            utterance = _Utterance(next(self.utterance_ids), audio_data, duration, time.time(),
+                                   source=source.source_id, language=self.asr.get_current_language())
+            logger.info("語音片段已捕獲，開始識別...", extra={
+                'utterance_id': utterance.utterance_id,
+                'source': source.source_id,
+                'duration': duration
+            })
+            self._emit('speech_end', self.on_speech_end, duration, source=source.source_id)
+
+            # 傳送到識別佇列，多個來源共用同一個佇列與模型
+            self.recognition_queue.put(utterance)
+            with self.lock:
+                self.stats['utterances'] += 1
+                self.stats['max_queue_size'] = max(self.stats['max_queue_size'],
+                                                   self.recognition_queue.qsize())
 
-            # 傳送到識別佇列
-            self.recognition_queue.put(audio_data)
-            print(f"語音片段已捕獲 ({duration:.2f}秒)，開始識別...")
+        # 重置狀態
+        source.is_speaking = False
+        source.speech_frames = []
+        source.silence_start = None
 
-            if self.on_speech_end:
-                self.on_speech_end(duration)
+    def _reject(self, source, duration):
+        """
+        以預分類器判斷片段是否為非語音
 
-        # 重置狀態
-        self.is_speaking = False
-        self.speech_frames = []
-        self.silence_start = None
+        只分析觸發後到最後一個語音幀的部分，預錄及結尾靜音不計入
+
+        Returns:
+            bool: 是否捨棄 (不送入 ASR)
+        """
+        if self.classifier is None:
+            return False
+
+        active = source.speech_frames[source.onset_frames:source.last_voiced]
+        features = self.classifier.features(b''.join(active), source.vad.frame_size, source.voiced_frames)
+        reason = self.classifier.reject_reason(features)
+        if reason is None:
+            return False
+
+        logger.debug("非語音片段，略過識別", extra={'source': source.source_id, 'duration': duration,
+                                                'reason': reason, **features})
+        with self.lock:
+            self.stats['rejected'] += 1
+            self.stats['rejected_seconds'] += duration
+        return True
 
     def _recognition_worker(self):
         """識別工作執行緒"""
         while self.is_running:
             try:
                 # 從佇列獲取音訊資料
-                audio_data = self.recognition_queue.get(timeout=0.1)
+                utterance = self.recognition_queue.get(timeout=0.1)
 
                 # 轉換為 numpy 陣列
-                audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+                audio_np = np.frombuffer(utterance.audio, dtype=np.int16).astype(np.float32) / 32768.0
+
+                if self.gate and not self._passes_gate(utterance, audio_np):
+                    continue
+
+                if self.draft_asr:
+                    self._recognize_draft(utterance, audio_np)
+                else:
+                    # 執行識別，每解碼完一段即通知，不必等待整段完成
+                    self._publish(utterance, self._decode(utterance, audio_np, self.asr))
+
+            except queue.Empty:
+                continue
+            except Exception as e:
+                logger.exception("識別錯誤: %s", e)
 
-                # 執行識別
-                text = self.asr.transcribe(audio_np)
+    def _recognize_draft(self, utterance, audio_np):
+        """
+        兩階段識別的第一階段：以小模型產生草稿，再交給修正執行緒以主模型重新識別
 
-                if text:
-                    print(f"識別結果: {text}")
+        識別佇列或修正佇列已經積壓時略過修正，直接以草稿作為最終結果，避免延遲越拖越長；
+        略過修正的草稿仍經過修正佇列，確保最終結果依擷取順序發出
+        """
+        draft = self._decode(utterance, audio_np, self.draft_asr)
+        with self.lock:
+            self.stats['drafts'] += 1
+            self.stats['draft_seconds'] += draft.decode_time
+
+        if draft.text:
+            logger.info("草稿結果: %s", draft.text, extra={
+                'utterance_id': utterance.utterance_id,
+                'source': utterance.source,
+                'decode_time': draft.decode_time
+            })
+            self._emit('draft', self.on_transcription, draft.text, False, source=utterance.source)
+
+        with self.lock:
+            skip = (self.recognition_queue.qsize() > 0
+                    or self.refine_waiting >= self.refine_max_backlog)
+            if skip:
+                self.stats['refine_skipped'] += 1
+            else:
+                self.refine_waiting += 1
 
-                    if self.on_transcription:
-                        self.on_transcription(text)
+        if skip:
+            logger.debug("識別佇列積壓，略過修正", extra={'utterance_id': utterance.utterance_id})
+            # 沒有音訊的項目由修正執行緒直接發出，排在前面仍在修正的片段之後
+            self.refinement_queue.put((utterance, None, draft))
+        else:
+            self.refinement_queue.put((utterance, audio_np, draft))
 
+    def _refinement_worker(self):
+        """修正執行緒：以主模型重新識別草稿的音訊，依序發出最終結果"""
+        while self.is_running:
+            try:
+                utterance, audio_np, draft = self.refinement_queue.get(timeout=0.1)
             except queue.Empty:
                 continue
+
+            try:
+                if audio_np is None:
+                    # 略過修正的草稿
+                    self._publish(utterance, draft)
+                    continue
+
+                with self.lock:
+                    self.refine_waiting -= 1
+                result = self._decode(utterance, audio_np, self.asr, streaming=False)
+                if result.error:
+                    # 主模型失敗時沿用草稿，不讓已顯示的結果消失
+                    logger.warning("修正識別失敗，沿用草稿: %s", result.error)
+                    result = draft
+                else:
+                    with self.lock:
+                        self.stats['refined'] += 1
+                self._publish(utterance, result)
             except Exception as e:
-                print(f"識別錯誤: {e}")
+                logger.exception("修正識別錯誤: %s", e)
+
+    def _decode(self, utterance, audio_np, asr, streaming=True):
+        """
+        識別語音片段並填入解碼時間及延遲
+
+        Args:
+            utterance: 語音片段
+            audio_np: 單聲道 float32 音訊
+            asr: 使用的 ASR 引擎
+            streaming: 是否每解碼完一段即觸發 on_segment
+
+        Returns:
+            RecognitionResult: 識別結果
+        """
+        decode_start = time.time()
+        if streaming:
+            result = self._transcribe_streaming(audio_np, utterance.source, asr, utterance.language)
+        else:
+            result = asr.transcribe(audio_np, profile=self.decoding_profile, source='live',
+                                    language=utterance.language)
+        finished = time.time()
+        result.decode_time = finished - decode_start
+        result.latency = finished - utterance.captured_at
+        return result
+
+    def _publish(self, utterance, result):
+        """記錄統計並發出最終結果 (final / result 事件)，需要時交給背景存檔"""
+        with self.lock:
+            self.stats['decoded'] += 1
+            self.stats['audio_seconds'] += utterance.duration
+            self.stats['decode_seconds'] += result.decode_time
+            self.latencies.append(result.latency)
+            if result.truncated:
+                self.stats['truncated'] += 1
+            if result.error:
+                self.stats['errors'] += 1
+            if result.text:
+                self.stats['transcriptions'] += 1
+
+        if result.text:
+            logger.info("識別結果: %s", result.text, extra={
+                'utterance_id': utterance.utterance_id,
+                'source': utterance.source,
+                'duration': utterance.duration,
+                'decode_time': result.decode_time,
+                'latency': result.latency
+            })
+
+            # on_transcription 只收到文字，需要時間戳及信心分數時使用 on_result；
+            # 兩階段識別時多一個參數區分草稿 (False) 與最終結果 (True)
+            args = (result.text,) if self.draft_asr is None else (result.text, True)
+            self._emit('final', self.on_transcription, *args, source=utterance.source)
+
+        # 每個解碼過的片段都產生結果 (包含空結果及失敗)，供下游過濾及量測延遲
+        self._emit('result', self.on_result, result, source=utterance.source)
+
+        if self.archive:
+            self._archive_utterance(utterance, result)
+
+    def _passes_gate(self, utterance, audio_np):
+        """
+        以喚醒詞閘門檢查語音片段，未提到關鍵字時觸發 dropped 事件
+
+        Returns:
+            bool: 是否交給主模型識別
+        """
+        gate_start = time.time()
+        passed, result = self.gate.check(audio_np, utterance.language)
+        with self.lock:
+            self.stats['gate_seconds'] += time.time() - gate_start
+            if not passed:
+                self.stats['gated'] += 1
+                self.stats['gated_seconds'] += utterance.duration
+
+        if not passed:
+            logger.debug("未提到關鍵字，略過識別", extra={'utterance_id': utterance.utterance_id,
+                                                   'source': utterance.source, 'text': result.text})
+            self._emit('dropped', self.on_speech_dropped, 'gated', utterance.duration, source=utterance.source)
+        return passed
+
+    def _transcribe_streaming(self, audio_np, source_id=None, asr=None, language=None):
+        """
+        串流識別語音片段並逐段觸發 on_segment
+
+        faster-whisper 每解碼完一個 30 秒的視窗才產生該視窗的所有片段，
+        短於 30 秒的語音只有一個視窗，on_segment 只會在最終結果之前觸發一次
+
+        Returns:
+            RecognitionResult: 識別結果，失敗時 text 為空字串並附帶 error
+        """
+        asr = asr or self.asr
+        try:
+            stream = asr.transcribe_iter(audio_np, profile=self.decoding_profile, source='live',
+                                         language=language)
+            for segment in stream:
+                if segment.text.strip():
+                    self._emit('partial', self.on_segment, segment.text.strip(), source=source_id)
+            return stream.result
+        except Exception as e:
+            logger.error("識別失敗: %s", e)
+            return RecognitionResult(language=language or asr.get_current_language(), error=str(e))
+
+    def _archive_utterance(self, utterance, result):
+        """將語音片段及識別結果交給背景存檔"""
+        self.archive.submit(utterance.utterance_id, utterance.audio, {
+            'captured_at': utterance.captured_at,
+            'source': utterance.source,
+            'duration': utterance.duration,
+            'language': result.language or utterance.language,
+            'profile': self.decoding_profile,
+            'text': result.text,
+            'truncated': result.truncated,
+            'truncation_reason': result.reason,
+            'avg_logprob': result.avg_logprob,
+            'no_speech_prob': result.no_speech_prob,
+            'error': result.error,
+            'decode_time': round(result.decode_time, 4),
+            'latency': round(result.latency, 4)
+        })
+
+    def _emit(self, event_type, callback, *args, source=None):
+        """
+        觸發回呼
+
+        Args:
+            event_type: 事件類型 (speech_start, speech_end, partial, draft, final, result, dropped, language_change)
+            callback: 回呼函式，None 時忽略
+            *args: 回呼參數
+            source: 產生事件的音訊來源 ID
+        """
+        if self.on_event:
+            self.on_event(SpeechEvent(event_type, args, source=source))
+
+        if callback is None:
+            return
+
+        if self.dispatcher and self.dispatcher.is_running:
+            self.dispatcher.dispatch(self._DISPATCH_LANES.get(event_type, event_type), callback, *args)
+        else:
+            callback(*args)
+
+    def get_stats(self):
+        """
+        獲取執行統計
+
+        Returns:
+            dict: 語音片段數、識別數、截斷數、過濾及喚醒詞略過數、處理耗時、佇列長度及延遲樣本
+        """
+        stats = dict(self.stats)
+        stats['queue_size'] = self.recognition_queue.qsize()
+        stats['latencies'] = list(self.latencies)
+        # 以目前的平均解碼速度估算預分類器及喚醒詞閘門省下的解碼時間 (扣除閘門本身的檢查時間)
+        if stats['audio_seconds']:
+            skipped = stats['rejected_seconds'] + stats['gated_seconds']
+            stats['decode_seconds_saved'] = (skipped * stats['decode_seconds'] / stats['audio_seconds']
+                                             - stats['gate_seconds'])
+        else:
+            stats['decode_seconds_saved'] = 0.0
+        if hasattr(self.asr, 'get_stats'):
+            stats['asr'] = self.asr.get_stats()
+        audio_stats = {source_id: source.audio_stream.get_stats()
+                       for source_id, source in self.sources.items()
+                       if hasattr(source.audio_stream, 'get_stats')}
+        if len(self.sources) == 1:
+            audio_stats = audio_stats.get(next(iter(self.sources)))
+        if audio_stats:
+            # 單一來源時為該來源的統計，多個來源時依來源 ID 分開
+            stats['audio'] = audio_stats
+        if self.dispatcher:
+            stats['events'] = self.dispatcher.get_stats()
+        if self.archive:
+            stats['archive'] = self.archive.get_stats()
+        return stats
 
     def set_language(self, language):
         """
@@ -205,8 +784,12 @@ class SpeechService:
             bool: 是否切換成功
         """
         success = self.asr.set_language(language)
-        if success and self.on_language_change:
-            self.on_language_change(language)
+        if success and self.gate:
+            self.gate.asr.set_language(language)
+        if success and self.draft_asr:
+            self.draft_asr.set_language(language)
+        if success:
+            self._emit('language_change', self.on_language_change, language)
         return success
 
     def get_current_language(self):
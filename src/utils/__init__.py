@@ -3,6 +3,6 @@
 """
 
 from .config_loader import load_config
-from .logger import setup_logger
+from .logger import setup_logger, get_logger
 
-__all__ = ['load_config', 'setup_logger']
+__all__ = ['load_config', 'setup_logger', 'get_logger']
@@ -46,7 +46,22 @@ def get_default_config() -> Dict[str, Any]:
             "sample_rate": 16000,
             "frame_duration": 30,
             "vad_mode": 3,
-            "energy_threshold": 500
+            "energy_threshold": 500,
+            "pre_roll_ms": 300,
+            "classifier": {
+                "enabled": False,
+                "min_speech_ratio": 0.3,
+                "max_flatness": 0.4,
+                "min_energy_std": 3.0
+            }
+        },
+        "audio": {
+            "ring_frames": 200,
+            "device_index": None,
+            "device_rate": None,
+            "device_channels": None,
+            "resample_quality": 32,
+            "devices": []
         },
         "asr": {
             "model_size": "base",
@@ -55,7 +70,53 @@ def get_default_config() -> Dict[str, Any]:
             "compute_type": "int8",
             "speech_timeout": 1.5,
             "min_speech_duration": 0.5,
-            "model_path": None
+            "model_path": None,
+            "language_models": {},
+            "auto_language": {
+                "min_seconds": 2.0,
+                "decay": 0.7,
+                "confidence": 0.8
+            },
+            "decoding_profile": "realtime",
+            "cpu_threads": 0,
+            "num_workers": 1,
+            "vad_filter": {
+                "live": False,
+                "file": True
+            },
+            "decode_deadline": 8.0,
+            "max_tokens": 200,
+            "max_repeats": 3,
+            "cache": {
+                "enabled": False,
+                "path": "cache/transcripts.sqlite",
+                "max_mb": 256
+            },
+            "gate": {
+                "enabled": False,
+                "keywords": [],
+                "model_size": "tiny",
+                "model_path": None,
+                "seconds": 1.5
+            },
+            "two_pass": {
+                "enabled": False,
+                "draft_model_size": "tiny",
+                "draft_model_path": None,
+                "max_backlog": 1
+            },
+            "worker_process": {
+                "enabled": False,
+                "slots": 4,
+                "max_utterance_seconds": 60,
+                "request_timeout": 60
+            }
+        },
+        "events": {
+            "dispatch": "async",
+            "max_workers": 4,
+            "callback_timeout": 5.0,
+            "max_pending": 100
         },
         "vtuber": {
             "enable_conversation_log": True,
@@ -65,7 +126,18 @@ def get_default_config() -> Dict[str, Any]:
         "debug": {
             "save_audio": False,
             "audio_save_path": "debug/",
-            "verbose": True
+            "audio_format": "wav",
+            "archive_max_pending": 32,
+            "archive_max_mb": 500,
+            "archive_max_age_hours": 72,
+            "blackbox": {
+                "enabled": False,
+                "path": "debug/blackbox.bin",
+                "minutes": 10
+            },
+            "verbose": True,
+            "log_level": "INFO",
+            "log_file": None
         }
     }
 
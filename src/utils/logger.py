@@ -1,32 +1,84 @@
 """
 日誌工具
+
+所有模組透過 get_logger 取得 "vad_asr" 之下的子記錄器。setup_logger 在記錄器上
+只掛一個 QueueHandler，實際的格式化與主控台/檔案輸出在 QueueListener 的背景執行緒
+中進行，音訊與識別執行緒不會因為終端機輸出緩慢而被阻塞。
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 
+ROOT_LOGGER_NAME = "vad_asr"
+
+# LogRecord 的內建屬性，其餘屬性即為透過 extra 傳入的結構化欄位
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", (), None).__dict__
+) | {'message', 'asctime'}
+
+_listener = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """在訊息後附加 extra 傳入的結構化欄位，例如 utterance_id=12 duration=1.42"""
+
+    def format(self, record):
+        text = super().format(record)
+        fields = [
+            f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_')
+        ]
+        if fields:
+            text = f"{text} [{' '.join(fields)}]"
+        return text
 
-def setup_logger(name: str = "vad_asr", level: str = "INFO", log_file: str = None):
+
+def get_logger(name=None):
+    """
+    取得模組記錄器
+
+    Args:
+        name: 子記錄器名稱，例如 "asr"
+
+    Returns:
+        "vad_asr.<name>" 記錄器
+    """
+    if not name:
+        return logging.getLogger(ROOT_LOGGER_NAME)
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def setup_logger(name: str = ROOT_LOGGER_NAME, level: str = "INFO", log_file: str = None,
+                 handlers=None):
     """
     設定日誌記錄器
 
     Args:
         name: 日誌記錄器名稱
-        level: 日誌級別
+        level: 日誌級別，低於此級別的記錄在呼叫端即被略過
         log_file: 日誌檔案路徑（可選）
+        handlers: 額外的輸出處理器（可選），例如 GUI 日誌面板
 
     Returns:
         日誌記錄器
     """
+    global _listener
+
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, level.upper()))
+    logger.propagate = False
 
-    # 清除現有處理器
+    # 清除現有處理器並停止先前的背景執行緒
+    shutdown_logger()
     logger.handlers.clear()
 
     # 格式化器
-    formatter = logging.Formatter(
+    formatter = StructuredFormatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
@@ -34,7 +86,7 @@ def setup_logger(name: str = "vad_asr", level: str = "INFO", log_file: str = Non
     # 控制台處理器
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    outputs = [console_handler]
 
     # 檔案處理器（可選）
     if log_file:
@@ -43,6 +95,29 @@ def setup_logger(name: str = "vad_asr", level: str = "INFO", log_file: str = Non
 
         file_handler = logging.FileHandler(log_file, encoding='utf-8')
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        outputs.append(file_handler)
+
+    for handler in handlers or ():
+        if handler.formatter is None:
+            handler.setFormatter(formatter)
+        outputs.append(handler)
+
+    # 呼叫端只把記錄放入佇列，輸出由背景執行緒完成
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *outputs, respect_handler_level=True)
+    _listener.start()
 
     return logger
+
+
+def shutdown_logger():
+    """停止背景輸出執行緒，並輸出佇列中剩餘的記錄"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logger)
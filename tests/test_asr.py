@@ -0,0 +1,225 @@
+"""
+ASR 解碼設定及解碼上限測試 (不需 Whisper 模型)
+"""
+
+import time
+
+import numpy as np
+
+from src.core import asr
+from src.core.asr import ASREngine, Segment, TranscriptionStream
+
+
+def _engine(**attributes):
+    """不載入模型的 ASREngine，只設定解碼設定及上限相關的屬性"""
+    engine = ASREngine.__new__(ASREngine)
+    engine.decoding_profiles = {name: dict(options) for name, options in ASREngine.DECODING_PROFILES.items()}
+    engine.decoding_profile = 'realtime'
+    engine.vad_filter = dict(ASREngine.SOURCE_VAD_FILTER)
+    engine.max_repeats = 3
+    engine.use_faster_whisper = True
+    engine.realtime_factor = None
+    engine.stats = {'truncated': 0, 'deadline': 0, 'max_tokens': 0, 'repetition': 0}
+    engine.__dict__.update(attributes)
+    return engine
+
+
+def _segments(*texts, tokens=1):
+    return [Segment(index, index + 1, text, tokens) for index, text in enumerate(texts)]
+
+
+def _texts(stream):
+    return [segment.text for segment in stream]
+
+
+def test_decoding_options_per_profile_and_source():
+    """測試解碼設定合併、ASR 端 VAD 依來源決定，以及單次覆寫"""
+    engine = _engine()
+
+    live = engine.get_decoding_options(source='live')
+    assert live['beam_size'] == 1 and live['vad_filter'] is False
+    accurate = engine.get_decoding_options('accurate', source='file', beam_size=3)
+    assert accurate['beam_size'] == 3 and accurate['vad_filter'] is True
+    assert isinstance(accurate['temperature'], list)
+    print("[OK] 解碼設定測試通過")
+
+
+def test_repetition_drops_only_repeats():
+    """測試重複的句子只捨棄重複部分並繼續解碼，空白片段不算重複"""
+    stream = TranscriptionStream(_engine(), _segments("哈哈", "哈哈", "哈哈", "哈哈", "後面的內容"), time.perf_counter())
+    assert _texts(stream) == ["哈哈", "後面的內容"]
+    assert stream.reason == 'repetition'
+
+    stream = TranscriptionStream(_engine(), _segments("", "", "", "x"), time.perf_counter())
+    assert _texts(stream) == ["", "", "", "x"] and not stream.truncated
+
+    # 檔案轉錄關閉重複上限
+    stream = TranscriptionStream(_engine(), _segments("好", "好", "好"), time.perf_counter(), max_repeats=0)
+    assert _texts(stream) == ["好", "好", "好"]
+    print("[OK] 重複句子處理測試通過")
+
+
+def test_token_and_deadline_limits():
+    """測試 token 上限及時間上限在片段之間截斷"""
+    stream = TranscriptionStream(_engine(), _segments("a", "b", "c", tokens=10), time.perf_counter(), max_tokens=15)
+    assert _texts(stream) == ["a", "b"] and stream.reason == 'max_tokens'
+
+    # 解碼開始時間在 10 秒前，第一段之後即超過 5 秒的上限
+    engine = _engine()
+    stream = TranscriptionStream(engine, _segments("a", "b"), time.perf_counter() - 10, deadline=5)
+    assert _texts(stream) == ["a"] and stream.reason == 'deadline'
+    assert engine.stats['deadline'] == 1 and engine.stats['truncated'] == 1
+    print("[OK] token 及時間上限測試通過")
+
+
+def test_limits_applied_within_window():
+    """測試 token 上限帶入視窗的解碼參數，時間不足時移除溫度回退"""
+    options = _engine().get_decoding_options('accurate')
+
+    limited = _engine()._apply_limits(options, deadline=0, max_tokens=1000, audio_seconds=5)
+    assert limited['max_new_tokens'] == ASREngine.MAX_WINDOW_TOKENS
+    assert len(limited['temperature']) == 6, "沒有解碼速度估計時不移除溫度回退"
+
+    # 每秒音訊需 0.5 秒解碼，5 秒的語音一次約 2.5 秒，8 秒上限內只容得下 3 次
+    engine = _engine(use_faster_whisper=False)
+    engine._record_speed(4.0, 2.0)
+    limited = engine._apply_limits(options, deadline=8, max_tokens=100, audio_seconds=5)
+    assert limited['sample_len'] == 100
+    assert limited['temperature'] == [0.0, 0.2, 0.4]
+    assert len(options['temperature']) == 6, "不應修改原本的解碼參數"
+    print("[OK] 視窗內解碼上限測試通過")
+
+
+class _StubSegment:
+    """faster-whisper 片段替身"""
+
+    def __init__(self, text):
+        self.start, self.end, self.text = 0.0, 1.0, text
+        self.tokens = [0]
+        self.avg_logprob = self.no_speech_prob = self.words = None
+
+
+class _StubInfo:
+    """faster-whisper 識別資訊替身"""
+
+    def __init__(self, language, probabilities):
+        self.language = language
+        self.language_probability = probabilities.get(language, 1.0)
+        self.all_language_probs = sorted(probabilities.items(), key=lambda item: -item[1])
+
+
+class _StubWhisperModel:
+    """
+    faster-whisper 模型替身，記錄載入及解碼的模型名稱
+
+    不指定語言時依 detection 偵測語言；識別文字為「模型名稱:語言」
+    """
+
+    loaded = []
+    decoded = []
+    detection = {'zh': 1.0}
+
+    def __init__(self, name, **kwargs):
+        self.name = name
+        self.loaded.append(name)
+
+    def transcribe(self, audio, language=None, **options):
+        self.decoded.append((self.name, language))
+        if language is None:
+            language = max(self.detection, key=self.detection.get)
+        return iter([_StubSegment(f"{self.name}:{language}")]), _StubInfo(language, self.detection)
+
+
+def _stub_engine(**kwargs):
+    """以 _StubWhisperModel 建立 ASREngine，回傳引擎及還原模組的函式"""
+    saved = asr.HAS_FASTER_WHISPER, getattr(asr, 'WhisperModel', None)
+    asr.HAS_FASTER_WHISPER, asr.WhisperModel = True, _StubWhisperModel
+    _StubWhisperModel.loaded, _StubWhisperModel.decoded = [], []
+
+    def restore():
+        asr.HAS_FASTER_WHISPER, asr.WhisperModel = saved
+
+    try:
+        return ASREngine(model_size='base', decoding_profile='realtime', **kwargs), restore
+    except Exception:
+        restore()
+        raise
+
+
+def _audio(seconds):
+    return np.zeros(int(seconds * ASREngine.SAMPLE_RATE), dtype=np.float32)
+
+
+def test_language_models_load_on_first_use():
+    """測試各語言的模型第一次使用時才載入、之後常駐，未對應的語言使用預設模型"""
+    engine, restore = _stub_engine(language='zh', language_models={'en': 'base.en'})
+    try:
+        assert _StubWhisperModel.loaded == ['base'], "只應先載入預設模型"
+
+        assert engine.transcribe(_audio(1), language='en').text == "base.en:en"
+        assert engine.transcribe(_audio(1), language='en').text == "base.en:en"
+        assert _StubWhisperModel.loaded == ['base', 'base.en'], "同一模型只應載入一次"
+
+        assert engine.transcribe(_audio(1), language='yue').text == "base:yue"
+        assert engine.transcribe(_audio(1)).text == "base:zh"
+        assert _StubWhisperModel.loaded == ['base', 'base.en'], "未對應的語言應使用預設模型"
+        assert engine.get_stats()['models'] == ['base', 'base.en']
+    finally:
+        restore()
+    print("[OK] 各語言模型載入測試通過")
+
+
+def test_auto_language_inherits_prior():
+    """測試先驗明確時短語音沿用最近的語言，低信心的偵測結果不會改變語言"""
+    engine, restore = _stub_engine(language='auto')
+    try:
+        _StubWhisperModel.detection = {'zh': 0.95, 'en': 0.05}
+        result = engine.transcribe(_audio(3), source='live')
+        assert result.language == 'zh' and result.text == "base:zh"
+        assert _StubWhisperModel.decoded == [('base', None)], "偵測結果與模型相同時不應重新解碼"
+
+        # 短語音直接以先驗的語言解碼，不偵測
+        result = engine.transcribe(_audio(1), source='live')
+        assert result.language == 'zh' and _StubWhisperModel.decoded[-1] == ('base', 'zh')
+        assert engine.stats['language_inherited'] == 1 and engine.stats['language_detected'] == 1
+
+        # 低信心地偵測為粵語，先驗仍判為普通話，以普通話重新解碼
+        _StubWhisperModel.detection = {'yue': 0.55, 'zh': 0.45}
+        result = engine.transcribe(_audio(3), source='live')
+        assert result.language == 'zh' and result.text == "base:zh"
+        assert _StubWhisperModel.decoded[-2:] == [('base', None), ('base', 'zh')]
+    finally:
+        _StubWhisperModel.detection = {'zh': 1.0}
+        restore()
+    print("[OK] 自動語言先驗沿用測試通過")
+
+
+def test_auto_language_switch_uses_language_model():
+    """測試明確的偵測結果更新先驗，並改以該語言對應的模型重新解碼"""
+    engine, restore = _stub_engine(language='auto', language_models={'en': 'base.en'})
+    try:
+        _StubWhisperModel.detection = {'zh': 0.9, 'en': 0.1}
+        engine.transcribe(_audio(3), source='live')
+        weight = engine.language_prior.weights['en']
+
+        _StubWhisperModel.detection = {'en': 0.99, 'zh': 0.01}
+        result = engine.transcribe(_audio(3), source='live')
+        assert result.language == 'en' and result.text == "base.en:en"
+        assert _StubWhisperModel.decoded[-2:] == [('base', None), ('base.en', 'en')]
+        assert _StubWhisperModel.loaded == ['base', 'base.en']
+        assert engine.language_prior.weights['en'] > weight, "明確的偵測結果應更新先驗"
+    finally:
+        _StubWhisperModel.detection = {'zh': 1.0}
+        restore()
+    print("[OK] 自動語言切換模型測試通過")
+
+
+if __name__ == "__main__":
+    test_decoding_options_per_profile_and_source()
+    test_repetition_drops_only_repeats()
+    test_token_and_deadline_limits()
+    test_limits_applied_within_window()
+    test_language_models_load_on_first_use()
+    test_auto_language_inherits_prior()
+    test_auto_language_switch_uses_language_model()
+    print("\n所有 ASR 測試通過！")
@@ -0,0 +1,192 @@
+"""
+ASR 子行程用戶端測試 (以執行緒模擬子行程，不需 Whisper 模型)
+"""
+
+import time
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.core.asr import Segment
+from src.core.asr_process import ASRProcessClient
+
+SAMPLE_RATE = 16000
+CRASH = 1      # 收到此長度的音訊時子行程當機
+HANG = 2       # 收到此長度的音訊時子行程卡住不回應
+
+
+class _ThreadProcess:
+    """
+    以執行緒模擬的 ASR 子行程
+
+    依 _worker_main 的協定回應：每個請求傳回一段以音訊長度為文字的 Segment 及 done
+    """
+
+    pid = 0
+
+    def __init__(self, conn, shm, slot_bytes):
+        self.conn = conn
+        self.shm = shm
+        self.slot_bytes = slot_bytes
+        self.exitcode = None
+        self.killed = threading.Event()
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        self.conn.send(('ready',))
+        while not self.killed.is_set():
+            if not self.conn.poll(0.02):
+                continue
+            message = self.conn.recv()
+            if message[0] == 'stop':
+                break
+            if message[0] != 'transcribe':
+                continue
+
+            _, request_id, payload, _ = message
+            if isinstance(payload, bytes):
+                audio = np.frombuffer(payload, dtype=np.float32)
+            else:
+                slot, length = payload
+                audio = np.ndarray(length, dtype=np.float32, buffer=self.shm.buf,
+                                   offset=slot * self.slot_bytes)
+
+            if len(audio) == CRASH:
+                self.exitcode = 1
+                break
+            if len(audio) == HANG:
+                self.killed.wait()
+                break
+
+            text = str(len(audio))
+            self.conn.send(('segment', request_id, Segment(0.0, 1.0, text, 1).to_tuple()))
+            self.conn.send(('done', request_id, (False, None, 'zh', 1.0, 0.0), {}))
+        self.conn.close()
+
+    def is_alive(self):
+        return self.thread.is_alive()
+
+    def terminate(self):
+        self.exitcode = -15
+        self.killed.set()
+
+    def join(self, timeout=None):
+        self.thread.join(timeout)
+
+
+class _ThreadClient(ASRProcessClient):
+    """以 _ThreadProcess 取代子行程，重新啟動時模擬模型載入時間"""
+
+    def __init__(self, restart_delay=0.0, **kwargs):
+        self.restart_delay = restart_delay
+        self.restarting = threading.Event()
+        self.started_languages = []
+        super().__init__({'language': 'zh'}, sample_rate=SAMPLE_RATE, **kwargs)
+
+    def _start_worker(self, language):
+        self.started_languages.append(language)
+        if len(self.started_languages) > 1:
+            self.restarting.set()
+            time.sleep(self.restart_delay)
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self.process = _ThreadProcess(child_conn, self.shm, self.slot_bytes)
+        self.conn = parent_conn
+        self.conn.recv()
+
+
+def _text(stream):
+    """讀完串流並回傳文字"""
+    return " ".join(segment.text for segment in stream)
+
+
+def test_slots_and_pipe_transfer():
+    """測試音訊經由共享記憶體槽位傳送，過長的音訊改以 Pipe 傳送，槽位用完後歸還"""
+    client = _ThreadClient(slots=2, max_utterance_seconds=1)
+    try:
+        streams = [client.transcribe_iter(np.zeros(n, dtype=np.float32)) for n in (100, 200, 300)]
+        assert [_text(stream) for stream in streams] == ["100", "200", "300"]
+
+        result = client.transcribe(np.zeros(SAMPLE_RATE + 1, dtype=np.float32))
+        assert result.text == str(SAMPLE_RATE + 1)
+        assert client.get_stats()['pipe_transfers'] == 1
+        assert client.free_slots.qsize() == 2, "完成的請求應歸還槽位"
+    finally:
+        client.close()
+    print("[OK] 共享記憶體槽位測試通過")
+
+
+def test_crash_restarts_and_queues_new_requests():
+    """測試子行程當機時進行中的請求失敗，重新啟動期間的新請求在就緒後送出"""
+    client = _ThreadClient(restart_delay=0.5, slots=2, request_timeout=0.2)
+    try:
+        crashed = client.transcribe(np.zeros(CRASH, dtype=np.float32))
+        assert crashed.error, "當機時進行中的請求應以失敗結束"
+
+        assert client.restarting.wait(timeout=2)
+        client.set_language('en')
+        start = time.monotonic()
+        result = client.transcribe(np.zeros(100, dtype=np.float32))
+
+        assert result.error is None and result.text == "100", "重新啟動期間的請求應在就緒後送出"
+        assert time.monotonic() - start < 2
+        # 排隊時間不計入逾時，新的子行程不應因此被強制結束
+        assert client.get_stats()['restarts'] == 1
+        assert client.get_stats()['timeouts'] == 0
+        assert client.started_languages == ['zh', 'zh']
+        assert client.free_slots.qsize() == 2
+    finally:
+        client.close()
+    print("[OK] 當機重新啟動測試通過")
+
+
+def test_timeout_restarts_worker():
+    """測試請求逾時時強制結束子行程並重新啟動"""
+    client = _ThreadClient(request_timeout=0.2)
+    try:
+        hung = client.transcribe(np.zeros(HANG, dtype=np.float32))
+        assert hung.error
+
+        assert client.transcribe(np.zeros(100, dtype=np.float32)).text == "100"
+        stats = client.get_stats()
+        assert stats['timeouts'] == 1 and stats['restarts'] == 1
+    finally:
+        client.close()
+    print("[OK] 請求逾時測試通過")
+
+
+class _FailingClient(ASRProcessClient):
+    """子行程啟動失敗的用戶端，記錄建立的共享記憶體名稱"""
+
+    shm_names = []
+
+    def _start_worker(self, language):
+        self.shm_names.append(self.shm.name)
+        raise RuntimeError("ASR 子行程啟動失敗 (exit code 1)")
+
+
+def test_startup_failure_releases_shared_memory():
+    """測試子行程啟動失敗時釋放共享記憶體"""
+    try:
+        _FailingClient({'language': 'zh'}, slots=1, max_utterance_seconds=1)
+        assert False, "啟動失敗應拋出例外"
+    except RuntimeError:
+        pass
+
+    try:
+        shared_memory.SharedMemory(name=_FailingClient.shm_names[-1]).close()
+        assert False, "共享記憶體應已釋放"
+    except FileNotFoundError:
+        pass
+    print("[OK] 啟動失敗釋放共享記憶體測試通過")
+
+
+if __name__ == "__main__":
+    test_slots_and_pipe_transfer()
+    test_crash_restarts_and_queues_new_requests()
+    test_timeout_restarts_worker()
+    test_startup_failure_releases_shared_memory()
+    print("\n所有 ASR 子行程測試通過！")
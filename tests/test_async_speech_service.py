@@ -0,0 +1,87 @@
+"""
+asyncio 語音服務測試 (不需麥克風及 Whisper 模型)
+"""
+
+import asyncio
+
+from src.services.async_speech_service import AsyncSpeechService
+from tests.test_speech_service import UTTERANCE, _service as _speech_service
+
+
+def _service(max_events=1000):
+    """建立以替身 ASR 及音訊來源運作的 asyncio 語音服務"""
+    service, source = _speech_service()
+    return AsyncSpeechService(service=service, max_events=max_events), source
+
+
+def test_event_order():
+    """測試事件依 speech_start, speech_end, partial, final, result 的順序送達"""
+    async def run():
+        service, source = _service()
+        await service.start()
+        source.feed(UTTERANCE)
+
+        events = []
+        async for event in service.events():
+            events.append(event)
+            if event.type == 'result':
+                break
+        await service.stop()
+        return events
+
+    events = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert [event.type for event in events] == ['speech_start', 'speech_end', 'partial', 'final', 'result']
+    assert events[3].data == "測試"
+    assert events[4].data.text == "測試"
+    print("[OK] asyncio 事件順序測試通過")
+
+
+def test_stop_ends_events():
+    """測試 stop() 結束等待中的 events() 迭代"""
+    async def run():
+        service, _ = _service()
+        await service.start()
+
+        async def consume():
+            return [event async for event in service.events()]
+
+        consumer = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.05)
+        assert not consumer.done()
+
+        await service.stop()
+        return await asyncio.wait_for(consumer, timeout=1)
+
+    assert asyncio.run(run()) == [], "stop() 後 events() 應結束"
+    print("[OK] 停止結束迭代測試通過")
+
+
+def test_max_events_drops_oldest():
+    """測試未讀取的事件超過上限時丟棄最舊的事件"""
+    async def run():
+        service, source = _service(max_events=2)
+        await service.start()
+        source.feed(UTTERANCE)
+
+        # 不讀取事件，等待識別完成 (5 個事件) 後再檢查佇列
+        while service.dropped_events < 3:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+
+        stats = service.get_stats()
+        await service.stop()
+        return stats, [event async for event in service.events()]
+
+    stats, events = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert stats['dropped_events'] == 3
+    assert [event.type for event in events] == ['final', 'result'], "應保留最新的事件"
+    print("[OK] 事件上限測試通過")
+
+
+if __name__ == "__main__":
+    test_event_order()
+    test_stop_ends_events()
+    test_max_events_drops_oldest()
+    print("\n所有 asyncio 語音服務測試通過！")
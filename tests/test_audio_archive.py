@@ -0,0 +1,93 @@
+"""
+音訊存檔測試
+"""
+
+import json
+import wave
+import tempfile
+from pathlib import Path
+
+from src.core.audio_archive import AudioArchive
+
+
+def _silence(seconds, sample_rate=16000):
+    """產生靜音 (int16 bytes)"""
+    return b'\x00\x00' * int(seconds * sample_rate)
+
+
+def test_archive_writes_audio_and_sidecar():
+    """測試寫入音訊檔及 JSON 說明檔"""
+    with tempfile.TemporaryDirectory() as path:
+        archive = AudioArchive(path)
+        archive.start()
+        assert archive.submit(1, _silence(0.5), {'text': "你好", 'duration': 0.5})
+        archive.stop()
+
+        sidecars = list(Path(path).glob("*.json"))
+        assert len(sidecars) == 1
+        record = json.loads(sidecars[0].read_text(encoding='utf-8'))
+        assert record['text'] == "你好"
+        assert record['utterance_id'] == 1
+
+        with wave.open(str(Path(path) / record['audio_file']), 'rb') as wf:
+            assert wf.getnframes() == 8000
+        assert archive.get_stats()['archived'] == 1
+    print("[OK] 音訊存檔寫入測試通過")
+
+
+def test_archive_drops_when_full():
+    """測試佇列已滿時丟棄而不阻塞"""
+    with tempfile.TemporaryDirectory() as path:
+        archive = AudioArchive(path, max_pending=2)
+        archive.is_running = True  # 不啟動寫入執行緒，讓佇列保持已滿
+
+        assert archive.submit(1, _silence(0.1), {})
+        assert archive.submit(2, _silence(0.1), {})
+        assert archive.submit(3, _silence(0.1), {}) == False, "佇列已滿時應丟棄"
+        assert archive.get_stats()['dropped'] == 1
+    print("[OK] 存檔佇列丟棄測試通過")
+
+
+def test_archive_size_retention():
+    """測試超過總大小時刪除最舊的片段"""
+    with tempfile.TemporaryDirectory() as path:
+        # 每段約 32KB，上限 0.08MB 約可保留兩段
+        archive = AudioArchive(path, max_total_mb=0.08)
+        archive.start()
+        for utterance_id in range(1, 5):
+            archive.submit(utterance_id, _silence(1.0), {})
+        archive.stop()
+
+        remaining = sorted(int(p.stem.rsplit('_', 1)[1]) for p in Path(path).glob("*.wav"))
+        assert remaining == [3, 4], f"應只保留最新的兩段: {remaining}"
+        assert archive.get_stats()['deleted'] == 2
+    print("[OK] 存檔容量限制測試通過")
+
+
+def test_archive_ignores_unrelated_files():
+    """測試重新啟動時只管理存檔本身的檔案，共用目錄中的其他 JSON 不被刪除"""
+    with tempfile.TemporaryDirectory() as path:
+        archive = AudioArchive(path)
+        archive.start()
+        archive.submit(1, _silence(1.0), {})
+        archive.stop()
+
+        other = Path(path) / "blackbox_20240101_120000.json"
+        other.write_text("{}", encoding='utf-8')
+
+        # 上限小於一段存檔，重新啟動後應刪除既有的存檔但保留其他檔案
+        archive = AudioArchive(path, max_total_mb=0.01)
+        archive.start()
+        archive.stop()
+        assert other.exists(), "不應刪除非存檔的 JSON"
+        assert not list(Path(path).glob("*.wav"))
+        assert archive.get_stats()['deleted'] == 1
+    print("[OK] 共用目錄測試通過")
+
+
+if __name__ == "__main__":
+    test_archive_writes_audio_and_sidecar()
+    test_archive_drops_when_full()
+    test_archive_size_retention()
+    test_archive_ignores_unrelated_files()
+    print("\n所有音訊存檔測試通過！")
@@ -0,0 +1,91 @@
+"""
+音訊檔案讀取測試
+"""
+
+import wave
+import struct
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from src.core.audio_file import WavReader
+from src.core.resampler import FrameConverter, StreamingResampler
+
+
+def _write_wav(path, samples, rate):
+    """寫入 16-bit WAV，samples 為 (樣本數, 聲道數)"""
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(samples.shape[1])
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.astype(np.int16).tobytes())
+
+
+def test_reader_zero_copy_views():
+    """測試切片為檔案映射的零複製檢視，並能略過額外的 RIFF 區塊"""
+    samples = np.arange(3200, dtype=np.int16).reshape(-1, 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "list.wav"
+        _write_wav(path, samples, 16000)
+
+        # 在 fmt 與 data 之間插入奇數長度的 LIST 區塊 (需補齊一個位元組)
+        data = path.read_bytes()
+        index = data.index(b'data')
+        extra = b'LIST' + struct.pack('<I', 3) + b'abc\0'
+        path.write_bytes(data[:index] + extra + data[index:])
+
+        with WavReader(path) as reader:
+            assert (reader.sample_rate, reader.channels, reader.frames) == (16000, 2, 1600)
+            view = reader.view(100, 200)
+            assert np.array_equal(view, samples[100:200])
+            assert not view.flags.writeable and not view.flags.owndata
+            del view
+
+    print("[OK] 零複製檢視測試通過")
+
+
+def test_reader_matches_live_conversion():
+    """測試讀取結果與即時擷取的轉換流程相同，從中間讀取也不受影響"""
+    samples = (np.random.default_rng(0).normal(size=(48000 * 4, 2)) * 3000).astype(np.int16)
+    expected = StreamingResampler(48000, 16000).process(samples.astype(np.float32).mean(axis=1) / 32768)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "stereo.wav"
+        _write_wav(path, samples, 48000)
+
+        with WavReader(path) as reader:
+            assert np.allclose(reader.read(block_seconds=0.7), expected, atol=1e-6)
+            assert np.allclose(reader.read(1.5, 2.5), expected[24000:40000], atol=1e-6)
+
+            frames = np.concatenate(list(reader.iter_frames(block_seconds=1)))
+            live = FrameConverter(48000, 2).process(samples.tobytes())
+            assert np.array_equal(frames, np.frombuffer(b"".join(live), dtype=np.int16))
+
+    print("[OK] 讀取與即時轉換一致性測試通過")
+
+
+def test_reader_memory_is_bounded():
+    """測試讀取長檔時的暫存記憶體只與區塊大小有關"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "long.wav"
+        _write_wav(path, np.ones((16000 * 600, 1), dtype=np.int16), 16000)  # 10 分鐘 = 19.2MB
+
+        tracemalloc.start()
+        with WavReader(path) as reader:
+            blocks = sum(len(block) for block in reader.iter_frames(block_seconds=10))
+            audio = reader.read(300, 310, block_seconds=10)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    assert blocks == 600 * 16000 and len(audio) == 160000
+    assert peak < 4 * 1024 * 1024, f"暫存記憶體: {peak / 1e6:.1f}MB"
+    print("[OK] 記憶體上限測試通過")
+
+
+if __name__ == "__main__":
+    test_reader_zero_copy_views()
+    test_reader_matches_live_conversion()
+    test_reader_memory_is_bounded()
+    print("\n所有音訊檔案測試通過！")
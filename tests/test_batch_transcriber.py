@@ -0,0 +1,177 @@
+"""
+批次轉錄測試
+"""
+
+import json
+import time
+import wave
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.core.asr import RecognitionResult, Segment, Word
+from src.core.audio_file import find_audio_files, load_audio
+from src.services import batch_transcriber
+from src.services.batch_transcriber import BatchTranscriber, format_timestamp, split_at_silence, write_srt
+
+
+def _write_wav(path, samples, rate=16000, channels=1):
+    """寫入 16-bit WAV"""
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+
+
+def test_srt_output():
+    """測試 SRT 時間格式及略過空白段落"""
+    assert format_timestamp(0) == "00:00:00,000"
+    assert format_timestamp(3725.4567) == "01:02:05,457"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "out.srt"
+        write_srt([{'start': 0.0, 'end': 1.5, 'text': "你好"},
+                   {'start': 1.5, 'end': 2.0, 'text': ""},
+                   {'start': 2.0, 'end': 3.25, 'text': "世界"}], path)
+        content = path.read_text(encoding='utf-8')
+
+    assert content == ("1\n00:00:00,000 --> 00:00:01,500\n你好\n\n"
+                       "2\n00:00:02,000 --> 00:00:03,250\n世界\n\n")
+    print("[OK] SRT 輸出測試通過")
+
+
+def test_find_and_load_audio():
+    """測試遞迴搜尋音訊檔及 WAV 混音、重取樣"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "sub").mkdir()
+        _write_wav(root / "a.wav", np.zeros(16000))
+        _write_wav(root / "sub" / "b.WAV", np.zeros(8000))
+        (root / "notes.txt").write_text("x")
+
+        files = find_audio_files([root, root / "a.wav"])
+        assert [f.name for f in files] == ["a.wav", "b.WAV"]
+
+        stereo = np.empty(48000 * 2, dtype=np.int16)
+        stereo[0::2] = 8192
+        stereo[1::2] = 8192
+        _write_wav(root / "stereo.wav", stereo, rate=48000, channels=2)
+        audio = load_audio(root / "stereo.wav", 16000)
+
+    assert audio.dtype == np.float32 and len(audio) == 16000
+    assert abs(audio[4000:12000].mean() - 0.25) < 1e-3
+    print("[OK] 音訊檔搜尋及讀取測試通過")
+
+
+def test_split_at_silence():
+    """測試長檔切點落在靜音中央且不超過長度上限"""
+    # 30ms 幀：8 秒語音 + 1.5 秒靜音重複 20 次
+    pattern = np.concatenate((np.ones(267, dtype=bool), np.zeros(50, dtype=bool)))
+    speech = np.tile(pattern, 20)
+    chunks = split_at_silence(speech, 30, target_seconds=40, max_seconds=60)
+
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(speech)
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+    assert all(end - start <= 2000 for start, end in chunks)
+    assert all(not speech[end] for _, end in chunks[:-1]), "切點應在靜音段內"
+    assert len(chunks) == 5
+
+    # 完全沒有靜音時在上限處硬切
+    chunks = split_at_silence(np.ones(5000, dtype=bool), 30, target_seconds=40, max_seconds=60)
+    assert chunks == [(0, 2000), (2000, 4000), (4000, 5000)]
+    print("[OK] 靜音切段測試通過")
+
+
+def test_resume_skips_completed():
+    """測試重新執行時略過已完成的檔案及寫到一半的行"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _write_wav(root / "done.wav", np.zeros(1600))
+        output = root / "out.jsonl"
+        output.write_text(json.dumps({'file': str((root / "done.wav").resolve())}) + "\n"
+                          + '{"file": "/x/partial.wa', encoding='utf-8')
+
+        transcriber = BatchTranscriber({}, output=output)
+        assert transcriber.completed_files() == {str((root / "done.wav").resolve())}
+
+        stats = transcriber.run([root])
+
+    assert stats['files'] == 1 and stats['skipped'] == 1 and stats['completed'] == 0
+    print("[OK] 續傳略過測試通過")
+
+
+class _PeakStream:
+    """以音訊峰值為文字的識別串流，片段及單字時間戳相對於區段開頭"""
+
+    cached = False
+
+    def __init__(self, audio):
+        text = f"{np.abs(audio).max():.2f}"
+        self.result = RecognitionResult(text, [Segment(0.25, 0.75, text, 1, words=[Word(0.25, 0.5, text)])])
+
+    def __iter__(self):
+        return iter(self.result.segments)
+
+
+class _SlowFirstEngine:
+    """第一次解碼較慢的 ASR 替身，讓後面的區段先完成"""
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def transcribe_iter(self, audio, **kwargs):
+        with self.lock:
+            self.calls += 1
+            first = self.calls == 1
+        if first:
+            time.sleep(0.3)
+        return _PeakStream(audio)
+
+
+def test_long_form_merges_in_file_order():
+    """測試長檔模式把各區段的時間戳換算為檔案時間，並依檔案順序合併"""
+    # 三段 3 秒的語音 (振幅遞增)，中間各隔 2 秒靜音
+    t = np.arange(3 * 16000) / 16000
+    voice = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 8)) * (1 + np.sin(2 * np.pi * 4 * t))
+    silence = np.zeros(2 * 16000)
+    samples = np.concatenate([voice * 2000, silence, voice * 3000, silence, voice * 4000])
+
+    engine = batch_transcriber._engine
+    batch_transcriber._engine = _SlowFirstEngine()
+    try:
+        with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(max_workers=3) as pool:
+            path = Path(tmp) / "long.wav"
+            _write_wav(path, samples)
+            transcriber = BatchTranscriber({}, long_form=True, chunk_seconds=4, max_chunk_seconds=8)
+            result = transcriber._transcribe_long_form(pool, str(path))
+    finally:
+        batch_transcriber._engine = engine
+
+    segments = result['segments']
+    assert result['chunks'] == 3 and len(segments) == 3
+    peaks = [float(segment['text']) for segment in segments]
+    assert peaks == sorted(peaks), "區段應依檔案順序合併，而非完成順序"
+    assert result['text'] == " ".join(segment['text'] for segment in segments)
+
+    # 第一段從 0 秒開始，後兩段的切點落在 3-5 秒及 8-10 秒的靜音中
+    offsets = [round(segment['start'] - 0.25, 3) for segment in segments]
+    assert offsets[0] == 0.0 and 3.0 <= offsets[1] <= 5.0 and 8.0 <= offsets[2] <= 10.0, offsets
+    for segment, offset in zip(segments, offsets):
+        assert segment['end'] == round(offset + 0.75, 3)
+        assert segment['words'][0]['start'] == round(offset + 0.25, 3)
+        assert segment['words'][0]['end'] == round(offset + 0.5, 3)
+    print("[OK] 長檔合併測試通過")
+
+
+if __name__ == "__main__":
+    test_srt_output()
+    test_find_and_load_audio()
+    test_split_at_silence()
+    test_resume_skips_completed()
+    test_long_form_merges_in_file_order()
+    print("\n所有批次轉錄測試通過！")
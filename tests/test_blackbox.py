@@ -0,0 +1,107 @@
+"""
+黑盒錄音測試
+"""
+
+import os
+import time
+import tempfile
+
+from src.core.blackbox import BlackBoxRecorder, BlackBoxReader, FLAG_SPEECH, FLAG_IN_UTTERANCE
+
+
+def _recorder(path, minutes=0.003):
+    """建立小容量的錄音器 (0.003 分鐘 = 6 幀)"""
+    return BlackBoxRecorder(path, frame_bytes=4, minutes=minutes)
+
+
+def test_blackbox_wraps_around():
+    """測試寫滿後覆寫最舊的幀且依序讀出"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "blackbox.bin")
+        recorder = _recorder(path)
+        recorder.open()
+        size = os.path.getsize(path)
+
+        for i in range(10):
+            recorder.write(bytes([i]) * 4, is_speech=i % 2 == 0, in_utterance=i >= 8)
+        recorder.close()
+
+        assert os.path.getsize(path) == size, "檔案大小應固定"
+
+        reader = BlackBoxReader(path)
+        frames = list(reader.frames())
+        reader.close()
+
+        assert [index for index, _, _, _ in frames] == [4, 5, 6, 7, 8, 9]
+        assert frames[0][3] == bytes([4]) * 4
+        assert frames[0][2] == FLAG_SPEECH
+        assert frames[-2][2] == FLAG_SPEECH | FLAG_IN_UTTERANCE
+    print("[OK] 黑盒環形覆寫測試通過")
+
+
+def test_blackbox_resume():
+    """測試重新開啟時接續寫入"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "blackbox.bin")
+        recorder = _recorder(path)
+        recorder.open()
+        recorder.write(b'aaaa', False, False)
+        recorder.close()
+
+        recorder = _recorder(path)
+        recorder.open()
+        recorder.write(b'bbbb', False, False)
+        recorder.close()
+
+        reader = BlackBoxReader(path)
+        assert [frame for _, _, _, frame in reader.frames()] == [b'aaaa', b'bbbb']
+        reader.close()
+    print("[OK] 黑盒接續寫入測試通過")
+
+
+def test_blackbox_time_filter():
+    """測試依時間範圍讀取"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "blackbox.bin")
+        recorder = _recorder(path)
+        recorder.open()
+        for i in range(4):
+            recorder.write(bytes([i]) * 4, False, False)
+            time.sleep(0.02)
+        recorder.close()
+
+        reader = BlackBoxReader(path)
+        times = [wall_time for _, wall_time, _, _ in reader.frames()]
+        selected = list(reader.frames(start_time=times[1], end_time=times[2]))
+        assert reader.time_range() == (times[0], times[-1])
+        reader.close()
+
+        assert [index for index, _, _, _ in selected] == [1, 2]
+    print("[OK] 黑盒時間範圍測試通過")
+
+
+def test_blackbox_tool_empty_recording():
+    """測試空的錄音檔指定時段時不會出錯"""
+    from blackbox_tool import parse_time
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "blackbox.bin")
+        recorder = _recorder(path)
+        recorder.open()
+        recorder.close()
+
+        reader = BlackBoxReader(path)
+        assert reader.time_range() is None
+        assert parse_time("-120", reader) is None
+        assert parse_time("21:03", reader) is None
+        assert list(reader.frames(parse_time("-120", reader), None)) == []
+        reader.close()
+    print("[OK] 空錄音檔測試通過")
+
+
+if __name__ == "__main__":
+    test_blackbox_wraps_around()
+    test_blackbox_resume()
+    test_blackbox_time_filter()
+    test_blackbox_tool_empty_recording()
+    print("\n所有黑盒錄音測試通過！")
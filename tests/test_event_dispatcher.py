@@ -0,0 +1,126 @@
+"""
+事件分派測試
+"""
+
+import time
+import threading
+from src.services.event_dispatcher import EventDispatcher
+
+
+def test_dispatch_preserves_order():
+    """測試同類型事件依序執行"""
+    dispatcher = EventDispatcher(max_workers=4)
+    dispatcher.start()
+
+    results = []
+    done = threading.Event()
+
+    def callback(i):
+        time.sleep(0.001 * (5 - i % 5))
+        results.append(i)
+        if i == 19:
+            done.set()
+
+    for i in range(20):
+        dispatcher.dispatch('transcription', callback, i)
+
+    assert done.wait(timeout=5)
+    dispatcher.stop()
+
+    assert results == list(range(20)), "同類型事件應依序執行"
+    print("[OK] 事件順序測試通過")
+
+
+def test_slow_callback_does_not_block():
+    """測試慢速回呼不會阻塞分派端"""
+    dispatcher = EventDispatcher(max_workers=2)
+    dispatcher.start()
+
+    start = time.perf_counter()
+    dispatcher.dispatch('transcription', time.sleep, 0.5)
+    elapsed = time.perf_counter() - start
+    dispatcher.stop()
+
+    assert elapsed < 0.1, "分派不應等待回呼完成"
+    print("[OK] 非阻塞分派測試通過")
+
+
+def test_callback_timeout():
+    """測試逾時的回呼只記錄一次，同類型事件等待它結束後依序執行"""
+    dispatcher = EventDispatcher(max_workers=2, callback_timeout=0.1)
+    dispatcher.start()
+
+    results = []
+    done = threading.Event()
+
+    def slow(i):
+        time.sleep(0.5)
+        results.append(i)
+
+    def fast(i):
+        results.append(i)
+        done.set()
+
+    dispatcher.dispatch('final', slow, 1)
+    dispatcher.dispatch('final', fast, 2)
+
+    assert done.wait(timeout=2)
+    assert results == [1, 2], "逾時後同類型事件仍應依序執行"
+    assert dispatcher.get_stats()['timeouts'] == 1
+    dispatcher.stop()
+    print("[OK] 回呼逾時測試通過")
+
+
+def test_slow_lane_does_not_starve_others():
+    """測試慢速回呼只佔用一個執行緒，其他事件類型照常執行且不計逾時"""
+    dispatcher = EventDispatcher(max_workers=2, callback_timeout=0.1)
+    dispatcher.start()
+
+    started = []
+    done = threading.Event()
+
+    def on_speech_start(i):
+        started.append(i)
+        if i == 3:
+            done.set()
+
+    dispatcher.dispatch('final', time.sleep, 0.8)
+    dispatcher.dispatch('final', time.sleep, 0)
+    for i in range(4):
+        dispatcher.dispatch('speech_start', on_speech_start, i)
+
+    assert done.wait(timeout=0.5), "慢速的 final 回呼不應阻塞 speech_start"
+    assert started == [0, 1, 2, 3]
+    time.sleep(0.3)
+
+    stats = dispatcher.get_stats()
+    assert stats['timeouts'] == 1, "只有實際執行中的慢速回呼應計為逾時"
+    assert stats['completed'] == 4
+    assert stats['pending'] == 1, "逾時回呼結束前不應送出同類型的下一個事件"
+    dispatcher.stop()
+    print("[OK] 慢速事件隔離測試通過")
+
+
+def test_pending_limit():
+    """測試待執行數超過上限時丟棄最舊的事件"""
+    dispatcher = EventDispatcher(max_workers=1, callback_timeout=0, max_pending=2)
+    dispatcher.start()
+
+    blocker = threading.Event()
+    dispatcher.dispatch('segment', blocker.wait)
+    for i in range(5):
+        dispatcher.dispatch('segment', print, i)
+
+    assert dispatcher.get_stats()['dropped'] == 3
+    blocker.set()
+    dispatcher.stop()
+    print("[OK] 待執行上限測試通過")
+
+
+if __name__ == "__main__":
+    test_dispatch_preserves_order()
+    test_slow_callback_does_not_block()
+    test_callback_timeout()
+    test_slow_lane_does_not_starve_others()
+    test_pending_limit()
+    print("\n所有事件分派測試通過！")
@@ -0,0 +1,55 @@
+"""
+喚醒詞閘門測試
+"""
+
+import numpy as np
+
+from src.core.asr import RecognitionResult
+from src.core.keyword_gate import KeywordGate
+
+
+class _GateASR:
+    """依序回傳指定文字並記錄送入長度的 ASR 替身"""
+
+    def __init__(self, *texts, error=None):
+        self.texts = list(texts)
+        self.error = error
+        self.lengths = []
+
+    def transcribe(self, audio, **kwargs):
+        self.lengths.append(len(audio))
+        if self.error:
+            return RecognitionResult(error=self.error)
+        return RecognitionResult(self.texts.pop(0))
+
+
+def test_keyword_match_on_prefix():
+    """測試只解碼開頭，比對時忽略大小寫、空白及標點"""
+    asr = _GateASR("Hey, A.I. 你好", "今天天氣不錯")
+    gate = KeywordGate(asr, ["hey ai", "小愛"], seconds=1.0, sample_rate=16000)
+    audio = np.zeros(16000 * 5, dtype=np.float32)
+
+    assert gate.check(audio)[0] is True
+    assert gate.check(audio)[0] is False
+    assert asr.lengths == [16000, 16000], "只應解碼開頭 1 秒"
+    print("[OK] 關鍵字比對測試通過")
+
+
+def test_gate_fails_open_and_requires_keywords():
+    """測試檢查失敗時放行，未設定關鍵字時拒絕建立"""
+    gate = KeywordGate(_GateASR(error="boom"), ["小愛"])
+    assert gate.check(np.zeros(1600, dtype=np.float32))[0] is True
+
+    try:
+        KeywordGate(_GateASR(), [" ", "!"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("沒有關鍵字時應拋出 ValueError")
+    print("[OK] 閘門失敗放行測試通過")
+
+
+if __name__ == "__main__":
+    test_keyword_match_on_prefix()
+    test_gate_fails_open_and_requires_keywords()
+    print("\n所有喚醒詞閘門測試通過！")
@@ -0,0 +1,46 @@
+"""
+語言識別先驗測試
+"""
+
+from src.core.language_id import LanguagePrior
+
+LANGUAGES = ('zh', 'yue', 'en')
+
+
+def test_choose_restricted_to_supported():
+    """測試偵測結果限制在支援的語言內，全部不支援時沿用最近的語言"""
+    prior = LanguagePrior(LANGUAGES)
+
+    language, probability = prior.choose({'ja': 0.6, 'zh': 0.3, 'en': 0.1})
+    assert language == 'zh' and abs(probability - 0.75) < 1e-9
+    assert prior.choose({'ja': 1.0})[0] == 'zh'
+    print("[OK] 限制支援語言測試通過")
+
+
+def test_session_prior_inherit_and_switch():
+    """測試短語音沿用最近的語言，單次偏差不切換，明確的另一種語言仍會切換"""
+    prior = LanguagePrior(LANGUAGES, min_seconds=2.0, decay=0.7, confidence=0.8)
+    assert prior.inherit(1.0) is None, "沒有先驗時需要偵測"
+
+    for _ in range(3):
+        prior.choose({'zh': 0.95, 'en': 0.05})
+    assert prior.inherit(1.0) == 'zh'
+    assert prior.inherit(5.0) is None, "長語音照常偵測"
+
+    # 略偏英文的偵測被先驗改判，不影響不使用先驗的檔案判斷
+    assert prior.choose({'zh': 0.4, 'en': 0.6})[0] == 'zh'
+    assert prior.choose({'zh': 0.4, 'en': 0.6}, session=False)[0] == 'en'
+
+    for _ in range(3):
+        prior.choose({'en': 0.99, 'zh': 0.01})
+    assert prior.choose({'en': 0.99, 'zh': 0.01})[0] == 'en'
+
+    prior.reset()
+    assert prior.inherit(1.0) is None
+    print("[OK] 工作階段先驗測試通過")
+
+
+if __name__ == "__main__":
+    test_choose_restricted_to_supported()
+    test_session_prior_inherit_and_switch()
+    print("\n所有語言識別測試通過！")
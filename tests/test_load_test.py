@@ -0,0 +1,53 @@
+"""
+負載測試工具測試 (不需麥克風及 Whisper 模型)
+"""
+
+import time
+
+from load_test import run_step
+from src.core.asr import RecognitionResult
+from src.services import speech_service
+from tests.test_speech_service import _RecordingASR
+
+
+class _ChatterASR:
+    """喚醒詞檢查用的 ASR 替身，開頭永遠沒有提到關鍵字"""
+
+    def transcribe(self, audio, **kwargs):
+        return RecognitionResult("隨便聊聊")
+
+    def set_language(self, language):
+        return True
+
+    def close(self):
+        pass
+
+
+def test_gated_utterances_count_as_finished():
+    """測試喚醒詞閘門擋下的片段算處理完畢，不會被視為未完成而等到逾時"""
+    config = {
+        'asr': {'speech_timeout': 0.5, 'min_speech_duration': 0.3,
+                'gate': {'enabled': True, 'keywords': ["小愛"]}},
+        'events': {'dispatch': 'inline'}
+    }
+
+    create_asr = speech_service.create_asr
+    speech_service.create_asr = lambda asr_config, sample_rate=16000: _ChatterASR()
+    try:
+        start = time.perf_counter()
+        result = run_step(config, 2, duration=20, speed=0, shared_asr=_RecordingASR(),
+                          seed=0, drain_timeout=3)
+        elapsed = time.perf_counter() - start
+    finally:
+        speech_service.create_asr = create_asr
+
+    assert result['utterances'] > 0
+    assert result['gated'] == result['utterances'] and result['decoded'] == 0
+    assert result['pending'] == 0, "擋下的片段不應算未完成"
+    assert elapsed < 3, "所有片段處理完畢後不應等到逾時"
+    print("[OK] 喚醒詞負載測試通過")
+
+
+if __name__ == "__main__":
+    test_gated_utterances_count_as_finished()
+    print("\n所有負載測試工具測試通過！")
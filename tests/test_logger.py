@@ -0,0 +1,62 @@
+"""
+日誌工具測試
+"""
+
+import logging
+
+from src.utils.logger import setup_logger, get_logger, shutdown_logger, StructuredFormatter
+
+
+class _ListHandler(logging.Handler):
+    """收集格式化後的日誌"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelname, self.format(record)))
+
+
+def test_structured_fields():
+    """測試 extra 欄位附加在訊息後"""
+    handler = _ListHandler()
+    handler.setFormatter(StructuredFormatter('%(message)s'))
+    setup_logger(level="INFO", handlers=[handler])
+
+    get_logger("test").info("識別結果: %s", "你好", extra={'utterance_id': 3, 'duration': 1.5})
+    shutdown_logger()
+
+    assert handler.records == [('INFO', "識別結果: 你好 [utterance_id=3 duration=1.500]")]
+    print("[OK] 結構化欄位測試通過")
+
+
+def test_level_gating():
+    """測試低於設定級別的日誌不會被格式化"""
+    handler = _ListHandler()
+    setup_logger(level="INFO", handlers=[handler])
+
+    class _Expensive:
+        formatted = False
+
+        def __str__(self):
+            _Expensive.formatted = True
+            return "expensive"
+
+    logger = get_logger("test")
+    logger.debug("不會輸出: %s", _Expensive())
+    logger.warning("會輸出")
+    shutdown_logger()
+
+    assert not _Expensive.formatted, "被過濾的日誌不應格式化參數"
+    assert [level for level, _ in handler.records] == ['WARNING']
+    print("[OK] 日誌級別過濾測試通過")
+
+
+if __name__ == "__main__":
+    print("開始測試日誌工具...\n")
+
+    test_structured_fields()
+    test_level_gating()
+
+    print("\n所有測試通過！")
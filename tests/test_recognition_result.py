@@ -0,0 +1,46 @@
+"""
+識別結果測試
+"""
+
+import json
+
+from src.core.asr import RecognitionResult, Segment, Word
+
+
+def test_segment_tuple_roundtrip():
+    """測試片段轉為 tuple 後可經 JSON 還原 (子行程傳遞及快取使用)"""
+    segment = Segment(0.5, 1.2, " 你好", 3, -0.25, 0.02, [Word(0.5, 0.8, "你", 0.9), Word(0.8, 1.2, "好", 0.8)])
+    restored = Segment.from_tuple(json.loads(json.dumps(segment.to_tuple())))
+
+    assert (restored.start, restored.end, restored.text, restored.num_tokens) == (0.5, 1.2, " 你好", 3)
+    assert (restored.avg_logprob, restored.no_speech_prob) == (-0.25, 0.02)
+    assert [(w.word, w.start, w.probability) for w in restored.words] == [("你", 0.5, 0.9), ("好", 0.8, 0.8)]
+    assert Segment.from_tuple(Segment(0, 1, "x").to_tuple()).words is None
+    print("[OK] 片段序列化測試通過")
+
+
+def test_result_confidence_and_text():
+    """測試整體信心分數的彙總及字串相容行為"""
+    result = RecognitionResult("第一句 第二句", [
+        Segment(0.0, 1.0, " 第一句", 10, -0.2, 0.1, [Word(0.0, 1.0, "第一句", 0.9)]),
+        Segment(1.0, 2.0, " 第二句", 30, -0.6, 0.4)
+    ], language='zh', language_probability=0.98)
+
+    assert str(result) == "第一句 第二句" and result
+    assert abs(result.avg_logprob - (-0.5)) < 1e-9, "應以 token 數加權"
+    assert result.no_speech_prob == 0.1
+    assert [w.word for w in result.words] == ["第一句"]
+
+    data = json.loads(json.dumps(result.to_dict()))
+    assert data['segments'][0]['words'][0]['word'] == "第一句"
+    assert 'words' not in data['segments'][1]
+
+    empty = RecognitionResult(error="boom")
+    assert not empty and str(empty) == "" and empty.avg_logprob is None
+    print("[OK] 識別結果彙總測試通過")
+
+
+if __name__ == "__main__":
+    test_segment_tuple_roundtrip()
+    test_result_confidence_and_text()
+    print("\n所有識別結果測試通過！")
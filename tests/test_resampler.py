@@ -0,0 +1,76 @@
+"""
+重取樣測試
+"""
+
+import numpy as np
+
+from src.core.resampler import StreamingResampler, FrameConverter
+
+
+def _tone(frequency, rate, seconds=1.0):
+    """產生正弦波"""
+    return np.sin(2 * np.pi * frequency * np.arange(int(rate * seconds)) / rate).astype(np.float32)
+
+
+def test_resampler_block_invariance():
+    """測試任意切塊的結果與一次處理整段相同"""
+    signal = np.random.default_rng(0).normal(size=44100).astype(np.float32)
+    whole = StreamingResampler(44100, 16000).process(signal)
+
+    resampler = StreamingResampler(44100, 16000)
+    rng = np.random.default_rng(1)
+    parts = []
+    position = 0
+    while position < len(signal):
+        size = int(rng.integers(1, 3000))
+        parts.append(resampler.process(signal[position:position + size]))
+        position += size
+
+    assert len(whole) == 16000
+    assert np.allclose(whole, np.concatenate(parts), atol=1e-5)
+    print("[OK] 串流重取樣切塊一致性測試通過")
+
+
+def test_resampler_passband_and_aliasing():
+    """測試通帶保留、高於輸出 Nyquist 的成分被濾除"""
+    passband = StreamingResampler(48000, 16000).process(_tone(1000, 48000))
+    alias = StreamingResampler(48000, 16000).process(_tone(10000, 48000))
+
+    assert abs(np.abs(passband[500:-500]).max() - 1.0) < 0.01
+    assert np.abs(alias[500:-500]).max() < 0.01, "10kHz 不應混疊到 16kHz 輸出"
+    print("[OK] 重取樣頻率響應測試通過")
+
+
+def test_converter_exact_frames_without_drift():
+    """測試 44.1kHz 立體聲長時間轉換後的幀數不漂移"""
+    converter = FrameConverter(44100, 2, out_rate=16000, frame_size=480)
+    block = np.zeros(1323 * 2, dtype=np.int16).tobytes()  # 30ms 立體聲
+
+    frames = []
+    for _ in range(2000):  # 60 秒
+        frames.extend(converter.process(block))
+
+    assert all(len(frame) == 960 for frame in frames)
+    assert len(frames) == 60 * 16000 // 480, f"幀數: {len(frames)}"
+    print("[OK] 幀長度與漂移測試通過")
+
+
+def test_converter_downmix_and_passthrough():
+    """測試立體聲混音及 16kHz 單聲道直通"""
+    stereo = np.empty(960, dtype=np.int16)
+    stereo[0::2] = 1000
+    stereo[1::2] = 3000
+    frames = FrameConverter(16000, 2, frame_size=480).process(stereo.tobytes())
+    assert np.all(np.frombuffer(frames[0], dtype=np.int16) == 2000)
+
+    mono = np.arange(480, dtype=np.int16).tobytes()
+    assert FrameConverter(16000, 1, frame_size=480).process(mono) == [mono]
+    print("[OK] 混音及直通測試通過")
+
+
+if __name__ == "__main__":
+    test_resampler_block_invariance()
+    test_resampler_passband_and_aliasing()
+    test_converter_exact_frames_without_drift()
+    test_converter_downmix_and_passthrough()
+    print("\n所有重取樣測試通過！")
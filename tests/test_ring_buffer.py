@@ -0,0 +1,51 @@
+"""
+環形緩衝測試
+"""
+
+from src.core.ring_buffer import FrameRing
+
+
+def test_ring_write_read_order():
+    """測試先進先出順序"""
+    ring = FrameRing(capacity=4, frame_bytes=4)
+
+    for i in range(3):
+        assert ring.write(bytes([i]) * 4)
+
+    assert len(ring) == 3
+    assert ring.read() == b'\x00' * 4
+    assert ring.read() == b'\x01' * 4
+    assert ring.read() == b'\x02' * 4
+    assert ring.read() is None
+    print("[OK] 環形緩衝讀寫順序測試通過")
+
+
+def test_ring_overrun():
+    """測試緩衝已滿時拒絕寫入"""
+    ring = FrameRing(capacity=2, frame_bytes=2)
+
+    assert ring.write(b'ab')
+    assert ring.write(b'cd')
+    assert ring.write(b'ef') == False, "緩衝已滿時應拒絕寫入"
+
+    assert ring.read() == b'ab'
+    assert ring.write(b'gh')
+    assert ring.read() == b'cd'
+    assert ring.read() == b'gh'
+    print("[OK] 環形緩衝溢位測試通過")
+
+
+def test_ring_short_frame():
+    """測試長度不足一幀的資料"""
+    ring = FrameRing(capacity=2, frame_bytes=4)
+
+    ring.write(b'xy')
+    assert ring.read() == b'xy'
+    print("[OK] 環形緩衝短幀測試通過")
+
+
+if __name__ == "__main__":
+    test_ring_write_read_order()
+    test_ring_overrun()
+    test_ring_short_frame()
+    print("\n所有環形緩衝測試通過！")
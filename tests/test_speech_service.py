@@ -0,0 +1,413 @@
+"""
+語音服務測試 (不需麥克風及 Whisper 模型)
+"""
+
+import time
+import numpy as np
+
+from src.core.asr import RecognitionResult, Segment
+from src.core.keyword_gate import KeywordGate
+from src.services.speech_service import SpeechService
+
+FRAME_SIZE = 480
+SILENCE = bytes(FRAME_SIZE * 2)
+
+
+def _voiced_frame():
+    """合成一幀有諧波的類語音訊號"""
+    t = np.arange(FRAME_SIZE) / 16000
+    wave = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 8)) * 6000
+    return wave.astype(np.int16).tobytes()
+
+
+class _RecordingASR:
+    """記錄送入音訊的 ASR 替身"""
+
+    SUPPORTED_LANGUAGES = {'zh': '普通話'}
+
+    def __init__(self):
+        self.decoding_profile = 'realtime'
+        self.received = []
+
+    def transcribe_iter(self, audio, **kwargs):
+        self.received.append(audio)
+        return _Stream()
+
+    def get_current_language(self):
+        return 'zh'
+
+
+class _Stream:
+    """單段識別結果"""
+
+    @property
+    def result(self):
+        return RecognitionResult("測試", [Segment(0.0, 1.0, "測試", 1)], language='zh')
+
+    def __iter__(self):
+        yield Segment(0.0, 1.0, "測試", 1)
+
+
+class _FrameSource:
+    """依序送出指定音訊幀的音訊來源"""
+
+    def __init__(self):
+        self.on_audio_frame = None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def feed(self, frames):
+        for frame in frames:
+            self.on_audio_frame(frame)
+
+
+UTTERANCE = [_voiced_frame()] * 30 + [SILENCE] * 60
+
+
+def _config(vad_config=None, asr_config=None):
+    """測試用配置：1 秒靜音結束語音，事件直接在處理執行緒中觸發"""
+    return {
+        'vad': dict(vad_config or {}),
+        'asr': {'speech_timeout': 1.0, 'min_speech_duration': 0.5, **(asr_config or {})},
+        'events': {'dispatch': 'inline'}
+    }
+
+
+def _service(asr=None, vad_config=None, asr_config=None):
+    """建立以替身 ASR 及單一音訊來源運作的語音服務"""
+    source = _FrameSource()
+    service = SpeechService(_config(vad_config, asr_config), asr=asr or _RecordingASR(), audio_stream=source)
+    return service, source
+
+
+def _wait(condition, timeout=5):
+    """等待條件成立，最多 timeout 秒"""
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def _run_service(service, source, frames, until=None):
+    """啟動服務並送入音訊幀，等待 until() 成立後停止服務，回傳統計"""
+    service.start()
+    source.feed(frames)
+    if until is not None:
+        _wait(until)
+    service.stop()
+    return service.get_stats()
+
+
+def _run(pre_roll_ms):
+    """送入 10 幀靜音、30 幀語音、60 幀靜音，回傳 ASR 收到的音訊"""
+    asr = _RecordingASR()
+    service, source = _service(asr, vad_config={'pre_roll_ms': pre_roll_ms})
+    _run_service(service, source, [SILENCE] * 10 + UTTERANCE, until=lambda: asr.received)
+
+    assert len(asr.received) == 1, "應識別一段語音"
+    return asr.received[0]
+
+
+def test_pre_roll_prepended():
+    """測試語音片段前接上預錄的音訊"""
+    audio = _run(pre_roll_ms=150)
+
+    # 150ms 預錄 = 5 幀靜音在語音之前
+    assert not audio[:5 * FRAME_SIZE].any(), "語音片段應以預錄的靜音開始"
+    assert audio[5 * FRAME_SIZE:6 * FRAME_SIZE].any(), "預錄之後應為語音"
+    print("[OK] 預錄緩衝測試通過")
+
+
+def test_pre_roll_disabled():
+    """測試關閉預錄時語音片段從 VAD 觸發處開始"""
+    audio = _run(pre_roll_ms=0)
+
+    assert audio[:FRAME_SIZE].any(), "關閉預錄時第一幀即為語音"
+    print("[OK] 關閉預錄測試通過")
+
+
+def test_multiple_sources_share_model():
+    """測試多個音訊來源各自切段並共用同一個 ASR"""
+    asr = _RecordingASR()
+    host_a, host_b = _FrameSource(), _FrameSource()
+    service = SpeechService(_config(), asr=asr, audio_streams={'host_a': host_a, 'host_b': host_b})
+    events = []
+    service.on_event = events.append
+    service.start()
+
+    # 交錯送入: host_a 說話時 host_b 靜音，接著 host_b 說話
+    voiced = _voiced_frame()
+    for i in range(100):
+        host_a.feed([voiced if i < 30 else SILENCE])
+        host_b.feed([voiced if 20 <= i < 60 else SILENCE])
+
+    _wait(lambda: len(asr.received) >= 2)
+    service.stop()
+
+    assert len(asr.received) == 2, "兩個來源應各產生一段語音"
+    starts = [event.source for event in events if event.type == 'speech_start']
+    finals = sorted(event.source for event in events if event.type == 'final')
+    assert starts == ['host_a', 'host_b']
+    assert finals == ['host_a', 'host_b']
+    print("[OK] 多音訊來源測試通過")
+
+
+class _FailingASR(_RecordingASR):
+    """解碼時拋出例外的 ASR 替身"""
+
+    def transcribe_iter(self, audio, **kwargs):
+        self.received.append(audio)
+        raise RuntimeError("decoder crashed")
+
+
+def _recognize(asr):
+    """送入一段語音，回傳 on_transcription 及 on_result 收到的參數"""
+    service, source = _service(asr)
+    texts, results = [], []
+    service.on_transcription = texts.append
+    service.on_result = results.append
+    stats = _run_service(service, source, UTTERANCE, until=lambda: results)
+    return texts, results, stats
+
+
+def test_result_callback_and_text_compat():
+    """測試 on_result 收到完整結果，on_transcription 仍只收到文字"""
+    texts, results, stats = _recognize(_RecordingASR())
+
+    assert texts == ["測試"] and type(texts[0]) is str
+    result = results[0]
+    assert isinstance(result, RecognitionResult) and result.language == 'zh'
+    assert result.segments[0].end == 1.0
+    assert result.latency >= result.decode_time >= 0
+    assert stats['transcriptions'] == 1 and stats['errors'] == 0
+    print("[OK] 識別結果回呼測試通過")
+
+
+def test_failed_decode_reports_error():
+    """測試解碼失敗時 on_result 收到附帶錯誤的空結果，不觸發 on_transcription"""
+    texts, results, stats = _recognize(_FailingASR())
+
+    assert texts == []
+    assert results[0].text == "" and "decoder crashed" in results[0].error
+    assert stats['errors'] == 1
+    print("[OK] 解碼失敗結果測試通過")
+
+
+def test_classifier_rejects_before_queue():
+    """測試預分類器排除的片段不送入 ASR，並以 rejected 原因觸發 dropped 事件"""
+    asr = _RecordingASR()
+    service, source = _service(asr, vad_config={'classifier': {'enabled': True}})
+    dropped = []
+    service.on_speech_dropped = lambda reason, duration: dropped.append(reason)
+
+    # 固定振幅的持續音沒有音節起伏
+    stats = _run_service(service, source, UTTERANCE)
+
+    assert asr.received == [] and dropped == ['rejected']
+    assert stats['rejected'] == 1 and stats['utterances'] == 0
+    assert stats['rejected_seconds'] > 0
+    print("[OK] 預分類排除測試通過")
+
+
+class _PrefixASR:
+    """喚醒詞檢查用的 ASR 替身，依序回傳指定文字"""
+
+    def __init__(self, *texts):
+        self.texts = list(texts)
+
+    def transcribe(self, audio, **kwargs):
+        return RecognitionResult(self.texts.pop(0))
+
+
+def test_keyword_gate_skips_main_model():
+    """測試開頭未提到關鍵字的片段不送入主模型，並以 gated 原因觸發 dropped 事件"""
+    asr = _RecordingASR()
+    service, source = _service(asr)
+    service.gate = KeywordGate(_PrefixASR("隨便聊聊", "小愛，今天天氣如何"), ["小愛"])
+    dropped = []
+    service.on_speech_dropped = lambda reason, duration: dropped.append(reason)
+
+    stats = _run_service(service, source, UTTERANCE * 2, until=lambda: asr.received)
+
+    assert len(asr.received) == 1 and dropped == ['gated']
+    assert stats['gated'] == 1 and stats['transcriptions'] == 1
+    print("[OK] 喚醒詞模式測試通過")
+
+
+class _DraftASR(_RecordingASR):
+    """草稿用的 ASR 替身，識別結果與主模型不同"""
+
+    def transcribe_iter(self, audio, **kwargs):
+        self.received.append(audio)
+        return _DraftStream()
+
+    def set_language(self, language):
+        return True
+
+
+class _DraftStream(_Stream):
+    """草稿識別結果"""
+
+    @property
+    def result(self):
+        return RecognitionResult("草稿", [Segment(0.0, 1.0, "草稿", 1)], language='zh')
+
+    def __iter__(self):
+        yield Segment(0.0, 1.0, "草稿", 1)
+
+
+class _RefiningASR(_RecordingASR):
+    """修正用的主模型替身"""
+
+    def transcribe(self, audio, **kwargs):
+        self.received.append(audio)
+        return RecognitionResult("測試", [Segment(0.0, 1.0, "測試", 1)], language='zh')
+
+
+def _two_pass(max_backlog):
+    """以兩階段識別送入一段語音，回傳 on_transcription 收到的參數及統計"""
+    service, source = _service(_RefiningASR(), asr_config={'two_pass': {'max_backlog': max_backlog}})
+    service.draft_asr = _DraftASR()
+    calls = []
+    service.on_transcription = lambda text, final: calls.append((text, final))
+    stats = _run_service(service, source, UTTERANCE, until=lambda: len(calls) >= 2)
+    return calls, stats
+
+
+def test_two_pass_draft_then_revision():
+    """測試兩階段識別先發出草稿，主模型重新識別後發出最終結果"""
+    calls, stats = _two_pass(max_backlog=1)
+
+    assert calls == [("草稿", False), ("測試", True)], calls
+    assert stats['drafts'] == 1 and stats['refined'] == 1 and stats['transcriptions'] == 1
+    print("[OK] 兩階段識別測試通過")
+
+
+def test_two_pass_skips_refinement_when_backlogged():
+    """測試修正佇列積壓時略過修正，草稿即為最終結果"""
+    calls, stats = _two_pass(max_backlog=0)
+
+    assert calls == [("草稿", False), ("草稿", True)], calls
+    assert stats['refine_skipped'] == 1 and stats['refined'] == 0
+    print("[OK] 略過修正測試通過")
+
+
+class _TextStream(_Stream):
+    """以指定文字為單段結果的識別串流"""
+
+    def __init__(self, text):
+        self.text = text
+
+    @property
+    def result(self):
+        return RecognitionResult(self.text, [Segment(0.0, 1.0, self.text, 1)], language='zh')
+
+    def __iter__(self):
+        yield Segment(0.0, 1.0, self.text, 1)
+
+
+class _LengthDraftASR(_DraftASR):
+    """以語音片段的幀數作為草稿文字，用來辨認是哪一段"""
+
+    def transcribe_iter(self, audio, **kwargs):
+        return _TextStream(f"草稿{len(audio) // FRAME_SIZE}")
+
+
+class _SlowRefiningASR(_RefiningASR):
+    """每次修正需要 0.3 秒的主模型替身"""
+
+    def transcribe(self, audio, **kwargs):
+        time.sleep(0.3)
+        text = f"主模型{len(audio) // FRAME_SIZE}"
+        return RecognitionResult(text, [Segment(0.0, 1.0, text, 1)], language='zh')
+
+
+def test_two_pass_keeps_capture_order():
+    """測試部分片段略過修正時，最終結果仍依擷取順序發出"""
+    service, source = _service(_SlowRefiningASR(), asr_config={'two_pass': {'max_backlog': 1}})
+    service.draft_asr = _LengthDraftASR()
+    finals = []
+    service.on_transcription = lambda text, final: final and finals.append(text)
+
+    # 三段長度不同的語音，第一段開始修正後才送入後兩段，其草稿在第一段修正期間完成
+    service.start()
+    source.feed([_voiced_frame()] * 30 + [SILENCE] * 60)
+    _wait(lambda: service.stats['drafts'] >= 1)
+    frames = [frame for voiced in (40, 50) for frame in [_voiced_frame()] * voiced + [SILENCE] * 60]
+    stats = _run_service(service, source, frames, until=lambda: len(finals) >= 3)
+
+    lengths = [int(text.lstrip("草稿主模型")) for text in finals]
+    assert len(finals) == 3 and lengths == sorted(lengths), finals
+    assert stats['refined'] >= 1 and stats['refine_skipped'] >= 1, stats
+    print("[OK] 兩階段識別順序測試通過")
+
+
+class _LanguageASR(_RecordingASR):
+    """記錄每次解碼收到的語言的 ASR 替身"""
+
+    def __init__(self):
+        super().__init__()
+        self.language = 'zh'
+        self.languages = []
+
+    def transcribe_iter(self, audio, **kwargs):
+        self.languages.append(kwargs.get('language'))
+        return super().transcribe_iter(audio, **kwargs)
+
+    def set_language(self, language):
+        self.language = language
+        return True
+
+    def get_current_language(self):
+        return self.language
+
+
+def test_utterance_keeps_captured_language():
+    """測試語音片段以擷取完成時的語言解碼，之後切換語言不影響已排隊的片段"""
+    asr = _LanguageASR()
+    service, source = _service(asr)
+
+    # 服務尚未啟動，片段留在佇列中，切換語言後才開始解碼
+    source.on_audio_frame = lambda frame: service._process_audio_frame(service.sources['default'], frame)
+    source.feed(UTTERANCE)
+    service.set_language('en')
+    source.feed(UTTERANCE)
+    service.start()
+
+    _wait(lambda: len(asr.languages) >= 2)
+    service.stop()
+
+    assert asr.languages == ['zh', 'en'], asr.languages
+    print("[OK] 擷取時語言測試通過")
+
+
+def test_partial_events_before_final():
+    """測試逐段的 partial 事件在 final 及 result 之前"""
+    service, source = _service()
+    events = []
+    service.on_event = lambda event: events.append((event.type, event.args))
+    _run_service(service, source, UTTERANCE, until=lambda: any(kind == 'result' for kind, _ in events))
+
+    kinds = [kind for kind, _ in events]
+    assert kinds == ['speech_start', 'speech_end', 'partial', 'final', 'result'], kinds
+    assert events[2][1] == ("測試",)
+    print("[OK] 逐段事件順序測試通過")
+
+
+if __name__ == "__main__":
+    test_pre_roll_prepended()
+    test_pre_roll_disabled()
+    test_multiple_sources_share_model()
+    test_result_callback_and_text_compat()
+    test_failed_decode_reports_error()
+    test_classifier_rejects_before_queue()
+    test_keyword_gate_skips_main_model()
+    test_two_pass_draft_then_revision()
+    test_two_pass_skips_refinement_when_backlogged()
+    test_two_pass_keeps_capture_order()
+    test_utterance_keeps_captured_language()
+    test_partial_events_before_final()
+    print("\n所有語音服務測試通過！")
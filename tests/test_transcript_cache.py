@@ -0,0 +1,92 @@
+"""
+識別結果快取測試
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.core.asr import Segment, TranscriptionStream
+from src.core.transcript_cache import TranscriptCache
+
+
+class _Engine:
+    """只提供 TranscriptionStream 需要的屬性"""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.max_repeats = 3
+
+    def _record_truncation(self, reason):
+        pass
+
+
+def test_cache_key_and_roundtrip():
+    """測試音訊或參數不同時鍵不同，結果可完整取回"""
+    audio = np.linspace(-1, 1, 16000, dtype=np.float32)
+    params = {'model': 'base', 'language': 'zh', 'options': {'beam_size': 1}}
+
+    key = TranscriptCache.make_key(audio, params)
+    assert key == TranscriptCache.make_key(audio.copy(), dict(params))
+    assert key != TranscriptCache.make_key(audio[::-1], params)
+    assert key != TranscriptCache.make_key(audio, dict(params, language='en'))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptCache(Path(tmp) / "cache.sqlite")
+        assert cache.get(key) is None
+        cache.put(key, {'segments': [[0.0, 1.0, "你好", 3]], 'truncated': False, 'reason': None})
+        assert cache.get(key)['segments'] == [[0.0, 1.0, "你好", 3]]
+
+        stats = cache.get_stats()
+        cache.close()
+
+    assert (stats['hits'], stats['misses'], stats['stores'], stats['entries']) == (1, 1, 1, 1)
+    print("[OK] 快取鍵及讀寫測試通過")
+
+
+def test_cache_lru_eviction():
+    """測試超過大小上限時淘汰最久未使用的條目"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptCache(Path(tmp) / "cache.sqlite", max_mb=0.01)  # 約 10KB
+        noise = np.random.default_rng(0)
+        for index in range(8):
+            cache.put(f"key{index}", {'text': noise.bytes(2000).hex()})  # 壓縮後約 2KB
+            cache.get("key0")  # 持續使用的條目不被淘汰
+
+        stats = cache.get_stats()
+        assert stats['bytes'] <= cache.max_bytes and stats['evictions'] > 0
+        assert cache.get("key0") is not None and cache.get("key1") is None
+        cache.close()
+
+    print("[OK] LRU 淘汰測試通過")
+
+
+def test_stream_stores_and_replays():
+    """測試完整迭代後寫入快取、命中時還原片段，時間上限截斷的結果不寫入"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranscriptCache(Path(tmp) / "cache.sqlite")
+        engine = _Engine(cache)
+        segments = [Segment(0.0, 1.0, " 第一句", 4), Segment(1.0, 2.0, " 第二句", 4)]
+
+        stream = TranscriptionStream(engine, iter(segments), 0.0, cache_key="a")
+        assert [s.text for s in stream] == [" 第一句", " 第二句"]
+
+        replay = TranscriptionStream.from_cache(engine, cache.get("a"))
+        assert [(s.start, s.end, s.text) for s in replay] == [(0.0, 1.0, " 第一句"), (1.0, 2.0, " 第二句")]
+        assert replay.cached and replay.text == stream.text
+
+        # 開始時間設在很久以前，第一段之後即超過時間上限
+        truncated = TranscriptionStream(engine, iter(segments), 0.0, deadline=1, cache_key="b")
+        assert len(list(truncated)) == 1 and truncated.reason == 'deadline'
+        assert cache.get("b") is None
+        cache.close()
+
+    print("[OK] 串流快取測試通過")
+
+
+if __name__ == "__main__":
+    test_cache_key_and_roundtrip()
+    test_cache_lru_eviction()
+    test_stream_stores_and_replays()
+    print("\n所有快取測試通過！")
@@ -0,0 +1,55 @@
+"""
+語音片段預分類測試
+"""
+
+import numpy as np
+
+from src.core.utterance_classifier import UtteranceClassifier
+
+RATE = 16000
+FRAME_SIZE = 480
+
+
+def _speech_like(seconds=2.0):
+    """合成音高滑動、以每秒 4 個音節起伏的諧波訊號"""
+    t = np.arange(int(RATE * seconds)) / RATE
+    phase = 2 * np.pi * np.cumsum(150 + 30 * np.sin(2 * np.pi * 0.7 * t)) / RATE
+    envelope = np.sqrt(np.clip(np.sin(2 * np.pi * 4 * t), 0, None))
+    wave = sum(np.sin(k * phase) / k for k in range(1, 8)) * envelope * 6000
+    return wave.astype(np.int16)
+
+
+def _count(audio):
+    return len(audio) // FRAME_SIZE
+
+
+def test_speech_accepted():
+    """測試類語音訊號不被排除"""
+    classifier = UtteranceClassifier()
+    audio = _speech_like()
+
+    features = classifier.features(audio, FRAME_SIZE, _count(audio) // 2)
+    assert classifier.reject_reason(features) is None, features
+    print("[OK] 類語音訊號通過測試通過")
+
+
+def test_non_speech_rejected():
+    """測試噪音、持續音及零星觸發的片段被排除，並指出原因"""
+    classifier = UtteranceClassifier()
+    rng = np.random.default_rng(0)
+    t = np.arange(RATE * 2) / RATE
+
+    noise = (rng.normal(size=RATE * 2) * 3000).astype(np.int16)
+    hum = (sum(np.sin(2 * np.pi * 220 * k * t) / k for k in range(1, 6)) * 5000).astype(np.int16)
+    speech = _speech_like()
+
+    assert classifier.reject_reason(classifier.features(noise, FRAME_SIZE, _count(noise))) == 'flatness'
+    assert classifier.reject_reason(classifier.features(hum.tobytes(), FRAME_SIZE, _count(hum))) == 'energy_std'
+    assert classifier.reject_reason(classifier.features(speech, FRAME_SIZE, 5)) == 'speech_ratio'
+    print("[OK] 非語音排除測試通過")
+
+
+if __name__ == "__main__":
+    test_speech_accepted()
+    test_non_speech_rejected()
+    print("\n所有預分類測試通過！")
@@ -38,8 +38,24 @@ def test_vad_noise_detection():
     print("[OK] 噪音檢測測試通過")
 
 
+def test_vad_detect_frames():
+    """測試批次檢測與逐幀檢測結果相同"""
+    rng = np.random.default_rng(0)
+    gain = np.repeat(rng.integers(0, 2, 50) * 3000, 4800)
+    audio = (rng.normal(size=len(gain)) * gain).astype(np.int16)
+
+    for use_webrtc in (True, False):
+        batch, single = VADProcessor(), VADProcessor()
+        batch.use_webrtc = single.use_webrtc = use_webrtc and batch.vad is not None
+        expected = [single.is_speech(audio[i:i + 480].tobytes()) for i in range(0, len(audio), 480)]
+        assert batch.detect_frames(audio).tolist() == expected
+
+    print("[OK] 批次檢測測試通過")
+
+
 if __name__ == "__main__":
     test_vad_initialization()
     test_vad_silence_detection()
     test_vad_noise_detection()
+    test_vad_detect_frames()
     print("\n所有 VAD 測試通過！")